@@ -1,24 +1,95 @@
-from fastapi import FastAPI, Depends, HTTPException, Query
+import logging
+
+import anyio
+import anyio.to_thread
+from fastapi import APIRouter, FastAPI, Body, Depends, HTTPException, Query, Request, Response
 from contextlib import asynccontextmanager
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func, select
-from typing import List, Optional
+from typing import Annotated, List, Literal, Optional
 
-from .crud.db import SessionLocal, engine, Base
+from .cache import entity_cache
+from .config import config as cfg
+from .crud.db import SessionLocal, engine, async_engine, Base, pool_stats
 from .crud import crud as crud_mod
-from . import schemas
+from .crud import aggregates, changes, reports, stats, versions
+from .deps import (
+    attachment_filter_params,
+    comment_filter_params,
+    fields_columns,
+    project_filter_params,
+    require_filters,
+    task_filter_params,
+)
+from .crud import expand as expand_mod
+from .crud import search as search_mod
+from .crud.plans import run
+from . import api_async, fastjson, pages, schemas
+from .etags import conditional, content_etag, version_etag
+from .instrumentation import RequestTimingMiddleware, TimedRoute, query_budget
+from .metrics import MetricsMiddleware, registry as metrics_registry
+from .slowlog import slow_queries
+from .export import csv_header, encode_rows, streaming_response
 from .models import models
 
+logger = logging.getLogger("app.changes")
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # create tables on startup
-    Base.metadata.create_all(bind=engine)
-    yield
 
+def _missing_triggers_message(missing) -> str:
+    return (f"table_changes triggers missing on {', '.join(missing)}: apply schemas/sql/table_changes.sql; "
+            "aggregates fall back to live COUNT and lists are served without ETag")
+
+
+async def _compact_changes():
+    """Сворачивать журнал table_changes (из триггеров) в хранимые агрегаты и версии.
+
+    Раз в ``STATS_COMPACT_INTERVAL`` секунд (заодно перепроверяются триггеры) и раньше,
+    как только в журнале ``STATS_COMPACT_ROWS`` строк.
+    """
+    elapsed = 0.0
+    while True:
+        await anyio.sleep(cfg.STATS_COMPACT_POLL)
+        elapsed += cfg.STATS_COMPACT_POLL
+        due = elapsed >= cfg.STATS_COMPACT_INTERVAL
+        try:
+            await anyio.to_thread.run_sync(changes.compact_all, 0 if due else cfg.STATS_COMPACT_ROWS)
+            if due:
+                elapsed = 0.0
+                missing = await anyio.to_thread.run_sync(changes.check_triggers)
+                if missing:
+                    logger.error(_missing_triggers_message(missing))
+        except Exception:
+            logger.exception("table_changes compaction failed")
 
-app = FastAPI(title="MSSQL Database Viewer API", lifespan=lifespan)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # лимитер пула потоков для синхронных эндпоинтов — свой у каждого воркера
+    anyio.to_thread.current_default_thread_limiter().total_tokens = cfg.THREADPOOL_SIZE
+    # create tables on startup (в боевом режиме схему создают миграции, а не каждый воркер)
+    if cfg.DB_CREATE_TABLES:
+        if async_engine is not None:
+            async with async_engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+        else:
+            Base.metadata.create_all(bind=engine)
+    # без триггеров журнала версии и агрегаты замирают: ETag давал бы вечные 304 со старыми данными
+    missing = changes.check_triggers()
+    if missing:
+        if cfg.STATS_REQUIRE_TRIGGERS:
+            raise RuntimeError(_missing_triggers_message(missing))
+        logger.error(_missing_triggers_message(missing))
+    async with anyio.create_task_group() as tg:
+        if cfg.STATS_COMPACT_INTERVAL > 0:
+            tg.start_soon(_compact_changes)
+        yield
+        tg.cancel_scope.cancel()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+router = APIRouter(route_class=TimedRoute)
 
 
 def get_db():
@@ -29,64 +100,123 @@ def get_db():
         db.close()
 
 
+def _page(db: Session, *args, **kwargs):
+    return run(db, pages.page_plan(*args, **kwargs))
+
+
 # --- Проекты ---
-@app.post("/projects/", response_model=schemas.ProjectRead, tags=["Projects"])
+@router.post("/projects/", response_model=schemas.ProjectRead, tags=["Projects"])
+@query_budget(2)  # на MSSQL таблица с триггерами: INSERT/UPDATE без OUTPUT и SELECT строки
 def create_project(data: schemas.ProjectCreate, db: Session = Depends(get_db)):
     """Создать проект"""
     proj = crud_mod.create_project(db, data.model_dump())
     return proj
 
 
-@app.get("/projects/", response_model=List[schemas.ProjectRead], tags=["Projects"])
+@router.get("/projects/", response_model=List[schemas.ProjectRead], tags=["Projects"])
+@query_budget(8)
 def list_projects(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    name: Optional[str] = Query(None, description="Фильтр по имени проекта (подстрока)"),
-    min_budget: Optional[float] = Query(None, description="Минимум бюджета"),
-    max_budget: Optional[float] = Query(None, description="Максимум бюджета"),
-    is_active: Optional[bool] = Query(None, description="Фильтр по активности"),
+    filters: list = Depends(project_filter_params),
     sort_by: Optional[str] = Query(None, description="Сортировать по полю (name,budget,start_date)"),
     sort_dir: Optional[str] = Query("asc", description="Направление сортировки: asc или desc"),
-    limit: Optional[int] = Query(100, ge=1),
+    limit: Optional[int] = Query(100, ge=1, description="Не больше MAX_PAGE_SIZE: больший limit урезается, дальше — по X-Next-Cursor"),
     offset: Optional[int] = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor (keyset-пагинация, offset игнорируется)"),
+    fields: Optional[str] = Query(None, description="Только эти колонки через запятую (id возвращается всегда)"),
+    with_total: Optional[Literal["exact", "approx"]] = Query(None, description="Общее число строк в X-Total-Count: exact или approx (оценка по статистике, если фильтров нет)"),
 ):
     """Список проектов с фильтрацией и сортировкой"""
-    q = db.query(models.Project)
-    if name:
-        q = q.filter(models.Project.name.ilike(f"%{name}%"))
-    if min_budget is not None:
-        q = q.filter(models.Project.budget >= min_budget)
-    if max_budget is not None:
-        q = q.filter(models.Project.budget <= max_budget)
-    if is_active is not None:
-        q = q.filter(models.Project.is_active == is_active)
-    if sort_by:
-        col = getattr(models.Project, sort_by, None)
-        if col is not None:
-            if sort_dir == "desc":
-                q = q.order_by(col.desc())
-            else:
-                q = q.order_by(col.asc())
-    q = q.offset(offset).limit(limit)
-    return q.all()
-
-
-@app.get("/projects/aggregate", tags=["Projects"])
+    columns = fields_columns(models.Project, fields)
+    # версия читается до запроса списка; при совпадении ETag список не запрашивается
+    not_modified = conditional(request, response, version_etag(versions.read(db, "projects")))
+    if not_modified:
+        return not_modified
+    return _page(db, models.Project, filters, response, sort_by, sort_dir, limit, offset, cursor, columns, with_total)
+
+
+@router.patch("/projects/", response_model=schemas.BulkWriteResult, tags=["Projects"])
+@query_budget(1)
+def bulk_update_projects(
+    data: schemas.ProjectUpdate,
+    db: Session = Depends(get_db),
+    filters: list = Depends(project_filter_params),
+):
+    """Обновить все проекты, подходящие под фильтры, одним UPDATE ... WHERE"""
+    require_filters(filters)
+    values = data.model_dump(exclude_unset=True)
+    if not values:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    return {"affected": crud_mod.bulk_update_projects(db, filters, values)}
+
+
+@router.delete("/projects/", response_model=schemas.BulkWriteResult, tags=["Projects"])
+@query_budget(1)
+def bulk_delete_projects(db: Session = Depends(get_db), filters: list = Depends(project_filter_params)):
+    """Удалить все проекты, подходящие под фильтры, одним DELETE ... WHERE (дочерние строки — каскадом в БД)"""
+    require_filters(filters)
+    return {"affected": crud_mod.bulk_delete_projects(db, filters)}
+
+
+@router.get("/projects/aggregate", tags=["Projects"])
+@query_budget(5)
 def projects_aggregate(db: Session = Depends(get_db)):
-    """Простейшие агрегаты по проектам: count, sum бюджета"""
-    total = db.query(func.count(models.Project.id)).scalar()
-    sum_budget = db.query(func.sum(models.Project.budget)).scalar()
-    return {"count": total or 0, "sum_budget": float(sum_budget or 0)}
+    """Простейшие агрегаты по проектам: count, sum бюджета (из поддерживаемой таблицы aggregate_stats)"""
+    agg = aggregates.read(db, "projects")
+    return {"count": agg["count"], "sum_budget": agg["sum"]}
 
 
-@app.get("/projects/{project_id}", response_model=schemas.ProjectRead, tags=["Projects"])
-def get_project(project_id: int, db: Session = Depends(get_db)):
-    proj = crud_mod.get_project(db, project_id)
+@router.get("/projects/stats", tags=["Projects"])
+@query_budget(1)
+def projects_stats(
+    db: Session = Depends(get_db),
+    filters: list = Depends(project_filter_params),
+    group_by: Optional[str] = Query(None, description="Поля группировки через запятую (is_active,start_date,end_date)"),
+    metrics: Optional[str] = Query("count", description="Метрики через запятую: count, sum|avg|min|max:budget"),
+):
+    """Сгруппированная статистика одним запросом GROUP BY (те же фильтры, что у списка)"""
+    try:
+        stmt = stats.stats_stmt("projects", group_by, metrics, filters)
+    except stats.StatsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return stats.as_dicts(db.execute(stmt))
+
+
+@router.get("/projects/{project_id}", response_model=schemas.ProjectExpanded, response_model_exclude_unset=True, tags=["Projects"])
+@query_budget(4)
+def get_project(
+    project_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    expand: Optional[str] = Query(None, description="Вложенные уровни через точку (tasks.comments.attachments)"),
+    fields: Optional[str] = Query(None, description="Только эти колонки через запятую (id возвращается всегда)"),
+):
+    try:
+        attrs = expand_mod.parse(models.Project, expand)
+    except expand_mod.ExpandError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    columns = fields_columns(models.Project, fields)
+    if columns is not None:
+        if attrs:
+            raise HTTPException(status_code=400, detail="fields cannot be combined with expand")
+        row = crud_mod.get_fields(db, models.Project, project_id, columns)
+        if not row:
+            raise HTTPException(status_code=404, detail="Project not found")
+        return conditional(request, response, content_etag(row)) or fastjson.json_response(row, response)
+    try:
+        proj = crud_mod.get_project(db, project_id, attrs)
+    except expand_mod.ExpandTooLarge as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not proj:
         raise HTTPException(status_code=404, detail="Project not found")
-    return proj
+    return conditional(request, response, content_etag(proj)) or proj
 
 
-@app.put("/projects/{project_id}", response_model=schemas.ProjectRead, tags=["Projects"])
+@router.put("/projects/{project_id}", response_model=schemas.ProjectRead, tags=["Projects"])
+@query_budget(2)  # на MSSQL таблица с триггерами: INSERT/UPDATE без OUTPUT и SELECT строки
 def update_project(project_id: int, data: schemas.ProjectUpdate, db: Session = Depends(get_db)):
     proj = crud_mod.update_project(db, project_id, data.model_dump(exclude_unset=True))
     if not proj:
@@ -94,7 +224,7 @@ def update_project(project_id: int, data: schemas.ProjectUpdate, db: Session = D
     return proj
 
 
-@app.delete("/projects/{project_id}", tags=["Projects"])
+@router.delete("/projects/{project_id}", tags=["Projects"])
 def delete_project(project_id: int, db: Session = Depends(get_db)):
     ok = crud_mod.delete_project(db, project_id)
     if not ok:
@@ -103,56 +233,127 @@ def delete_project(project_id: int, db: Session = Depends(get_db)):
 
 
 # --- Задачи ---
-@app.post("/tasks/", response_model=schemas.TaskRead, tags=["Tasks"])
+@router.post("/tasks/", response_model=schemas.TaskRead, tags=["Tasks"])
+@query_budget(2)  # на MSSQL таблица с триггерами: INSERT/UPDATE без OUTPUT и SELECT строки
 def create_task(data: schemas.TaskCreate, db: Session = Depends(get_db)):
     """Создать задачу"""
     return crud_mod.create_task(db, data.model_dump())
 
 
-@app.get("/tasks/", response_model=List[schemas.TaskRead], tags=["Tasks"])
+@router.post("/tasks/bulk", response_model=schemas.BulkCreateResult, tags=["Tasks"])
+def bulk_create_tasks(
+    data: Annotated[List[schemas.TaskCreate], Body(max_length=cfg.BULK_MAX_ITEMS)],
+    db: Session = Depends(get_db),
+):
+    """Создать задачи пачкой в одной транзакции; возвращает id в порядке входного списка"""
+    ids = crud_mod.bulk_create_tasks(db, [d.model_dump() for d in data])
+    return {"count": len(ids), "ids": ids}
+
+
+@router.get("/tasks/", response_model=List[schemas.TaskRead], tags=["Tasks"])
+@query_budget(8)
 def list_tasks(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    project_id: Optional[int] = Query(None),
-    status: Optional[str] = Query(None),
-    priority: Optional[str] = Query(None),
+    filters: list = Depends(task_filter_params),
     sort_by: Optional[str] = Query(None),
     sort_dir: Optional[str] = Query("asc"),
-    limit: Optional[int] = Query(100, ge=1),
+    limit: Optional[int] = Query(100, ge=1, description="Не больше MAX_PAGE_SIZE: больший limit урезается, дальше — по X-Next-Cursor"),
     offset: Optional[int] = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor"),
+    fields: Optional[str] = Query(None, description="Только эти колонки через запятую (id возвращается всегда)"),
+    with_total: Optional[Literal["exact", "approx"]] = Query(None, description="Общее число строк в X-Total-Count: exact или approx (оценка по статистике, если фильтров нет)"),
 ):
     """Список задач с фильтрами и сортировкой"""
-    q = db.query(models.Task)
-    if project_id is not None:
-        q = q.filter(models.Task.project_id == project_id)
-    if status:
-        q = q.filter(models.Task.status == status)
-    if priority:
-        q = q.filter(models.Task.priority == priority)
-    if sort_by:
-        col = getattr(models.Task, sort_by, None)
-        if col is not None:
-            q = q.order_by(col.desc() if sort_dir == "desc" else col.asc())
-    q = q.offset(offset).limit(limit)
-    return q.all()
-
-
-@app.get("/tasks/aggregate", tags=["Tasks"])
+    columns = fields_columns(models.Task, fields)
+    # версия читается до запроса списка; при совпадении ETag список не запрашивается
+    not_modified = conditional(request, response, version_etag(versions.read(db, "tasks")))
+    if not_modified:
+        return not_modified
+    return _page(db, models.Task, filters, response, sort_by, sort_dir, limit, offset, cursor, columns, with_total)
+
+
+@router.patch("/tasks/", response_model=schemas.BulkWriteResult, tags=["Tasks"])
+@query_budget(1)
+def bulk_update_tasks(
+    data: schemas.TaskUpdate,
+    db: Session = Depends(get_db),
+    filters: list = Depends(task_filter_params),
+):
+    """Обновить все задачи, подходящие под фильтры, одним UPDATE ... WHERE"""
+    require_filters(filters)
+    values = data.model_dump(exclude_unset=True)
+    if not values:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    return {"affected": crud_mod.bulk_update_tasks(db, filters, values)}
+
+
+@router.delete("/tasks/", response_model=schemas.BulkWriteResult, tags=["Tasks"])
+@query_budget(1)
+def bulk_delete_tasks(db: Session = Depends(get_db), filters: list = Depends(task_filter_params)):
+    """Удалить все задачи, подходящие под фильтры, одним DELETE ... WHERE"""
+    require_filters(filters)
+    return {"affected": crud_mod.bulk_delete_tasks(db, filters)}
+
+
+@router.get("/tasks/aggregate", tags=["Tasks"])
+@query_budget(5)
 def tasks_aggregate(db: Session = Depends(get_db)):
-    """Агрегаты по задачам: count, среднее время"""
-    total = db.query(func.count(models.Task.id)).scalar()
-    avg_time = db.query(func.avg(models.Task.time_estimation)).scalar()
-    return {"count": total or 0, "avg_time": float(avg_time or 0)}
+    """Агрегаты по задачам: count, среднее время (из поддерживаемой таблицы aggregate_stats)"""
+    agg = aggregates.read(db, "tasks")
+    return {"count": agg["count"], "avg_time": agg["sum"] / agg["present"] if agg["present"] else 0.0}
 
 
-@app.get("/tasks/{task_id}", response_model=schemas.TaskRead, tags=["Tasks"])
-def get_task(task_id: int, db: Session = Depends(get_db)):
-    t = crud_mod.get_task(db, task_id)
+@router.get("/tasks/stats", tags=["Tasks"])
+@query_budget(1)
+def tasks_stats(
+    db: Session = Depends(get_db),
+    filters: list = Depends(task_filter_params),
+    group_by: Optional[str] = Query(None, description="Поля группировки через запятую (status,priority,project_id)"),
+    metrics: Optional[str] = Query("count", description="Метрики через запятую: count, sum|avg|min|max:time_estimation"),
+):
+    """Сгруппированная статистика одним запросом GROUP BY (те же фильтры, что у списка)"""
+    try:
+        stmt = stats.stats_stmt("tasks", group_by, metrics, filters)
+    except stats.StatsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return stats.as_dicts(db.execute(stmt))
+
+
+@router.get("/tasks/{task_id}", response_model=schemas.TaskExpanded, response_model_exclude_unset=True, tags=["Tasks"])
+@query_budget(3)
+def get_task(
+    task_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    expand: Optional[str] = Query(None, description="Вложенные уровни через точку (comments.attachments)"),
+    fields: Optional[str] = Query(None, description="Только эти колонки через запятую (id возвращается всегда)"),
+):
+    try:
+        attrs = expand_mod.parse(models.Task, expand)
+    except expand_mod.ExpandError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    columns = fields_columns(models.Task, fields)
+    if columns is not None:
+        if attrs:
+            raise HTTPException(status_code=400, detail="fields cannot be combined with expand")
+        row = crud_mod.get_fields(db, models.Task, task_id, columns)
+        if not row:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return conditional(request, response, content_etag(row)) or fastjson.json_response(row, response)
+    try:
+        t = crud_mod.get_task(db, task_id, attrs)
+    except expand_mod.ExpandTooLarge as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not t:
         raise HTTPException(status_code=404, detail="Task not found")
-    return t
+    return conditional(request, response, content_etag(t)) or t
 
 
-@app.put("/tasks/{task_id}", response_model=schemas.TaskRead, tags=["Tasks"])
+@router.put("/tasks/{task_id}", response_model=schemas.TaskRead, tags=["Tasks"])
+@query_budget(2)  # на MSSQL таблица с триггерами: INSERT/UPDATE без OUTPUT и SELECT строки
 def update_task(task_id: int, data: schemas.TaskUpdate, db: Session = Depends(get_db)):
     t = crud_mod.update_task(db, task_id, data.model_dump(exclude_unset=True))
     if not t:
@@ -160,7 +361,7 @@ def update_task(task_id: int, data: schemas.TaskUpdate, db: Session = Depends(ge
     return t
 
 
-@app.delete("/tasks/{task_id}", tags=["Tasks"])
+@router.delete("/tasks/{task_id}", tags=["Tasks"])
 def delete_task(task_id: int, db: Session = Depends(get_db)):
     ok = crud_mod.delete_task(db, task_id)
     if not ok:
@@ -169,25 +370,62 @@ def delete_task(task_id: int, db: Session = Depends(get_db)):
 
 
 # --- Комментарии ---
-@app.post("/comments/", response_model=schemas.CommentRead, tags=["Comments"])
+@router.post("/comments/", response_model=schemas.CommentRead, tags=["Comments"])
+@query_budget(2)  # на MSSQL таблица с триггерами: INSERT/UPDATE без OUTPUT и SELECT строки
 def create_comment(data: schemas.CommentCreate, db: Session = Depends(get_db)):
     return crud_mod.create_comment(db, data.model_dump())
 
 
-@app.get("/comments/", response_model=List[schemas.CommentRead], tags=["Comments"])
-def list_comments(db: Session = Depends(get_db)):
-    return db.query(models.Comment).all()
+@router.post("/comments/bulk", response_model=schemas.BulkCreateResult, tags=["Comments"])
+def bulk_create_comments(
+    data: Annotated[List[schemas.CommentCreate], Body(max_length=cfg.BULK_MAX_ITEMS)],
+    db: Session = Depends(get_db),
+):
+    """Создать комментарии пачкой в одной транзакции"""
+    ids = crud_mod.bulk_create_comments(db, [d.model_dump() for d in data])
+    return {"count": len(ids), "ids": ids}
 
 
-@app.get("/comments/{comment_id}", response_model=schemas.CommentRead, tags=["Comments"])
-def get_comment(comment_id: int, db: Session = Depends(get_db)):
+@router.get("/comments/", response_model=List[schemas.CommentRead], tags=["Comments"])
+@query_budget(6)
+def list_comments(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    filters: list = Depends(comment_filter_params),
+    sort_by: Optional[str] = Query(None, description="Сортировать по полю (created_at,rating,...)"),
+    sort_dir: Optional[str] = Query("asc"),
+    limit: Optional[int] = Query(100, ge=1, description="Не больше MAX_PAGE_SIZE: больший limit урезается, дальше — по X-Next-Cursor"),
+    offset: Optional[int] = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor"),
+    fields: Optional[str] = Query(None, description="Только эти колонки через запятую (id возвращается всегда)"),
+    with_total: Optional[Literal["exact", "approx"]] = Query(None, description="Общее число строк в X-Total-Count: exact или approx (оценка по статистике, если фильтров нет)"),
+):
+    """Список комментариев с фильтрами, сортировкой и keyset-пагинацией"""
+    columns = fields_columns(models.Comment, fields)
+    not_modified = conditional(request, response, version_etag(versions.read(db, "comments")))
+    if not_modified:
+        return not_modified
+    return _page(db, models.Comment, filters, response, sort_by, sort_dir, limit, offset, cursor, columns, with_total)
+
+
+@router.get("/comments/{comment_id}", response_model=schemas.CommentRead, tags=["Comments"])
+@query_budget(1)
+def get_comment(comment_id: int, response: Response, db: Session = Depends(get_db), fields: Optional[str] = Query(None)):
+    columns = fields_columns(models.Comment, fields)
+    if columns is not None:
+        row = crud_mod.get_fields(db, models.Comment, comment_id, columns)
+        if not row:
+            raise HTTPException(status_code=404, detail="Comment not found")
+        return fastjson.json_response(row, response)
     c = crud_mod.get_comment(db, comment_id)
     if not c:
         raise HTTPException(status_code=404, detail="Comment not found")
     return c
 
 
-@app.put("/comments/{comment_id}", response_model=schemas.CommentRead, tags=["Comments"])
+@router.put("/comments/{comment_id}", response_model=schemas.CommentRead, tags=["Comments"])
+@query_budget(2)  # на MSSQL таблица с триггерами: INSERT/UPDATE без OUTPUT и SELECT строки
 def update_comment(comment_id: int, data: schemas.CommentUpdate, db: Session = Depends(get_db)):
     c = crud_mod.update_comment(db, comment_id, data.model_dump(exclude_unset=True))
     if not c:
@@ -195,7 +433,7 @@ def update_comment(comment_id: int, data: schemas.CommentUpdate, db: Session = D
     return c
 
 
-@app.delete("/comments/{comment_id}", tags=["Comments"])
+@router.delete("/comments/{comment_id}", tags=["Comments"])
 def delete_comment(comment_id: int, db: Session = Depends(get_db)):
     ok = crud_mod.delete_comment(db, comment_id)
     if not ok:
@@ -204,25 +442,62 @@ def delete_comment(comment_id: int, db: Session = Depends(get_db)):
 
 
 # --- Вложения ---
-@app.post("/attachments/", response_model=schemas.AttachmentRead, tags=["Attachments"])
+@router.post("/attachments/", response_model=schemas.AttachmentRead, tags=["Attachments"])
+@query_budget(2)  # на MSSQL таблица с триггерами: INSERT/UPDATE без OUTPUT и SELECT строки
 def create_attachment(data: schemas.AttachmentCreate, db: Session = Depends(get_db)):
     return crud_mod.create_attachment(db, data.model_dump())
 
 
-@app.get("/attachments/", response_model=List[schemas.AttachmentRead], tags=["Attachments"])
-def list_attachments(db: Session = Depends(get_db)):
-    return db.query(models.Attachment).all()
+@router.post("/attachments/bulk", response_model=schemas.BulkCreateResult, tags=["Attachments"])
+def bulk_create_attachments(
+    data: Annotated[List[schemas.AttachmentCreate], Body(max_length=cfg.BULK_MAX_ITEMS)],
+    db: Session = Depends(get_db),
+):
+    """Создать вложения пачкой в одной транзакции"""
+    ids = crud_mod.bulk_create_attachments(db, [d.model_dump() for d in data])
+    return {"count": len(ids), "ids": ids}
 
 
-@app.get("/attachments/{attachment_id}", response_model=schemas.AttachmentRead, tags=["Attachments"])
-def get_attachment(attachment_id: int, db: Session = Depends(get_db)):
+@router.get("/attachments/", response_model=List[schemas.AttachmentRead], tags=["Attachments"])
+@query_budget(6)
+def list_attachments(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    filters: list = Depends(attachment_filter_params),
+    sort_by: Optional[str] = Query(None, description="Сортировать по полю (created_at,file_name,type,size_kb)"),
+    sort_dir: Optional[str] = Query("asc"),
+    limit: Optional[int] = Query(100, ge=1, description="Не больше MAX_PAGE_SIZE: больший limit урезается, дальше — по X-Next-Cursor"),
+    offset: Optional[int] = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor"),
+    fields: Optional[str] = Query(None, description="Только эти колонки через запятую (id возвращается всегда)"),
+    with_total: Optional[Literal["exact", "approx"]] = Query(None, description="Общее число строк в X-Total-Count: exact или approx (оценка по статистике, если фильтров нет)"),
+):
+    """Список вложений с фильтрами, сортировкой и keyset-пагинацией"""
+    columns = fields_columns(models.Attachment, fields)
+    not_modified = conditional(request, response, version_etag(versions.read(db, "attachments")))
+    if not_modified:
+        return not_modified
+    return _page(db, models.Attachment, filters, response, sort_by, sort_dir, limit, offset, cursor, columns, with_total)
+
+
+@router.get("/attachments/{attachment_id}", response_model=schemas.AttachmentRead, tags=["Attachments"])
+@query_budget(1)
+def get_attachment(attachment_id: int, response: Response, db: Session = Depends(get_db), fields: Optional[str] = Query(None)):
+    columns = fields_columns(models.Attachment, fields)
+    if columns is not None:
+        row = crud_mod.get_fields(db, models.Attachment, attachment_id, columns)
+        if not row:
+            raise HTTPException(status_code=404, detail="Attachment not found")
+        return fastjson.json_response(row, response)
     a = crud_mod.get_attachment(db, attachment_id)
     if not a:
         raise HTTPException(status_code=404, detail="Attachment not found")
     return a
 
 
-@app.put("/attachments/{attachment_id}", response_model=schemas.AttachmentRead, tags=["Attachments"])
+@router.put("/attachments/{attachment_id}", response_model=schemas.AttachmentRead, tags=["Attachments"])
+@query_budget(2)  # на MSSQL таблица с триггерами: INSERT/UPDATE без OUTPUT и SELECT строки
 def update_attachment(attachment_id: int, data: schemas.AttachmentUpdate, db: Session = Depends(get_db)):
     a = crud_mod.update_attachment(db, attachment_id, data.model_dump(exclude_unset=True))
     if not a:
@@ -230,7 +505,7 @@ def update_attachment(attachment_id: int, data: schemas.AttachmentUpdate, db: Se
     return a
 
 
-@app.delete("/attachments/{attachment_id}", tags=["Attachments"])
+@router.delete("/attachments/{attachment_id}", tags=["Attachments"])
 def delete_attachment(attachment_id: int, db: Session = Depends(get_db)):
     ok = crud_mod.delete_attachment(db, attachment_id)
     if not ok:
@@ -238,34 +513,132 @@ def delete_attachment(attachment_id: int, db: Session = Depends(get_db)):
     return JSONResponse({"ok": True})
 
 
+# --- Поиск ---
+@router.get("/search", response_model=List[schemas.SearchHit], tags=["Search"])
+@query_budget(1)
+def search(
+    q: str = Query(..., min_length=1, description="Текст запроса"),
+    kinds: Optional[str] = Query(None, description="Виды через запятую: project,task,comment (по умолчанию все)"),
+    limit: Optional[int] = Query(20, ge=1),
+    offset: Optional[int] = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    """Полнотекстовый поиск по проектам, задачам и комментариям, по убыванию релевантности"""
+    try:
+        kinds_list = search_mod.parse_kinds(kinds)
+        stmt, params = search_mod.search_stmt(db.get_bind().dialect.name, q, kinds_list, min(limit, cfg.MAX_PAGE_SIZE), offset)
+    except search_mod.SearchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return search_mod.as_hits(db.execute(stmt, params))
+
+
+# --- Служебное ---
+@router.get("/admin/pool", tags=["Admin"])
+def admin_pool():
+    """Состояние пула соединений: занято/свободно, overflow, ожидание выдачи и таймауты"""
+    stats = pool_stats()
+    if async_engine is not None:
+        stats["async"] = pool_stats(async_engine)
+    return stats
+
+
+@router.get("/admin/health", tags=["Admin"])
+def admin_health(response: Response, db: Session = Depends(get_db)):
+    """Журнал table_changes: триггеры на месте, сколько строк ждёт свёртки; без триггеров — 503"""
+    report = changes.health(db.connection())
+    changes.triggers_missing = report["triggers_missing"]
+    if report["triggers_missing"]:
+        response.status_code = 503
+    return report
+
+
+@router.get("/admin/aggregates/check", tags=["Admin"])
+def admin_aggregates_check(db: Session = Depends(get_db)):
+    """Сверить поддерживаемые агрегаты с живыми COUNT/SUM по таблицам"""
+    return aggregates.check(db)
+
+
+@router.post("/admin/aggregates/rebuild", tags=["Admin"])
+def admin_aggregates_rebuild(db: Session = Depends(get_db)):
+    """Пересчитать поддерживаемые агрегаты с нуля (если check нашёл расхождение)"""
+    aggregates.rebuild(db)
+    return aggregates.check(db)
+
+
+@router.post("/admin/versions/bump", tags=["Admin"])
+def admin_versions_bump(db: Session = Depends(get_db)):
+    """Сбросить ETag всех списков (например, после записи с выключенными триггерами)"""
+    versions.bump_all(db)
+    return versions.read(db, *versions.TRACKED.values())
+
+
+@router.get("/admin/cache", tags=["Admin"])
+def admin_cache():
+    """Счётчики кэша сущностей: попадания, промахи, вытеснения"""
+    return entity_cache.stats()
+
+
+@router.get("/admin/slow-queries", tags=["Admin"])
+def admin_slow_queries(
+    top: int = Query(20, ge=1, le=500),
+    sort: Literal["total_ms", "max_ms", "mean_ms", "count"] = "total_ms",
+):
+    """Медленные SQL-выражения по отпечаткам: число, время, формы параметров, маршруты и план"""
+    return {**slow_queries.stats(), "queries": slow_queries.top(top, sort)}
+
+
+@router.post("/admin/slow-queries/reset", tags=["Admin"])
+def admin_slow_queries_reset():
+    """Очистить журнал медленных выражений"""
+    slow_queries.clear()
+    return slow_queries.stats()
+
+
+@router.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Метрики процесса в текстовом формате Prometheus"""
+    if not cfg.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 # --- Отчёты и демонстрации функций ---
-@app.get("/reports/tasks_with_project", tags=["Reports"])
-def tasks_with_project(db: Session = Depends(get_db), left: bool = True):
+def _stream_rows(db: Session, stmt, columns, fmt: str):
+    """Построчно сериализовать результат, забирая строки из курсора пачками по EXPORT_CHUNK_SIZE."""
+    result = db.execute(stmt.execution_options(stream_results=True, yield_per=cfg.EXPORT_CHUNK_SIZE))
+    try:
+        if fmt == "csv":
+            yield csv_header(columns)
+        for chunk in result.partitions():
+            yield encode_rows(columns, chunk, fmt)
+    finally:
+        result.close()
+
+
+@router.get("/reports/tasks_with_project", tags=["Reports"])
+@query_budget(1)
+def tasks_with_project(
+    db: Session = Depends(get_db),
+    left: bool = True,
+    format: str = Query("json", pattern="^(json|ndjson|csv)$", description="json — список целиком; ndjson/csv — потоковая выгрузка"),
+):
     """Отчёт: задачи с данными проектов. По умолчанию LEFT JOIN."""
-    if left:
-        q = db.query(models.Task, models.Project).join(models.Project, models.Task.project_id == models.Project.id, isouter=True)
-    else:
-        # INNER JOIN
-        q = db.query(models.Task, models.Project).join(models.Project, models.Task.project_id == models.Project.id)
-    results = []
-    for task, proj in q.all():
-        results.append({
-            "task_id": task.id,
-            "task_name": task.name,
-            "project_id": proj.id if proj else None,
-            "project_name": proj.name if proj else None,
-        })
-    return results
-
-
-@app.get("/reports/project_task_count", tags=["Reports"])
+    stmt = reports.tasks_with_project_stmt(left)
+    columns = reports.TASKS_WITH_PROJECT_COLUMNS
+    if format != "json":
+        return streaming_response(_stream_rows(db, stmt, columns, format), format, "tasks_with_project")
+    return [dict(zip(columns, r)) for r in db.execute(stmt)]
+
+
+@router.get("/reports/project_task_count", tags=["Reports"])
+@query_budget(1)
 def project_task_count(db: Session = Depends(get_db)):
     """Отчёт: количество задач на проект (LEFT JOIN + GROUP BY)."""
-    q = db.query(models.Project.id, models.Project.name, func.count(models.Task.id).label("task_count")).outerjoin(models.Task).group_by(models.Project.id, models.Project.name)
-    return [{"project_id": r[0], "project_name": r[1], "task_count": int(r[2])} for r in q.all()]
+    rows = db.execute(reports.project_task_count_stmt())
+    return [{"project_id": r[0], "project_name": r[1], "task_count": int(r[2])} for r in rows]
 
 
-@app.get("/demo/sets", tags=["Demo"])
+@router.get("/demo/sets", tags=["Demo"])
 def demo_set_operations(db: Session = Depends(get_db)):
     """Демонстрация операций множеств: UNION между именами проектов и задач."""
     from sqlalchemy import union_all, select
@@ -277,8 +650,23 @@ def demo_set_operations(db: Session = Depends(get_db)):
     return [r[0] for r in rows]
 
 
-@app.get("/demo/functions", tags=["Demo"])
+@router.get("/demo/functions", tags=["Demo"])
 def demo_functions(db: Session = Depends(get_db)):
     """Демонстрация встроенных функций: UPPER, LEN."""
     q = db.query(models.Project.id, func.upper(models.Project.name), func.length(models.Project.name)).limit(50)
     return [{"id": r[0], "name_upper": r[1], "name_len": r[2]} for r in q.all()]
+
+
+def create_app(async_mode: bool) -> FastAPI:
+    """Приложение API; при ``async_mode`` (DB_ASYNC) маршруты api_async.py перекрывают синхронные."""
+    app = FastAPI(title="MSSQL Database Viewer API", lifespan=lifespan)
+    app.add_middleware(RequestTimingMiddleware)
+    app.add_middleware(MetricsMiddleware)
+    if async_mode:
+        # асинхронные маршруты регистрируются первыми и перекрывают синхронные с тем же путём и методом
+        app.include_router(api_async.router)
+    app.include_router(router)
+    return app
+
+
+app = create_app(cfg.DB_ASYNC)
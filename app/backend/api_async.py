@@ -0,0 +1,503 @@
+"""Асинхронные эндпоинты (режим DB_ASYNC).
+
+Роутер подключается в ``api.py`` раньше синхронных маршрутов и перекрывает их
+для тех же путей и методов. Запрос, ожидающий MSSQL, не занимает поток из пула
+FastAPI, поэтому число одновременных медленных запросов ограничено пулом
+соединений, а не пулом потоков. Маршруты, которых здесь нет (служебные, демо),
+продолжают работать синхронно.
+"""
+from typing import Annotated, List, Literal, Optional
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import fastjson, pages, schemas
+from .config import config as cfg
+from .crud import crud_async as crud_mod
+from .crud import aggregates, reports, stats, versions
+from .crud import expand as expand_mod
+from .crud import search as search_mod
+from .crud.plans import run_async
+from .deps import (
+    attachment_filter_params,
+    comment_filter_params,
+    fields_columns,
+    get_async_db,
+    project_filter_params,
+    require_filters,
+    task_filter_params,
+)
+from .etags import conditional, content_etag, version_etag
+from .instrumentation import TimedRoute, query_budget
+from .export import csv_header, encode_rows, streaming_response
+from .models import models
+
+router = APIRouter(route_class=TimedRoute)
+
+
+async def _page(db: AsyncSession, *args, **kwargs):
+    return await run_async(db, pages.page_plan(*args, **kwargs))
+
+
+# --- Проекты ---
+@router.post("/projects/", response_model=schemas.ProjectRead, tags=["Projects"])
+@query_budget(2)  # на MSSQL таблица с триггерами: INSERT/UPDATE без OUTPUT и SELECT строки
+async def create_project(data: schemas.ProjectCreate, db: AsyncSession = Depends(get_async_db)):
+    """Создать проект"""
+    return await crud_mod.create_project(db, data.model_dump())
+
+
+@router.get("/projects/", response_model=List[schemas.ProjectRead], tags=["Projects"])
+@query_budget(8)
+async def list_projects(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    filters: list = Depends(project_filter_params),
+    sort_by: Optional[str] = Query(None, description="Сортировать по полю (name,budget,start_date)"),
+    sort_dir: Optional[str] = Query("asc", description="Направление сортировки: asc или desc"),
+    limit: Optional[int] = Query(100, ge=1, description="Не больше MAX_PAGE_SIZE: больший limit урезается, дальше — по X-Next-Cursor"),
+    offset: Optional[int] = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor (keyset-пагинация, offset игнорируется)"),
+    fields: Optional[str] = Query(None, description="Только эти колонки через запятую (id возвращается всегда)"),
+    with_total: Optional[Literal["exact", "approx"]] = Query(None, description="Общее число строк в X-Total-Count: exact или approx (оценка по статистике, если фильтров нет)"),
+):
+    """Список проектов с фильтрацией и сортировкой"""
+    columns = fields_columns(models.Project, fields)
+    # версия читается до запроса списка; при совпадении ETag список не запрашивается
+    not_modified = conditional(request, response, version_etag(await versions.read_async(db, "projects")))
+    if not_modified:
+        return not_modified
+    return await _page(db, models.Project, filters, response, sort_by, sort_dir, limit, offset, cursor, columns, with_total)
+
+
+@router.patch("/projects/", response_model=schemas.BulkWriteResult, tags=["Projects"])
+@query_budget(1)
+async def bulk_update_projects(
+    data: schemas.ProjectUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    filters: list = Depends(project_filter_params),
+):
+    """Обновить все проекты, подходящие под фильтры, одним UPDATE ... WHERE"""
+    require_filters(filters)
+    values = data.model_dump(exclude_unset=True)
+    if not values:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    return {"affected": await crud_mod.bulk_update_projects(db, filters, values)}
+
+
+@router.delete("/projects/", response_model=schemas.BulkWriteResult, tags=["Projects"])
+@query_budget(1)
+async def bulk_delete_projects(db: AsyncSession = Depends(get_async_db), filters: list = Depends(project_filter_params)):
+    """Удалить все проекты, подходящие под фильтры, одним DELETE ... WHERE (дочерние строки — каскадом в БД)"""
+    require_filters(filters)
+    return {"affected": await crud_mod.bulk_delete_projects(db, filters)}
+
+
+@router.get("/projects/aggregate", tags=["Projects"])
+@query_budget(5)
+async def projects_aggregate(db: AsyncSession = Depends(get_async_db)):
+    """Простейшие агрегаты по проектам: count, sum бюджета (из поддерживаемой таблицы aggregate_stats)"""
+    agg = await aggregates.read_async(db, "projects")
+    return {"count": agg["count"], "sum_budget": agg["sum"]}
+
+
+@router.get("/projects/stats", tags=["Projects"])
+@query_budget(1)
+async def projects_stats(
+    db: AsyncSession = Depends(get_async_db),
+    filters: list = Depends(project_filter_params),
+    group_by: Optional[str] = Query(None, description="Поля группировки через запятую (is_active,start_date,end_date)"),
+    metrics: Optional[str] = Query("count", description="Метрики через запятую: count, sum|avg|min|max:budget"),
+):
+    """Сгруппированная статистика одним запросом GROUP BY (те же фильтры, что у списка)"""
+    try:
+        stmt = stats.stats_stmt("projects", group_by, metrics, filters)
+    except stats.StatsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return stats.as_dicts(await db.execute(stmt))
+
+
+@router.get("/projects/{project_id}", response_model=schemas.ProjectExpanded, response_model_exclude_unset=True, tags=["Projects"])
+@query_budget(4)
+async def get_project(
+    project_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    expand: Optional[str] = Query(None, description="Вложенные уровни через точку (tasks.comments.attachments)"),
+    fields: Optional[str] = Query(None, description="Только эти колонки через запятую (id возвращается всегда)"),
+):
+    try:
+        attrs = expand_mod.parse(models.Project, expand)
+    except expand_mod.ExpandError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    columns = fields_columns(models.Project, fields)
+    if columns is not None:
+        if attrs:
+            raise HTTPException(status_code=400, detail="fields cannot be combined with expand")
+        row = await crud_mod.get_fields(db, models.Project, project_id, columns)
+        if not row:
+            raise HTTPException(status_code=404, detail="Project not found")
+        return conditional(request, response, content_etag(row)) or fastjson.json_response(row, response)
+    try:
+        proj = await crud_mod.get_project(db, project_id, attrs)
+    except expand_mod.ExpandTooLarge as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not proj:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return conditional(request, response, content_etag(proj)) or proj
+
+
+@router.put("/projects/{project_id}", response_model=schemas.ProjectRead, tags=["Projects"])
+@query_budget(2)  # на MSSQL таблица с триггерами: INSERT/UPDATE без OUTPUT и SELECT строки
+async def update_project(project_id: int, data: schemas.ProjectUpdate, db: AsyncSession = Depends(get_async_db)):
+    proj = await crud_mod.update_project(db, project_id, data.model_dump(exclude_unset=True))
+    if not proj:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return proj
+
+
+@router.delete("/projects/{project_id}", tags=["Projects"])
+async def delete_project(project_id: int, db: AsyncSession = Depends(get_async_db)):
+    ok = await crud_mod.delete_project(db, project_id)
+    if not ok:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return JSONResponse({"ok": True})
+
+
+# --- Задачи ---
+@router.post("/tasks/", response_model=schemas.TaskRead, tags=["Tasks"])
+@query_budget(2)  # на MSSQL таблица с триггерами: INSERT/UPDATE без OUTPUT и SELECT строки
+async def create_task(data: schemas.TaskCreate, db: AsyncSession = Depends(get_async_db)):
+    """Создать задачу"""
+    return await crud_mod.create_task(db, data.model_dump())
+
+
+@router.post("/tasks/bulk", response_model=schemas.BulkCreateResult, tags=["Tasks"])
+async def bulk_create_tasks(
+    data: Annotated[List[schemas.TaskCreate], Body(max_length=cfg.BULK_MAX_ITEMS)],
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Создать задачи пачкой в одной транзакции; возвращает id в порядке входного списка"""
+    ids = await crud_mod.bulk_create_tasks(db, [d.model_dump() for d in data])
+    return {"count": len(ids), "ids": ids}
+
+
+@router.get("/tasks/", response_model=List[schemas.TaskRead], tags=["Tasks"])
+@query_budget(8)
+async def list_tasks(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    filters: list = Depends(task_filter_params),
+    sort_by: Optional[str] = Query(None),
+    sort_dir: Optional[str] = Query("asc"),
+    limit: Optional[int] = Query(100, ge=1, description="Не больше MAX_PAGE_SIZE: больший limit урезается, дальше — по X-Next-Cursor"),
+    offset: Optional[int] = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor"),
+    fields: Optional[str] = Query(None, description="Только эти колонки через запятую (id возвращается всегда)"),
+    with_total: Optional[Literal["exact", "approx"]] = Query(None, description="Общее число строк в X-Total-Count: exact или approx (оценка по статистике, если фильтров нет)"),
+):
+    """Список задач с фильтрами и сортировкой"""
+    columns = fields_columns(models.Task, fields)
+    # версия читается до запроса списка; при совпадении ETag список не запрашивается
+    not_modified = conditional(request, response, version_etag(await versions.read_async(db, "tasks")))
+    if not_modified:
+        return not_modified
+    return await _page(db, models.Task, filters, response, sort_by, sort_dir, limit, offset, cursor, columns, with_total)
+
+
+@router.patch("/tasks/", response_model=schemas.BulkWriteResult, tags=["Tasks"])
+@query_budget(1)
+async def bulk_update_tasks(
+    data: schemas.TaskUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    filters: list = Depends(task_filter_params),
+):
+    """Обновить все задачи, подходящие под фильтры, одним UPDATE ... WHERE"""
+    require_filters(filters)
+    values = data.model_dump(exclude_unset=True)
+    if not values:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    return {"affected": await crud_mod.bulk_update_tasks(db, filters, values)}
+
+
+@router.delete("/tasks/", response_model=schemas.BulkWriteResult, tags=["Tasks"])
+@query_budget(1)
+async def bulk_delete_tasks(db: AsyncSession = Depends(get_async_db), filters: list = Depends(task_filter_params)):
+    """Удалить все задачи, подходящие под фильтры, одним DELETE ... WHERE"""
+    require_filters(filters)
+    return {"affected": await crud_mod.bulk_delete_tasks(db, filters)}
+
+
+@router.get("/tasks/aggregate", tags=["Tasks"])
+@query_budget(5)
+async def tasks_aggregate(db: AsyncSession = Depends(get_async_db)):
+    """Агрегаты по задачам: count, среднее время (из поддерживаемой таблицы aggregate_stats)"""
+    agg = await aggregates.read_async(db, "tasks")
+    return {"count": agg["count"], "avg_time": agg["sum"] / agg["present"] if agg["present"] else 0.0}
+
+
+@router.get("/tasks/stats", tags=["Tasks"])
+@query_budget(1)
+async def tasks_stats(
+    db: AsyncSession = Depends(get_async_db),
+    filters: list = Depends(task_filter_params),
+    group_by: Optional[str] = Query(None, description="Поля группировки через запятую (status,priority,project_id)"),
+    metrics: Optional[str] = Query("count", description="Метрики через запятую: count, sum|avg|min|max:time_estimation"),
+):
+    """Сгруппированная статистика одним запросом GROUP BY (те же фильтры, что у списка)"""
+    try:
+        stmt = stats.stats_stmt("tasks", group_by, metrics, filters)
+    except stats.StatsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return stats.as_dicts(await db.execute(stmt))
+
+
+@router.get("/tasks/{task_id}", response_model=schemas.TaskExpanded, response_model_exclude_unset=True, tags=["Tasks"])
+@query_budget(3)
+async def get_task(
+    task_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    expand: Optional[str] = Query(None, description="Вложенные уровни через точку (comments.attachments)"),
+    fields: Optional[str] = Query(None, description="Только эти колонки через запятую (id возвращается всегда)"),
+):
+    try:
+        attrs = expand_mod.parse(models.Task, expand)
+    except expand_mod.ExpandError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    columns = fields_columns(models.Task, fields)
+    if columns is not None:
+        if attrs:
+            raise HTTPException(status_code=400, detail="fields cannot be combined with expand")
+        row = await crud_mod.get_fields(db, models.Task, task_id, columns)
+        if not row:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return conditional(request, response, content_etag(row)) or fastjson.json_response(row, response)
+    try:
+        t = await crud_mod.get_task(db, task_id, attrs)
+    except expand_mod.ExpandTooLarge as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not t:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return conditional(request, response, content_etag(t)) or t
+
+
+@router.put("/tasks/{task_id}", response_model=schemas.TaskRead, tags=["Tasks"])
+@query_budget(2)  # на MSSQL таблица с триггерами: INSERT/UPDATE без OUTPUT и SELECT строки
+async def update_task(task_id: int, data: schemas.TaskUpdate, db: AsyncSession = Depends(get_async_db)):
+    t = await crud_mod.update_task(db, task_id, data.model_dump(exclude_unset=True))
+    if not t:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return t
+
+
+@router.delete("/tasks/{task_id}", tags=["Tasks"])
+async def delete_task(task_id: int, db: AsyncSession = Depends(get_async_db)):
+    ok = await crud_mod.delete_task(db, task_id)
+    if not ok:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return JSONResponse({"ok": True})
+
+
+# --- Комментарии ---
+@router.post("/comments/", response_model=schemas.CommentRead, tags=["Comments"])
+@query_budget(2)  # на MSSQL таблица с триггерами: INSERT/UPDATE без OUTPUT и SELECT строки
+async def create_comment(data: schemas.CommentCreate, db: AsyncSession = Depends(get_async_db)):
+    return await crud_mod.create_comment(db, data.model_dump())
+
+
+@router.post("/comments/bulk", response_model=schemas.BulkCreateResult, tags=["Comments"])
+async def bulk_create_comments(
+    data: Annotated[List[schemas.CommentCreate], Body(max_length=cfg.BULK_MAX_ITEMS)],
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Создать комментарии пачкой в одной транзакции"""
+    ids = await crud_mod.bulk_create_comments(db, [d.model_dump() for d in data])
+    return {"count": len(ids), "ids": ids}
+
+
+@router.get("/comments/", response_model=List[schemas.CommentRead], tags=["Comments"])
+@query_budget(6)
+async def list_comments(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    filters: list = Depends(comment_filter_params),
+    sort_by: Optional[str] = Query(None, description="Сортировать по полю (created_at,rating,...)"),
+    sort_dir: Optional[str] = Query("asc"),
+    limit: Optional[int] = Query(100, ge=1, description="Не больше MAX_PAGE_SIZE: больший limit урезается, дальше — по X-Next-Cursor"),
+    offset: Optional[int] = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor"),
+    fields: Optional[str] = Query(None, description="Только эти колонки через запятую (id возвращается всегда)"),
+    with_total: Optional[Literal["exact", "approx"]] = Query(None, description="Общее число строк в X-Total-Count: exact или approx (оценка по статистике, если фильтров нет)"),
+):
+    """Список комментариев с фильтрами, сортировкой и keyset-пагинацией"""
+    columns = fields_columns(models.Comment, fields)
+    not_modified = conditional(request, response, version_etag(await versions.read_async(db, "comments")))
+    if not_modified:
+        return not_modified
+    return await _page(db, models.Comment, filters, response, sort_by, sort_dir, limit, offset, cursor, columns, with_total)
+
+
+@router.get("/comments/{comment_id}", response_model=schemas.CommentRead, tags=["Comments"])
+@query_budget(1)
+async def get_comment(comment_id: int, response: Response, db: AsyncSession = Depends(get_async_db), fields: Optional[str] = Query(None)):
+    columns = fields_columns(models.Comment, fields)
+    if columns is not None:
+        row = await crud_mod.get_fields(db, models.Comment, comment_id, columns)
+        if not row:
+            raise HTTPException(status_code=404, detail="Comment not found")
+        return fastjson.json_response(row, response)
+    c = await crud_mod.get_comment(db, comment_id)
+    if not c:
+        raise HTTPException(status_code=404, detail="Comment not found")
+    return c
+
+
+@router.put("/comments/{comment_id}", response_model=schemas.CommentRead, tags=["Comments"])
+@query_budget(2)  # на MSSQL таблица с триггерами: INSERT/UPDATE без OUTPUT и SELECT строки
+async def update_comment(comment_id: int, data: schemas.CommentUpdate, db: AsyncSession = Depends(get_async_db)):
+    c = await crud_mod.update_comment(db, comment_id, data.model_dump(exclude_unset=True))
+    if not c:
+        raise HTTPException(status_code=404, detail="Comment not found")
+    return c
+
+
+@router.delete("/comments/{comment_id}", tags=["Comments"])
+async def delete_comment(comment_id: int, db: AsyncSession = Depends(get_async_db)):
+    ok = await crud_mod.delete_comment(db, comment_id)
+    if not ok:
+        raise HTTPException(status_code=404, detail="Comment not found")
+    return JSONResponse({"ok": True})
+
+
+# --- Вложения ---
+@router.post("/attachments/", response_model=schemas.AttachmentRead, tags=["Attachments"])
+@query_budget(2)  # на MSSQL таблица с триггерами: INSERT/UPDATE без OUTPUT и SELECT строки
+async def create_attachment(data: schemas.AttachmentCreate, db: AsyncSession = Depends(get_async_db)):
+    return await crud_mod.create_attachment(db, data.model_dump())
+
+
+@router.post("/attachments/bulk", response_model=schemas.BulkCreateResult, tags=["Attachments"])
+async def bulk_create_attachments(
+    data: Annotated[List[schemas.AttachmentCreate], Body(max_length=cfg.BULK_MAX_ITEMS)],
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Создать вложения пачкой в одной транзакции"""
+    ids = await crud_mod.bulk_create_attachments(db, [d.model_dump() for d in data])
+    return {"count": len(ids), "ids": ids}
+
+
+@router.get("/attachments/", response_model=List[schemas.AttachmentRead], tags=["Attachments"])
+@query_budget(6)
+async def list_attachments(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    filters: list = Depends(attachment_filter_params),
+    sort_by: Optional[str] = Query(None, description="Сортировать по полю (created_at,file_name,type,size_kb)"),
+    sort_dir: Optional[str] = Query("asc"),
+    limit: Optional[int] = Query(100, ge=1, description="Не больше MAX_PAGE_SIZE: больший limit урезается, дальше — по X-Next-Cursor"),
+    offset: Optional[int] = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor"),
+    fields: Optional[str] = Query(None, description="Только эти колонки через запятую (id возвращается всегда)"),
+    with_total: Optional[Literal["exact", "approx"]] = Query(None, description="Общее число строк в X-Total-Count: exact или approx (оценка по статистике, если фильтров нет)"),
+):
+    """Список вложений с фильтрами, сортировкой и keyset-пагинацией"""
+    columns = fields_columns(models.Attachment, fields)
+    not_modified = conditional(request, response, version_etag(await versions.read_async(db, "attachments")))
+    if not_modified:
+        return not_modified
+    return await _page(db, models.Attachment, filters, response, sort_by, sort_dir, limit, offset, cursor, columns, with_total)
+
+
+@router.get("/attachments/{attachment_id}", response_model=schemas.AttachmentRead, tags=["Attachments"])
+@query_budget(1)
+async def get_attachment(attachment_id: int, response: Response, db: AsyncSession = Depends(get_async_db), fields: Optional[str] = Query(None)):
+    columns = fields_columns(models.Attachment, fields)
+    if columns is not None:
+        row = await crud_mod.get_fields(db, models.Attachment, attachment_id, columns)
+        if not row:
+            raise HTTPException(status_code=404, detail="Attachment not found")
+        return fastjson.json_response(row, response)
+    a = await crud_mod.get_attachment(db, attachment_id)
+    if not a:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    return a
+
+
+@router.put("/attachments/{attachment_id}", response_model=schemas.AttachmentRead, tags=["Attachments"])
+@query_budget(2)  # на MSSQL таблица с триггерами: INSERT/UPDATE без OUTPUT и SELECT строки
+async def update_attachment(attachment_id: int, data: schemas.AttachmentUpdate, db: AsyncSession = Depends(get_async_db)):
+    a = await crud_mod.update_attachment(db, attachment_id, data.model_dump(exclude_unset=True))
+    if not a:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    return a
+
+
+@router.delete("/attachments/{attachment_id}", tags=["Attachments"])
+async def delete_attachment(attachment_id: int, db: AsyncSession = Depends(get_async_db)):
+    ok = await crud_mod.delete_attachment(db, attachment_id)
+    if not ok:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    return JSONResponse({"ok": True})
+
+
+# --- Поиск ---
+@router.get("/search", response_model=List[schemas.SearchHit], tags=["Search"])
+@query_budget(1)
+async def search(
+    q: str = Query(..., min_length=1, description="Текст запроса"),
+    kinds: Optional[str] = Query(None, description="Виды через запятую: project,task,comment (по умолчанию все)"),
+    limit: Optional[int] = Query(20, ge=1),
+    offset: Optional[int] = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Полнотекстовый поиск по проектам, задачам и комментариям, по убыванию релевантности"""
+    try:
+        kinds_list = search_mod.parse_kinds(kinds)
+        stmt, params = search_mod.search_stmt(db.bind.dialect.name, q, kinds_list, min(limit, cfg.MAX_PAGE_SIZE), offset)
+    except search_mod.SearchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return search_mod.as_hits(await db.execute(stmt, params))
+
+
+# --- Отчёты ---
+async def _stream_rows(db: AsyncSession, stmt, columns, fmt: str):
+    """Построчно сериализовать результат, забирая строки из серверного курсора пачками по EXPORT_CHUNK_SIZE."""
+    result = await db.stream(stmt.execution_options(yield_per=cfg.EXPORT_CHUNK_SIZE))
+    try:
+        if fmt == "csv":
+            yield csv_header(columns)
+        async for chunk in result.partitions():
+            yield encode_rows(columns, chunk, fmt)
+    finally:
+        await result.close()
+
+
+@router.get("/reports/tasks_with_project", tags=["Reports"])
+@query_budget(1)
+async def tasks_with_project(
+    db: AsyncSession = Depends(get_async_db),
+    left: bool = True,
+    format: str = Query("json", pattern="^(json|ndjson|csv)$", description="json — список целиком; ndjson/csv — потоковая выгрузка"),
+):
+    """Отчёт: задачи с данными проектов. По умолчанию LEFT JOIN."""
+    stmt = reports.tasks_with_project_stmt(left)
+    columns = reports.TASKS_WITH_PROJECT_COLUMNS
+    if format != "json":
+        return streaming_response(_stream_rows(db, stmt, columns, format), format, "tasks_with_project")
+    return [dict(zip(columns, r)) for r in await db.execute(stmt)]
+
+
+@router.get("/reports/project_task_count", tags=["Reports"])
+@query_budget(1)
+async def project_task_count(db: AsyncSession = Depends(get_async_db)):
+    """Отчёт: количество задач на проект (LEFT JOIN + GROUP BY)."""
+    rows = await db.execute(reports.project_task_count_stmt())
+    return [{"project_id": r[0], "project_name": r[1], "task_count": int(r[2])} for r in rows]
@@ -0,0 +1,153 @@
+"""Read-through кэш сериализованных сущностей (ProjectRead/TaskRead) для эндпоинтов чтения по id.
+
+Кэш ограничен по размеру (LRU) и по времени жизни записи (TTL). Пути записи
+в ``crud.py`` инвалидируют затронутые записи; set-based операции сбрасывают
+весь раздел сущности. Бэкенд подменяемый: по умолчанию — память процесса,
+``CACHE_BACKEND=redis`` делает кэш общим для нескольких воркеров
+(нужен пакет ``redis``).
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .config import config as cfg
+
+
+class MemoryCacheBackend:
+    """LRU-кэш в памяти процесса с TTL; потокобезопасен."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self, prefix: str = "") -> None:
+        with self._lock:
+            if not prefix:
+                self._data.clear()
+                return
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                del self._data[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._data), "max_entries": self.max_entries,
+                    "evictions": self.evictions, "expirations": self.expirations}
+
+
+class RedisCacheBackend:
+    """Общий для воркеров кэш в Redis: TTL — средствами Redis, вытеснение — политикой maxmemory сервера."""
+
+    def __init__(self, url: str, ttl: float, namespace: str = "mssql-viewer:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis требует пакет redis (pip install redis)") from e
+        self._redis = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.namespace = namespace
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = self._redis.get(self.namespace + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        self._redis.set(self.namespace + key, json.dumps(value, default=str), px=int(self.ttl * 1000))
+
+    def delete(self, key: str) -> None:
+        self._redis.delete(self.namespace + key)
+
+    def clear(self, prefix: str = "") -> None:
+        keys = list(self._redis.scan_iter(match=f"{self.namespace}{prefix}*", count=1000))
+        if keys:
+            self._redis.delete(*keys)
+
+    def stats(self) -> Dict[str, Any]:
+        info = self._redis.info("stats")
+        return {"evictions": info.get("evicted_keys", 0), "expirations": info.get("expired_keys", 0)}
+
+
+class EntityCache:
+    """Кэш сущностей по ключу ``<вид>:<id>`` со счётчиками попаданий и промахов."""
+
+    def __init__(self, backend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kind: str, pk: int) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        value = self.backend.get(f"{kind}:{pk}")
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, kind: str, pk: int, value: Dict[str, Any]) -> None:
+        if self.enabled:
+            self.backend.set(f"{kind}:{pk}", value)
+
+    def invalidate(self, kind: str, pk: int) -> None:
+        if self.enabled:
+            self.backend.delete(f"{kind}:{pk}")
+
+    def invalidate_all(self, *kinds: str) -> None:
+        if self.enabled:
+            for kind in kinds:
+                self.backend.clear(f"{kind}:")
+
+    def clear(self) -> None:
+        self.backend.clear()
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {"enabled": self.enabled, "backend": type(self.backend).__name__,
+                     "hits": self.hits, "misses": self.misses}
+        stats.update(self.backend.stats())
+        return stats
+
+
+def _make_backend():
+    if cfg.CACHE_BACKEND == "redis":
+        return RedisCacheBackend(cfg.CACHE_REDIS_URL, cfg.CACHE_TTL)
+    return MemoryCacheBackend(cfg.CACHE_MAX_ENTRIES, cfg.CACHE_TTL)
+
+
+entity_cache = EntityCache(_make_backend(), enabled=cfg.CACHE_ENABLED)
@@ -10,9 +10,99 @@ else:
 
 root_path = Path(__file__).resolve().parents[1]
 
+
+def _env_bool(name: str, default: str = "0") -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
 # MSSQL
 MSSQL_IP=os.getenv("MSSQL_IP")
 MSSQL_PORT=os.getenv("MSSQL_PORT")
 MSSQL_USER=os.getenv("MSSQL_USER")
 MSSQL_PASSWORD=os.getenv("MSSQL_PASSWORD")
 MSSQL_DATABASE=os.getenv("MSSQL_DATABASE")
+
+# Полная строка подключения SQLAlchemy (перекрывает параметры MSSQL_*), например sqlite:///bench.db
+DATABASE_URL=os.getenv("DATABASE_URL")
+
+# Асинхронный режим: эндпоинты списков, отчётов и CRUD работают через AsyncEngine/AsyncSession
+DB_ASYNC=_env_bool("DB_ASYNC")
+# Строка подключения асинхронного драйвера, например sqlite+aiosqlite:///bench.db;
+# по умолчанию строится из MSSQL_* для mssql+aioodbc
+ASYNC_DATABASE_URL=os.getenv("ASYNC_DATABASE_URL")
+MSSQL_ODBC_DRIVER=os.getenv("MSSQL_ODBC_DRIVER", "ODBC Driver 18 for SQL Server")
+
+# Выгрузка отчётов потоком: сколько строк забирать из курсора за раз
+EXPORT_CHUNK_SIZE=int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+# Массовая вставка: строк в одной пачке INSERT и максимум элементов в одном запросе
+BULK_INSERT_CHUNK_SIZE=int(os.getenv("BULK_INSERT_CHUNK_SIZE", "500"))
+BULK_MAX_ITEMS=int(os.getenv("BULK_MAX_ITEMS", "10000"))
+
+# Свёртка журнала table_changes (из триггеров) в aggregate_stats и table_versions фоновой задачей API: раз в N секунд, 0 — не сворачивать
+STATS_COMPACT_INTERVAL=float(os.getenv("STATS_COMPACT_INTERVAL", "60"))
+# ...и раньше, как только в журнале N строк (проверка раз в STATS_COMPACT_POLL секунд): чтение агрегатов и версий суммирует не больше N строк
+STATS_COMPACT_ROWS=int(os.getenv("STATS_COMPACT_ROWS", "10000"))
+STATS_COMPACT_POLL=float(os.getenv("STATS_COMPACT_POLL", "1"))
+# Без триггеров журнала (schemas/sql/table_changes.sql) старт API падает; 0 — только лог, агрегаты живыми COUNT, списки без ETag
+STATS_REQUIRE_TRIGGERS=_env_bool("STATS_REQUIRE_TRIGGERS", "1")
+
+# Удаление без загрузки дочерних строк: каскад выполняет БД (FK ON DELETE CASCADE)
+PASSIVE_DELETES=_env_bool("PASSIVE_DELETES")
+
+# Пул соединений (QueuePool). Значения по умолчанию совпадают с SQLAlchemy, кроме pre_ping/recycle
+DB_POOL_SIZE=int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW=int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT=float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE=int(os.getenv("DB_POOL_RECYCLE", "1800"))  # секунды, -1 — не пересоздавать
+DB_POOL_PRE_PING=_env_bool("DB_POOL_PRE_PING", "1")
+
+# Кэш GET /projects/{id} и /tasks/{id}: memory (на процесс) или redis (общий для воркеров)
+CACHE_ENABLED=_env_bool("CACHE_ENABLED", "1")
+CACHE_BACKEND=os.getenv("CACHE_BACKEND", "memory")
+CACHE_MAX_ENTRIES=int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_TTL=float(os.getenv("CACHE_TTL", "30"))  # секунды
+CACHE_REDIS_URL=os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+# Условные GET: max-age в Cache-Control списков и ответов по id (0 — прокси хранит, но перепроверяет по ETag)
+HTTP_CACHE_MAX_AGE=int(os.getenv("HTTP_CACHE_MAX_AGE", "0"))
+
+# Жёсткий предел строк в одном ответе списка: больший limit урезается до него
+MAX_PAGE_SIZE=int(os.getenv("MAX_PAGE_SIZE", "1000"))
+
+# Быстрый путь списков: кортежи колонок -> JSON-байты (orjson) без ORM-объектов и повторной валидации Pydantic
+FAST_JSON=_env_bool("FAST_JSON", "1")
+
+# Замеры запросов: число SQL-выражений, время БД и сериализации -> Server-Timing и лог app.requests
+SQL_INSTRUMENTATION=_env_bool("SQL_INSTRUMENTATION", "1")
+SERVER_TIMING=_env_bool("SERVER_TIMING", "1")
+# Проверка @query_budget эндпоинтов: off | warn (в лог) | raise (исключение; включено в тестах)
+QUERY_BUDGET_MODE=os.getenv("QUERY_BUDGET_MODE", "warn").strip().lower()
+
+# Журнал медленных SQL-выражений (GET /admin/slow-queries): порог в мс, снятие планов, предел отпечатков
+SLOW_QUERY_LOG=_env_bool("SLOW_QUERY_LOG", "1")
+SLOW_QUERY_MS=float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_PLANS=_env_bool("SLOW_QUERY_PLANS")
+SLOW_QUERY_MAX_FINGERPRINTS=int(os.getenv("SLOW_QUERY_MAX_FINGERPRINTS", "500"))
+
+# Метрики в формате Prometheus (GET /metrics): счётчики и гистограммы запросов, SQL-выражения, пул
+METRICS_ENABLED=_env_bool("METRICS_ENABLED", "1")
+
+# Создавать таблицы (Base.metadata.create_all) при старте каждого воркера; в боевом режиме main.py — выключено
+DB_CREATE_TABLES=_env_bool("DB_CREATE_TABLES", "1")
+# Потоков для синхронных эндпоинтов и зависимостей (лимитер anyio, по умолчанию у него 40)
+THREADPOOL_SIZE=int(os.getenv("THREADPOOL_SIZE", "40"))
+
+# Сервер (main.py): dev — один процесс с перезагрузкой по изменениям, prod — воркеры без перезагрузки
+SERVER_MODE=os.getenv("SERVER_MODE", "dev").strip().lower()
+SERVER_HOST=os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT=int(os.getenv("SERVER_PORT", "8000"))
+# 0 — по числу ядер
+SERVER_WORKERS=int(os.getenv("SERVER_WORKERS", "0"))
+# auto выбирает uvloop и httptools, если они установлены (uvicorn[standard])
+SERVER_LOOP=os.getenv("SERVER_LOOP", "auto")
+SERVER_HTTP=os.getenv("SERVER_HTTP", "auto")
+SERVER_BACKLOG=int(os.getenv("SERVER_BACKLOG", "2048"))
+SERVER_KEEPALIVE=int(os.getenv("SERVER_KEEPALIVE", "5"))
+# Сколько секунд ждать завершения текущих запросов при остановке
+SERVER_GRACEFUL_TIMEOUT=int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+SERVER_ACCESS_LOG=_env_bool("SERVER_ACCESS_LOG", "1")
@@ -0,0 +1,115 @@
+"""Поддерживаемые агрегаты для /projects/aggregate и /tasks/aggregate.
+
+Таблица ``aggregate_stats`` хранит по строке на отслеживаемую таблицу: число строк,
+сумму и число непустых значений колонки (``projects.budget``,
+``tasks.time_estimation``). Записи попадают в агрегат через журнал ``table_changes``,
+который пополняют триггеры БД (``changes.py``), поэтому эндпоинты читают агрегат
+одним SELECT по ключу (хранимая строка плюс несвёрнутые дельты журнала) вместо
+COUNT/SUM по всей таблице, а результат согласован между воркерами.
+
+Пока триггеров журнала нет (``changes.journal_ok``), хранимая строка не меняется —
+``read_plan`` тогда отдаёт живые COUNT/SUM.
+
+``rebuild`` пересчитывает хранимые строки по живым данным за вычетом журнала,
+``check`` сверяет агрегаты с живыми COUNT/SUM.
+"""
+from typing import Any, Dict, List
+
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models.models import AggregateStat, Project, Task
+from . import changes
+from .changes import Pending
+from .plans import Plan, commit, execute, rollback, run, run_async
+
+# имя строки агрегата -> (модель, отслеживаемая колонка)
+TRACKED = {
+    "projects": (Project, Project.budget),
+    "tasks": (Task, Task.time_estimation),
+}
+
+
+def live_stmt(name: str):
+    model, col = TRACKED[name]
+    return select(func.count(), func.coalesce(func.sum(col), 0), func.count(col)).select_from(model)
+
+
+def rebuild_stmts() -> List:
+    """Пересчитать все агрегаты с нуля (DELETE + INSERT ... SELECT COUNT/SUM).
+
+    Хранится живое значение за вычетом несвёрнутых дельт журнала: их учтёт чтение,
+    а журнал остаётся нетронутым.
+    """
+    s = AggregateStat
+    stmts = [delete(s).where(s.name.in_(list(TRACKED)))]
+    for name in TRACKED:
+        live = live_stmt(name).subquery()
+        n, total, present = live.c
+        p = Pending(name)
+        stmts.append(
+            insert(s).from_select(["name", "row_count", "value_sum", "value_count"],
+                                  select(literal(name), n - p.rows, total - p.total, present - p.present))
+        )
+    return stmts
+
+
+def _as_dict(row) -> Dict[str, Any]:
+    return {"count": int(row.row_count), "sum": float(row.value_sum), "present": int(row.value_count)}
+
+
+def stored_stmt(name: str):
+    s = AggregateStat
+    p = Pending(name)
+    return select(
+        (s.row_count + p.rows).label("row_count"),
+        (s.value_sum + p.total).label("value_sum"),
+        (s.value_count + p.present).label("value_count"),
+    ).where(s.name == name)
+
+
+def rebuild(session: Session) -> None:
+    for stmt in rebuild_stmts():
+        session.execute(stmt)
+    session.commit()
+
+
+def read_plan(name: str) -> Plan:
+    """Агрегат таблицы одной строкой по ключу; при первом обращении строится с нуля."""
+    if not changes.journal_ok():
+        n, total, present = (yield execute(live_stmt(name))).one()
+        return {"count": int(n), "sum": float(total), "present": int(present)}
+    row = (yield execute(stored_stmt(name))).first()
+    if row is None:
+        try:
+            for stmt in rebuild_stmts():
+                yield execute(stmt)
+            yield commit
+        except IntegrityError:
+            # строку параллельно построил другой запрос
+            yield rollback
+        row = (yield execute(stored_stmt(name))).one()
+    return _as_dict(row)
+
+
+def read(session: Session, name: str) -> Dict[str, Any]:
+    return run(session, read_plan(name))
+
+
+async def read_async(session, name: str) -> Dict[str, Any]:
+    return await run_async(session, read_plan(name))
+
+
+def check(session: Session) -> Dict[str, Any]:
+    """Сравнить хранимые агрегаты с живыми COUNT/SUM."""
+    report = {}
+    for name in TRACKED:
+        row = session.execute(stored_stmt(name)).first()
+        n, total, present = session.execute(live_stmt(name)).one()
+        live = {"count": int(n), "sum": float(total), "present": int(present)}
+        stored = _as_dict(row) if row is not None else None
+        consistent = stored is not None and stored["count"] == live["count"] and stored["present"] == live["present"] \
+            and abs(stored["sum"] - live["sum"]) < 0.005
+        report[name] = {"stored": stored, "live": live, "consistent": consistent}
+    return report
@@ -0,0 +1,155 @@
+"""Журнал изменений ``table_changes``, из которого складываются агрегаты и версии таблиц.
+
+Триггеры БД (MSSQL — ``schemas/sql/table_changes.sql``, SQLite —
+``schemas/sql/sqlite/table_changes.sql``, выполняется после create_all) на каждую запись
+в отслеживаемые таблицы добавляют строку с дельтами числа строк, суммы и числа
+непустых значений колонки; каждая строка журнала — ещё одна версия таблицы для ETag
+списков. Журнал только пополняется: у параллельных записей нет общей строки, которую
+обновляла бы каждая транзакция, а путь записи в приложении не выполняет лишних
+выражений. Учитывается любая запись, в том числе в обход API и каскадом FK.
+
+Читатели складывают хранимую строку (``aggregate_stats``, ``table_versions``) с ещё не
+свёрнутыми строками журнала в одном SELECT (``Pending``). ``compact`` сворачивает журнал
+в хранимые строки; его вызывают фоновая задача API раз в ``STATS_COMPACT_INTERVAL``
+секунд и сразу, как только в журнале ``STATS_COMPACT_ROWS`` строк (так чтение суммирует
+ограниченное число строк), и загрузчик. На MSSQL чтение рассчитано на
+READ_COMMITTED_SNAPSHOT (``schemas/sql/read_committed_snapshot.sql``): SELECT видит
+согласованный снимок хранимой строки и журнала и не ждёт незафиксированные строки
+пишущих транзакций.
+
+Без триггеров журнал не пополняется, и версии с агрегатами замирают. ``check_triggers``
+проверяет их при старте API (без триггеров старт падает, если не ``STATS_REQUIRE_TRIGGERS=0``)
+и при каждой плановой свёртке; пока триггеров нет (``journal_ok``), агрегаты считаются
+живыми COUNT/SUM, а списки отдаются без ETag.
+"""
+from pathlib import Path
+from typing import Any, Dict, List
+
+from sqlalchemy import delete, event, func, insert, select, text, update
+
+from ..models.models import AggregateStat, TableChange, TableVersion
+from .db import Base, SessionLocal, engine
+from .search import _split_go
+
+# таблицы, в которые пишут триггеры журнала, и имена триггеров по диалектам
+JOURNALED = ("projects", "tasks", "comments", "attachments")
+_TRIGGERS = {
+    "mssql": lambda table: [f"trg_{table}_changes"],
+    "sqlite": lambda table: [f"changes_{table}_{op}" for op in ("ai", "au", "ad")],
+}
+_TRIGGER_NAMES = {
+    "mssql": "SELECT name FROM sys.triggers WHERE is_disabled = 0",
+    "sqlite": "SELECT name FROM sqlite_master WHERE type = 'trigger'",
+}
+
+# таблицы без триггеров по итогу последней check_triggers; до первой проверки журналу доверяют
+triggers_missing: List[str] = []
+
+_SQLITE_DDL = Path(__file__).resolve().parents[3] / "schemas" / "sql" / "sqlite" / "table_changes.sql"
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_sqlite_triggers(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        for stmt in _split_go(_SQLITE_DDL.read_text(encoding="utf-8")):
+            connection.exec_driver_sql(stmt)
+
+
+def missing_triggers(connection) -> List[str]:
+    """Отслеживаемые таблицы, у которых нет (или выключен) триггер журнала."""
+    dialect = connection.dialect.name
+    if dialect not in _TRIGGERS:
+        return list(JOURNALED)
+    present = set(connection.execute(text(_TRIGGER_NAMES[dialect])).scalars())
+    return [t for t in JOURNALED if not set(_TRIGGERS[dialect](t)) <= present]
+
+
+def health(connection) -> Dict[str, Any]:
+    """Триггеры журнала, число несвёрнутых строк и (на MSSQL) READ_COMMITTED_SNAPSHOT."""
+    report: Dict[str, Any] = {"triggers_missing": missing_triggers(connection),
+                              "pending_rows": pending_rows(connection)}
+    if connection.dialect.name == "mssql":
+        report["read_committed_snapshot"] = bool(connection.execute(text(
+            "SELECT is_read_committed_snapshot_on FROM sys.databases WHERE name = DB_NAME()")).scalar())
+    return report
+
+
+def check_triggers() -> List[str]:
+    """Проверить триггеры своим соединением и запомнить итог для ``journal_ok``."""
+    global triggers_missing
+    with engine.connect() as connection:
+        triggers_missing = missing_triggers(connection)
+    return triggers_missing
+
+
+def journal_ok() -> bool:
+    return not triggers_missing
+
+
+def pending_rows(session) -> int:
+    """Оценка числа строк журнала по ключу (MAX(id) - MIN(id) + 1) — два поиска по индексу, не скан."""
+    c = TableChange
+    low, high = session.execute(select(func.min(c.id), func.max(c.id))).one()
+    return 0 if high is None else high - low + 1
+
+
+class Pending:
+    """Скалярные подзапросы по несвёрнутым строкам журнала таблицы: суммы дельт и число строк.
+
+    ``name`` — имя таблицы или колонка с ним (коррелированный подзапрос).
+    """
+
+    def __init__(self, name):
+        c = TableChange
+
+        def scalar(expr):
+            return select(expr).where(c.name == name).scalar_subquery()
+
+        self.rows = scalar(func.coalesce(func.sum(c.row_delta), 0))
+        self.total = scalar(func.coalesce(func.sum(c.value_sum), 0))
+        self.present = scalar(func.coalesce(func.sum(c.value_count), 0))
+        self.changes = scalar(func.count())
+
+
+def compact(session) -> int:
+    """Свернуть журнал в хранимые строки в транзакции ``session`` (Session или Connection).
+
+    Строки до текущего MAX(id) читаются с блокировкой (UPDLOCK, HOLDLOCK на MSSQL):
+    незафиксированная запись с меньшим id дождётся фиксации и попадёт в эту же свёртку,
+    а DELETE удалит ровно прочитанное. Фиксирует вызывающий. Возвращает число свёрнутых строк.
+    """
+    c = TableChange
+    cutoff = session.execute(select(func.max(c.id))).scalar()
+    if cutoff is None:
+        return 0
+    totals = session.execute(
+        select(c.name, func.count(), func.sum(c.row_delta), func.sum(c.value_sum), func.sum(c.value_count))
+        .with_hint(c, "WITH (UPDLOCK, HOLDLOCK)", "mssql")
+        .where(c.id <= cutoff)
+        .group_by(c.name)
+    ).all()
+    s, v = AggregateStat, TableVersion
+    known = set(session.execute(select(v.name).where(v.name.in_([t[0] for t in totals]))).scalars())
+    for name, n, rows, total, present in totals:
+        # нет строки агрегата — её построит rebuild по живым данным, дельты не нужны
+        session.execute(
+            update(s)
+            .where(s.name == name)
+            .values(row_count=s.row_count + rows, value_sum=s.value_sum + total, value_count=s.value_count + present)
+        )
+        if name in known:
+            session.execute(update(v).where(v.name == name).values(version=v.version + n))
+        else:
+            session.execute(insert(v).values(name=name, version=n))
+    session.execute(delete(c).where(c.id <= cutoff))
+    return sum(n for _, n, *_ in totals)
+
+
+def compact_all(min_rows: int = 0) -> int:
+    """Свернуть журнал своей сессией (фоновая задача API), если в нём не меньше ``min_rows`` строк."""
+    with SessionLocal() as session:
+        if min_rows and pending_rows(session) < min_rows:
+            return 0
+        n = compact(session)
+        session.commit()
+    return n
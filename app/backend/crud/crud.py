@@ -1,136 +1,365 @@
+from sqlalchemy import Integer, bindparam, delete, insert, select, text, update
 from sqlalchemy.orm import Session
 from ..models.models import Project, Task, Comment, Attachment
-from .db import SessionLocal
-from typing import Optional, Dict, Any
+from .. import schemas
+from . import expand
+from ..cache import entity_cache
+from ..config import config as cfg
+from .db import MSSQL_MAX_PARAMS
+from .plans import Plan, commit, execute, get, rollback, run
+from . import plans
+from typing import Optional, Dict, Any, List, Tuple
+
+
+def _mssql_insert_output_into(dialect, model, rows: List[Dict[str, Any]]):
+    """Пакет MSSQL: INSERT ... OUTPUT INSERTED.id INTO @ids SELECT ... FROM (VALUES ...) ORDER BY n.
+
+    OUTPUT с INTO таблице с триггерами разрешён. IDENTITY назначается в порядке ORDER BY,
+    поэтому id из ``@ids`` по возрастанию идут в порядке входных строк.
+    """
+    table = model.__table__
+    quote = dialect.identifier_preparer.quote
+    keys = list(rows[0])
+    cols = ", ".join(quote(k) for k in keys)
+    params, values = [], []
+    for i, row in enumerate(rows):
+        names = []
+        for j, k in enumerate(keys):
+            params.append(bindparam(f"p{i}_{j}", row.get(k), type_=table.c[k].type))
+            names.append(f":p{i}_{j}")
+        values.append(f"({', '.join(names)}, {i})")
+    sql = (
+        "SET NOCOUNT ON; DECLARE @ids TABLE (id INT); "
+        f"INSERT INTO {quote(table.name)} ({cols}) OUTPUT INSERTED.{quote('id')} INTO @ids "
+        f"SELECT {cols} FROM (VALUES {', '.join(values)}) AS v ({cols}, n) ORDER BY n; "
+        "SELECT id FROM @ids ORDER BY id"
+    )
+    return text(sql).bindparams(*params).columns(id=Integer)
+
+
+def _mssql_row_output_into(dialect, table, dml: str, params: List, default_attr: str, data: Dict[str, Any]):
+    """Пакет MSSQL для одной строки: ``INSERT/UPDATE ... OUTPUT INSERTED.* INTO @rows; SELECT ... FROM @rows``.
+
+    Как и в ``_mssql_insert_output_into``, OUTPUT с INTO таблице с триггерами разрешён, так что
+    строка возвращается тем же пакетом, без второго обращения к БД. ``dml`` — шаблон с
+    ``{output}`` и ``{values}``/``{sets}``; Python-умолчания колонок (``default``/``onupdate``,
+    атрибут ``default_attr``) подставляются сами, как это делает insert()/update().
+    """
+    quote = dialect.identifier_preparer.quote
+    values = dict(data)
+    for c in table.columns:
+        default = getattr(c, default_attr)
+        if c.key not in values and default is not None and not default.is_sequence:
+            values[c.key] = default.arg(None) if default.is_callable else default.arg
+    for i, (k, v) in enumerate(values.items()):
+        params.append(bindparam(f"v{i}", v, type_=table.c[k].type))
+    cols = list(table.columns)
+    declare = ", ".join(f"{quote(c.name)} {c.type.compile(dialect=dialect)}" for c in cols)
+    output = "OUTPUT " + ", ".join(f"INSERTED.{quote(c.name)}" for c in cols) + " INTO @rows"
+    sql = (
+        f"SET NOCOUNT ON; DECLARE @rows TABLE ({declare}); "
+        + dml.format(
+            table=quote(table.name), output=output, id=quote("id"),
+            columns=", ".join(quote(table.c[k].name) for k in values),
+            values=", ".join(f":v{i}" for i in range(len(values))),
+            sets=", ".join(f"{quote(table.c[k].name)} = :v{i}" for i, k in enumerate(values)),
+        )
+        + "; SELECT " + ", ".join(quote(c.name) for c in cols) + " FROM @rows"
+    )
+    return text(sql).bindparams(*params).columns(*cols)
+
+
+def _mssql_insert_row(dialect, table, data: Dict[str, Any]):
+    return _mssql_row_output_into(dialect, table, "INSERT INTO {table} ({columns}) {output} VALUES ({values})",
+                                  [], "default", data)
+
+
+def _mssql_update_row(dialect, table, pk: int, data: Dict[str, Any]):
+    return _mssql_row_output_into(dialect, table, "UPDATE {table} SET {sets} {output} WHERE {id} = :pk",
+                                  [bindparam("pk", pk, type_=table.c.id.type)], "onupdate", data)
+
+
+def _insert_batches(dialect, model, chunk: List[Dict[str, Any]]) -> List[Tuple[Any, Any]]:
+    """Выражения (с параметрами) для вставки пачки; каждое отдаёт id своих строк в порядке входа.
+
+    RETURNING/OUTPUT — одним многострочным INSERT. Без него (``_supports_returning``):
+    на MSSQL — OUTPUT ... INTO @ids пакетами до 2000 параметров, на прочих СУБД —
+    построчный INSERT с ``inserted_primary_key``.
+    """
+    if _supports_returning(dialect, model, "insert"):
+        return [(insert(model).returning(model.id, sort_by_parameter_order=True), chunk)]
+    if dialect.name == "mssql":
+        step = max(1, MSSQL_MAX_PARAMS // len(chunk[0]))
+        return [(_mssql_insert_output_into(dialect, model, chunk[i:i + step]), None)
+                for i in range(0, len(chunk), step)]
+    return [(insert(model.__table__), row) for row in chunk]
+
+
+def _batch_ids(result, params) -> List[int]:
+    # одна строка (dict) — INSERT без возврата строк, id из inserted_primary_key
+    return [result.inserted_primary_key[0]] if isinstance(params, dict) else list(result.scalars())
+
+
+# вид строки в кэше сущностей и виды, которые удаляются вместе с ней каскадом FK
+_CACHE_KINDS = {Project: "project", Task: "task"}
+_CASCADE_KINDS = {Project: ("task",)}
+_READ_SCHEMAS = {Project: schemas.ProjectRead, Task: schemas.TaskRead}
+
+
+def _bulk_insert(model, rows: List[Dict[str, Any]]) -> Plan:
+    """Вставить строки многострочными INSERT пачками по BULK_INSERT_CHUNK_SIZE в одной транзакции.
+
+    id возвращаются через RETURNING (на MSSQL — OUTPUT INSERTED) в порядке входных строк.
+    На MSSQL пачка уходит одним INSERT ... SELECT FROM (VALUES ...) с сортировкой по
+    IDENTITY; SQLite не гарантирует порядок RETURNING у многострочного INSERT, поэтому
+    там SQLAlchemy вставляет построчно внутри той же транзакции.
+    Таблице с AFTER-триггерами на MSSQL OUTPUT без INTO недоступен — для неё id
+    собираются через OUTPUT ... INTO (``_insert_batches``).
+    """
+    dialect = yield plans.dialect
+    ids: List[int] = []
+    try:
+        for start in range(0, len(rows), cfg.BULK_INSERT_CHUNK_SIZE):
+            chunk = rows[start:start + cfg.BULK_INSERT_CHUNK_SIZE]
+            for stmt, params in _insert_batches(dialect, model, chunk):
+                ids.extend(_batch_ids((yield execute(stmt, params)), params))
+        yield commit
+    except Exception:
+        yield rollback
+        raise
+    return ids
+
+
+def _bulk_update(model, filters: List, data: Dict[str, Any]) -> Plan:
+    """Один UPDATE ... WHERE по фильтрам без загрузки объектов; возвращает число затронутых строк."""
+    result = yield execute(
+        update(model).where(*filters).values(**data).execution_options(synchronize_session=False)
+    )
+    yield commit
+    if model in _CACHE_KINDS:
+        entity_cache.invalidate_all(_CACHE_KINDS[model])
+    return result.rowcount
+
+
+def _bulk_delete(model, filters: List) -> Plan:
+    """Один DELETE ... WHERE по фильтрам; дочерние строки удаляет БД (FK ON DELETE CASCADE)."""
+    result = yield execute(delete(model).where(*filters).execution_options(synchronize_session=False))
+    yield commit
+    if model in _CACHE_KINDS:
+        entity_cache.invalidate_all(_CACHE_KINDS[model], *_CASCADE_KINDS.get(model, ()))
+    return result.rowcount
+
+
+def _supports_returning(dialect, model, kind: str) -> bool:
+    """Можно ли вернуть строку из INSERT/UPDATE (``kind``) тем же выражением.
+
+    implicit_returning=False ставится таблицам с AFTER-триггерами: MSSQL отвергает
+    OUTPUT без INTO на такой таблице (ошибка 334), и для неё строка возвращается пакетом
+    OUTPUT ... INTO (``_mssql_row_output_into``).
+    RETURNING SQLite триггерам не мешает.
+    """
+    if dialect.name == "mssql" and not model.__table__.implicit_returning:
+        return False
+    return getattr(dialect, f"{kind}_returning", False)
+
+
+def _create(model, data: Dict[str, Any]) -> Plan:
+    """Вставить строку одним INSERT ... RETURNING и вернуть её как dict (см. ``_supports_returning``).
+
+    На MSSQL таблице с триггерами — одним пакетом OUTPUT ... INTO (``_mssql_insert_row``).
+    """
+    table = model.__table__
+    dialect = yield plans.dialect
+    returning = _supports_returning(dialect, model, "insert")
+    if not returning and dialect.name == "mssql":
+        row = (yield execute(_mssql_insert_row(dialect, table, data))).one()
+    elif not returning:
+        # INSERT без RETURNING (id — из inserted_primary_key) и отдельный SELECT строки
+        pk = (yield execute(insert(table).values(**data))).inserted_primary_key[0]
+        row = (yield execute(select(*table.columns).where(table.c.id == pk))).one()
+    else:
+        row = (yield execute(insert(table).values(**data).returning(*table.columns))).one()
+    yield commit
+    return dict(row._mapping)
+
+
+def _update(model, pk: int, data: Dict[str, Any]) -> Plan:
+    """Обновить строку одним UPDATE ... RETURNING без предварительного SELECT; None, если строки нет.
+
+    На MSSQL таблице с триггерами — одним пакетом OUTPUT ... INTO (``_mssql_update_row``),
+    на прочих СУБД без RETURNING — UPDATE и SELECT обновлённой строки.
+    """
+    table = model.__table__
+    if not data:
+        row = (yield execute(select(*table.columns).where(table.c.id == pk))).first()
+        return dict(row._mapping) if row else None
+    dialect = yield plans.dialect
+    returning = _supports_returning(dialect, model, "update")
+    if not returning and dialect.name == "mssql":
+        row = (yield execute(_mssql_update_row(dialect, table, pk, data))).first()
+    elif not returning:
+        if not (yield execute(update(table).where(table.c.id == pk).values(**data))).rowcount:
+            return None
+        row = (yield execute(select(*table.columns).where(table.c.id == pk))).one()
+    else:
+        row = (yield execute(update(table).where(table.c.id == pk).values(**data).returning(*table.columns))).first()
+    yield commit
+    if model in _CACHE_KINDS:
+        entity_cache.invalidate(_CACHE_KINDS[model], pk)
+    return dict(row._mapping) if row else None
+
+
+def _delete(model, pk: int, passive: Optional[bool] = None) -> Plan:
+    """Удалить строку по id.
+
+    В пассивном режиме (PASSIVE_DELETES) выполняется один DELETE, а дочерние строки
+    удаляет сама БД по FK ON DELETE CASCADE. Иначе — прежний путь через ORM-каскад
+    ``all, delete-orphan``, который загружает и удаляет потомков по одному.
+    """
+    if passive is None:
+        passive = cfg.PASSIVE_DELETES
+    if passive:
+        table = model.__table__
+        ok = (yield execute(delete(table).where(table.c.id == pk))).rowcount > 0
+        yield commit
+    else:
+        obj = yield get(model, pk)
+        if obj:
+            yield plans.delete(obj)
+            yield commit
+        ok = bool(obj)
+    if model in _CACHE_KINDS:
+        entity_cache.invalidate(_CACHE_KINDS[model], pk)
+        entity_cache.invalidate_all(*_CASCADE_KINDS.get(model, ()))
+    return ok
+
+
+def _read_cached(model, kind: str, read_schema, pk: int) -> Plan:
+    """Read-through: сериализованная сущность из кэша, при промахе — из БД с сохранением в кэш."""
+    cached = entity_cache.get(kind, pk)
+    if cached is not None:
+        return cached
+    obj = yield get(model, pk)
+    if obj is None:
+        return None
+    value = read_schema.model_validate(obj).model_dump(mode="json")
+    entity_cache.set(kind, pk, value)
+    return value
+
+
+def _read(model, pk: int, expand_attrs: Optional[List] = None) -> Plan:
+    if expand_attrs:
+        return (yield from expand.load_plan(model, pk, expand_attrs))
+    if model in _CACHE_KINDS:
+        return (yield from _read_cached(model, _CACHE_KINDS[model], _READ_SCHEMAS[model], pk))
+    return (yield get(model, pk))
+
+
+def _get_fields(model, pk: int, columns: List) -> Plan:
+    kind = _CACHE_KINDS.get(model)
+    cached = entity_cache.get(kind, pk) if kind else None
+    if cached is not None:
+        return {c.key: cached[c.key] for c in columns}
+    row = (yield execute(select(*columns).where(model.__table__.c.id == pk))).first()
+    return dict(row._mapping) if row else None
+
+
+def get_fields(session: Session, model, pk: int, columns: List) -> Optional[Dict[str, Any]]:
+    """Только колонки ``columns`` строки: из кэша сущностей, если она там есть, иначе суженным SELECT."""
+    return run(session, _get_fields(model, pk, columns))
 
 
 # --- Project CRUD ---
-def create_project(session: Session, data: Dict[str, Any]) -> Project:
-    proj = Project(**data)
-    session.add(proj)
-    session.commit()
-    session.refresh(proj)
-    return proj
+def create_project(session: Session, data: Dict[str, Any]) -> Dict[str, Any]:
+    return run(session, _create(Project, data))
 
 
-def get_project(session: Session, project_id: int) -> Optional[Project]:
-    return session.get(Project, project_id)
+def get_project(session: Session, project_id: int, expand_attrs: Optional[List] = None) -> Optional[Dict[str, Any]]:
+    return run(session, _read(Project, project_id, expand_attrs))
 
 
-def update_project(session: Session, project_id: int, data: Dict[str, Any]) -> Optional[Project]:
-    proj = session.get(Project, project_id)
-    if not proj:
-        return None
-    for k, v in data.items():
-        setattr(proj, k, v)
-    session.commit()
-    session.refresh(proj)
-    return proj
+def update_project(session: Session, project_id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return run(session, _update(Project, project_id, data))
 
 
-def delete_project(session: Session, project_id: int) -> bool:
-    proj = session.get(Project, project_id)
-    if not proj:
-        return False
-    session.delete(proj)
-    session.commit()
-    return True
+def delete_project(session: Session, project_id: int, passive: Optional[bool] = None) -> bool:
+    return run(session, _delete(Project, project_id, passive))
+
+
+def bulk_update_projects(session: Session, filters: List, data: Dict[str, Any]) -> int:
+    return run(session, _bulk_update(Project, filters, data))
+
+
+def bulk_delete_projects(session: Session, filters: List) -> int:
+    return run(session, _bulk_delete(Project, filters))
 
 
 # --- Task CRUD ---
-def create_task(session: Session, data: Dict[str, Any]) -> Task:
-    t = Task(**data)
-    session.add(t)
-    session.commit()
-    session.refresh(t)
-    return t
+def create_task(session: Session, data: Dict[str, Any]) -> Dict[str, Any]:
+    return run(session, _create(Task, data))
 
 
-def get_task(session: Session, task_id: int) -> Optional[Task]:
-    return session.get(Task, task_id)
+def bulk_create_tasks(session: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    return run(session, _bulk_insert(Task, rows))
 
 
-def update_task(session: Session, task_id: int, data: Dict[str, Any]) -> Optional[Task]:
-    t = session.get(Task, task_id)
-    if not t:
-        return None
-    for k, v in data.items():
-        setattr(t, k, v)
-    session.commit()
-    session.refresh(t)
-    return t
+def get_task(session: Session, task_id: int, expand_attrs: Optional[List] = None) -> Optional[Dict[str, Any]]:
+    return run(session, _read(Task, task_id, expand_attrs))
 
 
-def delete_task(session: Session, task_id: int) -> bool:
-    t = session.get(Task, task_id)
-    if not t:
-        return False
-    session.delete(t)
-    session.commit()
-    return True
+def update_task(session: Session, task_id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return run(session, _update(Task, task_id, data))
+
+
+def delete_task(session: Session, task_id: int, passive: Optional[bool] = None) -> bool:
+    return run(session, _delete(Task, task_id, passive))
+
+
+def bulk_update_tasks(session: Session, filters: List, data: Dict[str, Any]) -> int:
+    return run(session, _bulk_update(Task, filters, data))
+
+
+def bulk_delete_tasks(session: Session, filters: List) -> int:
+    return run(session, _bulk_delete(Task, filters))
 
 
 # --- Comment CRUD ---
-def create_comment(session: Session, data: Dict[str, Any]) -> Comment:
-    c = Comment(**data)
-    session.add(c)
-    session.commit()
-    session.refresh(c)
-    return c
+def create_comment(session: Session, data: Dict[str, Any]) -> Dict[str, Any]:
+    return run(session, _create(Comment, data))
+
+
+def bulk_create_comments(session: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    return run(session, _bulk_insert(Comment, rows))
 
 
 def get_comment(session: Session, comment_id: int) -> Optional[Comment]:
-    return session.get(Comment, comment_id)
+    return run(session, _read(Comment, comment_id))
 
 
-def update_comment(session: Session, comment_id: int, data: Dict[str, Any]) -> Optional[Comment]:
-    c = session.get(Comment, comment_id)
-    if not c:
-        return None
-    for k, v in data.items():
-        setattr(c, k, v)
-    session.commit()
-    session.refresh(c)
-    return c
+def update_comment(session: Session, comment_id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return run(session, _update(Comment, comment_id, data))
 
 
-def delete_comment(session: Session, comment_id: int) -> bool:
-    c = session.get(Comment, comment_id)
-    if not c:
-        return False
-    session.delete(c)
-    session.commit()
-    return True
+def delete_comment(session: Session, comment_id: int, passive: Optional[bool] = None) -> bool:
+    return run(session, _delete(Comment, comment_id, passive))
 
 
 # --- Attachment CRUD ---
-def create_attachment(session: Session, data: Dict[str, Any]) -> Attachment:
-    a = Attachment(**data)
-    session.add(a)
-    session.commit()
-    session.refresh(a)
-    return a
+def create_attachment(session: Session, data: Dict[str, Any]) -> Dict[str, Any]:
+    return run(session, _create(Attachment, data))
+
+
+def bulk_create_attachments(session: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    return run(session, _bulk_insert(Attachment, rows))
 
 
 def get_attachment(session: Session, attachment_id: int) -> Optional[Attachment]:
-    return session.get(Attachment, attachment_id)
+    return run(session, _read(Attachment, attachment_id))
 
 
-def update_attachment(session: Session, attachment_id: int, data: Dict[str, Any]) -> Optional[Attachment]:
-    a = session.get(Attachment, attachment_id)
-    if not a:
-        return None
-    for k, v in data.items():
-        setattr(a, k, v)
-    session.commit()
-    session.refresh(a)
-    return a
+def update_attachment(session: Session, attachment_id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return run(session, _update(Attachment, attachment_id, data))
 
 
-def delete_attachment(session: Session, attachment_id: int) -> bool:
-    a = session.get(Attachment, attachment_id)
-    if not a:
-        return False
-    session.delete(a)
-    session.commit()
-    return True
+def delete_attachment(session: Session, attachment_id: int, passive: Optional[bool] = None) -> bool:
+    return run(session, _delete(Attachment, attachment_id, passive))
@@ -0,0 +1,113 @@
+"""Асинхронные версии CRUD-функций (режим DB_ASYNC).
+
+Те же планы запросов, что и в ``crud.py`` (``plans.py``), выполняются через
+``AsyncSession``: пока запрос ждёт БД, поток событий обслуживает другие запросы.
+"""
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.models import Attachment, Comment, Project, Task
+from .crud import _bulk_delete, _bulk_insert, _bulk_update, _create, _delete, _get_fields, _read, _update
+from .plans import run_async
+
+
+async def get_fields(session: AsyncSession, model, pk: int, columns: List) -> Optional[Dict[str, Any]]:
+    """Только колонки ``columns`` строки: из кэша сущностей, если она там есть, иначе суженным SELECT."""
+    return await run_async(session, _get_fields(model, pk, columns))
+
+
+# --- Project CRUD ---
+async def create_project(session: AsyncSession, data: Dict[str, Any]) -> Dict[str, Any]:
+    return await run_async(session, _create(Project, data))
+
+
+async def get_project(session: AsyncSession, project_id: int, expand_attrs: Optional[List] = None) -> Optional[Dict[str, Any]]:
+    return await run_async(session, _read(Project, project_id, expand_attrs))
+
+
+async def update_project(session: AsyncSession, project_id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return await run_async(session, _update(Project, project_id, data))
+
+
+async def delete_project(session: AsyncSession, project_id: int, passive: Optional[bool] = None) -> bool:
+    return await run_async(session, _delete(Project, project_id, passive))
+
+
+async def bulk_update_projects(session: AsyncSession, filters: List, data: Dict[str, Any]) -> int:
+    return await run_async(session, _bulk_update(Project, filters, data))
+
+
+async def bulk_delete_projects(session: AsyncSession, filters: List) -> int:
+    return await run_async(session, _bulk_delete(Project, filters))
+
+
+# --- Task CRUD ---
+async def create_task(session: AsyncSession, data: Dict[str, Any]) -> Dict[str, Any]:
+    return await run_async(session, _create(Task, data))
+
+
+async def bulk_create_tasks(session: AsyncSession, rows: List[Dict[str, Any]]) -> List[int]:
+    return await run_async(session, _bulk_insert(Task, rows))
+
+
+async def get_task(session: AsyncSession, task_id: int, expand_attrs: Optional[List] = None) -> Optional[Dict[str, Any]]:
+    return await run_async(session, _read(Task, task_id, expand_attrs))
+
+
+async def update_task(session: AsyncSession, task_id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return await run_async(session, _update(Task, task_id, data))
+
+
+async def delete_task(session: AsyncSession, task_id: int, passive: Optional[bool] = None) -> bool:
+    return await run_async(session, _delete(Task, task_id, passive))
+
+
+async def bulk_update_tasks(session: AsyncSession, filters: List, data: Dict[str, Any]) -> int:
+    return await run_async(session, _bulk_update(Task, filters, data))
+
+
+async def bulk_delete_tasks(session: AsyncSession, filters: List) -> int:
+    return await run_async(session, _bulk_delete(Task, filters))
+
+
+# --- Comment CRUD ---
+async def create_comment(session: AsyncSession, data: Dict[str, Any]) -> Dict[str, Any]:
+    return await run_async(session, _create(Comment, data))
+
+
+async def bulk_create_comments(session: AsyncSession, rows: List[Dict[str, Any]]) -> List[int]:
+    return await run_async(session, _bulk_insert(Comment, rows))
+
+
+async def get_comment(session: AsyncSession, comment_id: int) -> Optional[Comment]:
+    return await run_async(session, _read(Comment, comment_id))
+
+
+async def update_comment(session: AsyncSession, comment_id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return await run_async(session, _update(Comment, comment_id, data))
+
+
+async def delete_comment(session: AsyncSession, comment_id: int, passive: Optional[bool] = None) -> bool:
+    return await run_async(session, _delete(Comment, comment_id, passive))
+
+
+# --- Attachment CRUD ---
+async def create_attachment(session: AsyncSession, data: Dict[str, Any]) -> Dict[str, Any]:
+    return await run_async(session, _create(Attachment, data))
+
+
+async def bulk_create_attachments(session: AsyncSession, rows: List[Dict[str, Any]]) -> List[int]:
+    return await run_async(session, _bulk_insert(Attachment, rows))
+
+
+async def get_attachment(session: AsyncSession, attachment_id: int) -> Optional[Attachment]:
+    return await run_async(session, _read(Attachment, attachment_id))
+
+
+async def update_attachment(session: AsyncSession, attachment_id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return await run_async(session, _update(Attachment, attachment_id, data))
+
+
+async def delete_attachment(session: AsyncSession, attachment_id: int, passive: Optional[bool] = None) -> bool:
+    return await run_async(session, _delete(Attachment, attachment_id, passive))
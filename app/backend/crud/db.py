@@ -1,10 +1,136 @@
-from sqlalchemy import create_engine
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.backend.config import config as cfg
+from app.backend.metrics import observe_pool_wait
+
+DATABASE_URL = cfg.DATABASE_URL or f"mssql+pymssql://{cfg.MSSQL_USER}:{cfg.MSSQL_PASSWORD}@{cfg.MSSQL_IP}:{cfg.MSSQL_PORT}/{cfg.MSSQL_DATABASE}"
+ASYNC_DATABASE_URL = cfg.ASYNC_DATABASE_URL or (
+    f"mssql+aioodbc://{cfg.MSSQL_USER}:{cfg.MSSQL_PASSWORD}@{cfg.MSSQL_IP}:{cfg.MSSQL_PORT}/{cfg.MSSQL_DATABASE}"
+    f"?driver={cfg.MSSQL_ODBC_DRIVER.replace(' ', '+')}&TrustServerCertificate=yes"
+)
+
+# MSSQL принимает не больше 2100 параметров в запросе; пачки INSERT и списки IN режутся с запасом
+MSSQL_MAX_PARAMS = 2000
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool, который считает выдачи соединений, время ожидания свободного соединения и таймауты.
+
+    Ожидание — только блокирующее чтение очереди пула, когда все соединения заняты:
+    создание нового соединения (overflow) ожиданием не считается, а выдача, которая
+    кончилась таймаутом, попадает только в ``timeouts``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.timeouts = 0
+        queue_get = self._pool.get
+
+        def timed_get(block=True, timeout=None):
+            if not block:
+                return queue_get(block, timeout)
+            started = time.perf_counter()
+            entry = queue_get(block, timeout)  # Empty — это таймаут, его считает _do_get
+            self._record_wait(time.perf_counter() - started)
+            return entry
+
+        self._pool.get = timed_get
+
+    def _record_wait(self, waited: float):
+        with self._stats_lock:
+            self.wait_time_total += waited
+            if waited > self.wait_time_max:
+                self.wait_time_max = waited
+        observe_pool_wait(waited)
+
+    def _do_get(self):
+        try:
+            entry = super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        with self._stats_lock:
+            self.checkouts += 1
+        return entry
+
 
-DATABASE_URL = f"mssql+pymssql://{cfg.MSSQL_USER}:{cfg.MSSQL_PASSWORD}@{cfg.MSSQL_IP}:{cfg.MSSQL_PORT}/{cfg.MSSQL_DATABASE}"
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """То же для AsyncEngine: очередь пула совместима с asyncio."""
 
-engine = create_engine(DATABASE_URL, echo=False, future=True)
+
+def _pool_kwargs(url: str, is_async: bool = False) -> Dict[str, Any]:
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # in-memory SQLite живёт в одном соединении — QueuePool к нему неприменим
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": cfg.DB_POOL_SIZE,
+        "max_overflow": cfg.DB_MAX_OVERFLOW,
+        "pool_timeout": cfg.DB_POOL_TIMEOUT,
+        "pool_recycle": cfg.DB_POOL_RECYCLE,
+        "pool_pre_ping": cfg.DB_POOL_PRE_PING,
+    }
+
+
+def pool_stats(bind: Optional[Engine] = None) -> Dict[str, Any]:
+    """Текущее состояние пула соединений движка (по умолчанию — основного)."""
+    pool = getattr(bind or engine, "sync_engine", bind or engine).pool
+    stats: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+    if isinstance(pool, InstrumentedQueuePool):
+        with pool._stats_lock:
+            stats.update({
+                "checkouts": pool.checkouts,
+                "wait_time_total_ms": round(pool.wait_time_total * 1000, 3),
+                "wait_time_max_ms": round(pool.wait_time_max * 1000, 3),
+                "wait_time_avg_ms": round(pool.wait_time_total * 1000 / pool.checkouts, 3) if pool.checkouts else 0.0,
+                "checkout_timeouts": pool.timeouts,
+            })
+    return stats
+
+
+engine = create_engine(DATABASE_URL, echo=False, future=True, **_pool_kwargs(DATABASE_URL))
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 Base = declarative_base()
+
+
+def make_async_engine(url: str = ASYNC_DATABASE_URL, **kwargs) -> AsyncEngine:
+    return create_async_engine(url, echo=False, **{**_pool_kwargs(url, is_async=True), **kwargs})
+
+
+# асинхронный движок создаётся только в режиме DB_ASYNC: драйвер (aioodbc/aiosqlite) — опциональная зависимость
+async_engine: Optional[AsyncEngine] = make_async_engine() if cfg.DB_ASYNC else None
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=True)
+
+
+@event.listens_for(Engine, "connect")
+def _sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite по умолчанию не проверяет FK и не выполняет ON DELETE CASCADE;
+    # aiosqlite приходит сюда обёрткой SQLAlchemy, а не sqlite3.Connection
+    if isinstance(dbapi_connection, sqlite3.Connection) or "aiosqlite" in type(dbapi_connection).__module__:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
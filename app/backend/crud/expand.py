@@ -0,0 +1,85 @@
+"""Параметр ``expand``: вложенная загрузка Project → Task → Comment → Attachment.
+
+Путь (``tasks.comments.attachments``) проверяется по цепочке relationship();
+каждый уровень дерева — один ``SELECT ... WHERE parent_id IN (...) ORDER BY parent_id, id``
+независимо от числа дочерних строк. Уровень читает не больше ``MAX_PAGE_SIZE + 1``
+строк: если потомков больше ``MAX_PAGE_SIZE``, запрос отклоняется (``ExpandTooLarge``,
+ответ 400), а не собирает в памяти дерево неограниченного размера — такие
+потомки выбираются списками с фильтром по родителю и пагинацией.
+"""
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+
+from .. import schemas
+from ..config import config as cfg
+from ..models.models import Attachment, Comment, Project, Task
+from .plans import Plan, execute
+
+
+class ExpandError(ValueError):
+    """Неизвестный уровень в пути expand."""
+
+
+class ExpandTooLarge(ExpandError):
+    """Уровень дерева expand содержит больше MAX_PAGE_SIZE строк."""
+
+
+RELATIONS = {
+    Project: {"tasks": Project.tasks},
+    Task: {"comments": Task.comments},
+    Comment: {"attachments": Comment.attachments},
+}
+READ_SCHEMAS = {
+    Project: schemas.ProjectRead,
+    Task: schemas.TaskRead,
+    Comment: schemas.CommentRead,
+    Attachment: schemas.AttachmentRead,
+}
+
+
+def parse(model, expand: Optional[str]) -> List:
+    """``tasks.comments`` -> [Project.tasks, Task.comments]; пустой список, если expand не задан."""
+    attrs = []
+    for name in [p for p in (expand or "").split(".") if p]:
+        attr = RELATIONS.get(model, {}).get(name)
+        if attr is None:
+            raise ExpandError(f"Unknown expand path: {expand}")
+        attrs.append(attr)
+        model = attr.property.mapper.class_
+    return attrs
+
+
+def _dump(model, row) -> Dict[str, Any]:
+    return READ_SCHEMAS[model].model_validate(dict(row._mapping)).model_dump(mode="json")
+
+
+def load_plan(model, pk: int, attrs: List) -> Plan:
+    """Строка ``pk`` с загруженными по ``attrs`` уровнями во вложенных dict; None, если строки нет."""
+    table = model.__table__
+    row = (yield execute(select(*table.columns).where(table.c.id == pk))).first()
+    if row is None:
+        return None
+    root = _dump(model, row)
+    level = {root["id"]: root}
+    for attr in attrs:
+        child = attr.property.mapper.class_
+        ct = child.__table__
+        fk = attr.property.local_remote_pairs[0][1]
+        for node in level.values():
+            node[attr.key] = []
+        if not level:
+            break
+        rows = (yield execute(
+            select(*ct.columns).where(fk.in_(list(level))).order_by(fk, ct.c.id).limit(cfg.MAX_PAGE_SIZE + 1)
+        )).all()
+        if len(rows) > cfg.MAX_PAGE_SIZE:
+            raise ExpandTooLarge(f"expand level '{attr.key}' has more than {cfg.MAX_PAGE_SIZE} rows; "
+                                 f"use the {ct.name} list endpoint with filters and pagination")
+        nxt = {}
+        for r in rows:
+            node = _dump(child, r)
+            level[r._mapping[fk]][attr.key].append(node)
+            nxt[node["id"]] = node
+        level = nxt
+    return root
@@ -0,0 +1,36 @@
+"""Параметр ``fields``: выборка только запрошенных колонок.
+
+Список полей проверяется по колонкам таблицы модели и сужает сам ``SELECT``,
+поэтому большие ``Text``-колонки (``projects.description``, ``comments.message``)
+не читаются с диска MSSQL и не передаются по сети, если их не просили.
+``id`` возвращается всегда; колонка сортировки при keyset-пагинации
+дочитывается для курсора, но в ответ не попадает.
+"""
+from typing import List, Optional
+
+
+class FieldsError(ValueError):
+    """Поле не является колонкой таблицы."""
+
+
+def parse(model, fields: Optional[str]) -> Optional[List]:
+    """``name,status`` -> [id, name, status] (колонки таблицы); None, если fields не задан."""
+    if fields is None:
+        return None
+    table = model.__table__
+    names = ["id"]
+    for name in (f.strip() for f in fields.split(",")):
+        if not name:
+            continue
+        if name not in table.columns:
+            raise FieldsError(f"Unknown field: {name}")
+        if name not in names:
+            names.append(name)
+    return [table.c[n] for n in names]
+
+
+def with_sort_column(model, columns: List, sort_by: Optional[str]) -> List:
+    """Колонки для SELECT: запрошенные плюс колонка сортировки, из которой строится курсор."""
+    if sort_by and sort_by in model.__table__.columns and all(c.key != sort_by for c in columns):
+        return columns + [model.__table__.c[sort_by]]
+    return columns
@@ -0,0 +1,84 @@
+"""Условия WHERE для списочных и set-based эндпоинтов.
+
+Одни и те же фильтры используются в выборке списка и в массовых UPDATE/DELETE,
+поэтому собираются здесь в виде списка выражений SQLAlchemy.
+"""
+from datetime import datetime
+from typing import List, Optional
+
+from ..models.models import Attachment, Comment, Project, Task
+
+
+def project_filters(
+    name: Optional[str] = None,
+    min_budget: Optional[float] = None,
+    max_budget: Optional[float] = None,
+    is_active: Optional[bool] = None,
+) -> List:
+    clauses = []
+    if name:
+        clauses.append(Project.name.ilike(f"%{name}%"))
+    if min_budget is not None:
+        clauses.append(Project.budget >= min_budget)
+    if max_budget is not None:
+        clauses.append(Project.budget <= max_budget)
+    if is_active is not None:
+        clauses.append(Project.is_active == is_active)
+    return clauses
+
+
+def task_filters(
+    project_id: Optional[int] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+) -> List:
+    clauses = []
+    if project_id is not None:
+        clauses.append(Task.project_id == project_id)
+    if status:
+        clauses.append(Task.status == status)
+    if priority:
+        clauses.append(Task.priority == priority)
+    return clauses
+
+
+def comment_filters(
+    task_id: Optional[int] = None,
+    author: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    min_rating: Optional[int] = None,
+    max_rating: Optional[int] = None,
+) -> List:
+    clauses = []
+    if task_id is not None:
+        clauses.append(Comment.task_id == task_id)
+    if author:
+        clauses.append(Comment.author == author)
+    if created_from is not None:
+        clauses.append(Comment.created_at >= created_from)
+    if created_to is not None:
+        clauses.append(Comment.created_at < created_to)
+    if min_rating is not None:
+        clauses.append(Comment.rating >= min_rating)
+    if max_rating is not None:
+        clauses.append(Comment.rating <= max_rating)
+    return clauses
+
+
+def attachment_filters(
+    comment_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    is_visible: Optional[bool] = None,
+) -> List:
+    clauses = []
+    if comment_id is not None:
+        clauses.append(Attachment.comment_id == comment_id)
+    if created_from is not None:
+        clauses.append(Attachment.created_at >= created_from)
+    if created_to is not None:
+        clauses.append(Attachment.created_at < created_to)
+    if is_visible is not None:
+        clauses.append(Attachment.is_visible == is_visible)
+    return clauses
@@ -0,0 +1,290 @@
+"""Потоковая массовая загрузка строк в projects/tasks/comments/attachments (``scripts/load_data.py``).
+
+Строки читаются из CSV/NDJSON (или генерируются детерминированно) и идут пачками:
+пачка проверяется схемой ``*Create`` одним вызовом Pydantic, родительские ключи
+пересчитываются, пачка вставляется и фиксируется своей транзакцией.
+
+Ключи. Колонка ``id`` во входных данных — ключ источника. При загрузке в непустую
+таблицу он сдвигается на текущий ``MAX(id)`` таблицы (``keep_ids`` оставляет как есть),
+ссылки детей на родителя, загружаемого в этом же запуске, сдвигаются на тот же шаг.
+Ссылки на родителей, которых в запуске нет, считаются id уже существующих строк и
+проверяются пачкой ``SELECT id ... IN (...)``. Строки без ``id`` получают IDENTITY.
+Сдвиг рассчитан на то, что во время загрузки в таблицы никто больше не пишет.
+
+Вставка: на MSSQL — многострочные ``INSERT ... VALUES`` до 1000 строк и 2000
+параметров (pymssql выполняет ``executemany`` построчно), на остальных СУБД —
+``executemany`` драйвера. Триггеры записывают загрузку в журнал ``table_changes``
+(версии таблиц меняются сразу); ``finalize`` сворачивает его и пересчитывает
+``aggregate_stats`` — строк агрегатов до загрузки могло ещё не быть.
+"""
+import csv
+import json
+import random
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import func, insert, select
+
+from .. import schemas
+from ..models.models import Attachment, Comment, Project, Task
+from . import aggregates, changes
+from .db import MSSQL_MAX_PARAMS
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - orjson указан в requirements.txt
+    _loads = json.loads
+
+# таблица -> (модель, схема, (поле FK, родительская таблица)); порядок — порядок загрузки
+TABLES: Dict[str, Tuple[Any, Any, Optional[Tuple[str, str]]]] = {
+    "projects": (Project, schemas.ProjectCreate, None),
+    "tasks": (Task, schemas.TaskCreate, ("project_id", "projects")),
+    "comments": (Comment, schemas.CommentCreate, ("task_id", "tasks")),
+    "attachments": (Attachment, schemas.AttachmentCreate, ("comment_id", "comments")),
+}
+
+_MSSQL_MAX_ROWS = 1000
+_ERRORS_KEPT = 5
+
+
+class LoadError(ValueError):
+    """Неверный входной файл или строк с ошибками больше допустимого."""
+
+
+def table_for(path: Path) -> str:
+    """Таблица по имени файла: ``tasks.csv``, ``tasks-2024.ndjson`` -> tasks."""
+    stem = path.name.split(".")[0].lower()
+    for name in TABLES:
+        if stem == name or stem.startswith(name + "-") or stem.startswith(name + "_"):
+            return name
+    raise LoadError(f"Cannot infer table from file name: {path.name}")
+
+
+def read_csv(path: Path) -> Iterator[Dict[str, Any]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            # пустая ячейка — NULL; остальное приводит Pydantic
+            yield {k: (v if v != "" else None) for k, v in row.items()}
+
+
+def read_ndjson(path: Path) -> Iterator[Dict[str, Any]]:
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield _loads(line)
+
+
+def read_file(path: Path) -> Iterator[Dict[str, Any]]:
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        return read_csv(path)
+    if suffix in (".ndjson", ".jsonl"):
+        return read_ndjson(path)
+    raise LoadError(f"Unsupported file format: {path.name} (expected .csv, .ndjson or .jsonl)")
+
+
+def write_ndjson(path: Path, rows: Iterable[Dict[str, Any]]) -> int:
+    from ..fastjson import dumps
+
+    n = 0
+    with open(path, "wb") as f:
+        for row in rows:
+            f.write(dumps(row) + b"\n")
+            n += 1
+    return n
+
+
+def _batches(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def validate(schema, batch: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Tuple[int, str]]]:
+    """Проверить пачку одним вызовом; при ошибке — построчно, чтобы найти плохие строки.
+
+    Возвращает (словари для вставки с ``id`` источника, [(номер строки в пачке, ошибка)]).
+    """
+    ids = [row.get("id") for row in batch]
+    try:
+        items = TypeAdapter(List[schema]).validate_python(batch)
+        return [_with_id(item.model_dump(), i) for item, i in zip(items, ids)], []
+    except ValidationError:
+        pass
+    valid, rejected = [], []
+    for n, (row, i) in enumerate(zip(batch, ids)):
+        try:
+            valid.append(_with_id(schema.model_validate(row).model_dump(), i))
+        except ValidationError as e:
+            rejected.append((n, str(e.errors()[0]["loc"]) + ": " + e.errors()[0]["msg"]))
+    return valid, rejected
+
+
+def _with_id(data: Dict[str, Any], source_id: Any) -> Dict[str, Any]:
+    if source_id is not None:
+        data["id"] = int(source_id)
+    return data
+
+
+def _existing_ids(conn, model, ids: List[int]) -> set:
+    found = set()
+    for start in range(0, len(ids), MSSQL_MAX_PARAMS):
+        part = ids[start:start + MSSQL_MAX_PARAMS]
+        found.update(conn.execute(select(model.id).where(model.id.in_(part))).scalars())
+    return found
+
+
+def insert_rows(conn, model, rows: List[Dict[str, Any]]) -> None:
+    """Вставить строки (одинаковый набор ключей) пачками под диалект."""
+    if not rows:
+        return
+    table = model.__table__
+    if conn.dialect.name != "mssql":
+        conn.execute(insert(table), rows)
+        return
+    explicit_ids = "id" in rows[0]
+    if explicit_ids:
+        conn.exec_driver_sql(f"SET IDENTITY_INSERT {table.name} ON")
+    try:
+        size = max(1, min(_MSSQL_MAX_ROWS, MSSQL_MAX_PARAMS // len(rows[0])))
+        for start in range(0, len(rows), size):
+            conn.execute(insert(table).values(rows[start:start + size]))
+    finally:
+        if explicit_ids:
+            conn.exec_driver_sql(f"SET IDENTITY_INSERT {table.name} OFF")
+
+
+def id_offset(conn, name: str, keep_ids: bool) -> int:
+    if keep_ids:
+        return 0
+    model = TABLES[name][0]
+    return conn.execute(select(func.coalesce(func.max(model.id), 0))).scalar_one()
+
+
+def load_table(conn, name: str, rows: Iterable[Dict[str, Any]], offsets: Dict[str, int], *,
+               batch_size: int = 5000, keep_ids: bool = False, check: bool = True,
+               max_errors: int = 0) -> Dict[str, Any]:
+    """Загрузить поток строк в таблицу ``name``; каждая пачка — своя транзакция.
+
+    ``offsets`` — сдвиги id уже загруженных в этом запуске таблиц; сдвиг ``name``
+    добавляется в него. ``check=False`` пропускает проверку схемой (доверенные данные
+    генератора). Возвращает отчёт: rows, rejected, seconds, rows_per_sec, errors.
+    """
+    model, schema, parent = TABLES[name]
+    offset = offsets[name] = id_offset(conn, name, keep_ids)
+    conn.commit()
+    report: Dict[str, Any] = {"table": name, "rows": 0, "rejected": 0, "errors": []}
+
+    def reject(where: str, error: str):
+        report["rejected"] += 1
+        if len(report["errors"]) < _ERRORS_KEPT:
+            report["errors"].append(f"{where}: {error}")
+        if report["rejected"] > max_errors:
+            raise LoadError(f"{name}: {report['rejected']} invalid rows (max {max_errors}); first: "
+                            + "; ".join(report["errors"]))
+
+    started = time.perf_counter()
+    line = 0
+    for batch in _batches(rows, batch_size):
+        if check:
+            valid, rejected = validate(schema, batch)
+            for n, error in rejected:
+                reject(f"row {line + n + 1}", error)
+        else:
+            valid = [dict(row) for row in batch]
+        line += len(batch)
+
+        if offset:
+            for row in valid:
+                if "id" in row:
+                    row["id"] += offset
+        if parent:
+            fk, parent_name = parent
+            if parent_name in offsets:
+                shift = offsets[parent_name]
+                if shift:
+                    for row in valid:
+                        row[fk] += shift
+            else:
+                present = _existing_ids(conn, TABLES[parent_name][0], sorted({row[fk] for row in valid}))
+                kept = [row for row in valid if row[fk] in present]
+                for row in valid:
+                    if row[fk] not in present:
+                        reject(f"rows {line - len(batch) + 1}-{line}", f"{fk}={row[fk]} not found in {parent_name}")
+                valid = kept
+
+        try:
+            insert_rows(conn, model, [row for row in valid if "id" in row])
+            insert_rows(conn, model, [row for row in valid if "id" not in row])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        report["rows"] += len(valid)
+
+    report["seconds"] = time.perf_counter() - started
+    report["rows_per_sec"] = report["rows"] / report["seconds"] if report["seconds"] else 0.0
+    return report
+
+
+def finalize(conn) -> None:
+    """Свернуть журнал изменений после загрузки и пересчитать агрегаты."""
+    changes.compact(conn)
+    for stmt in aggregates.rebuild_stmts():
+        conn.execute(stmt)
+    conn.commit()
+
+
+_STATUSES = ("open", "in_progress", "review", "done")
+_PRIORITIES = ("low", "medium", "high", "critical")
+_WORDS = ("alpha", "beta", "gamma", "delta", "release", "backend", "frontend", "database", "report",
+          "migration", "index", "search", "cache", "deploy", "review", "customer", "invoice", "budget")
+_TYPES = ("text", "image", "pdf", "archive")
+_EPOCH = datetime(2024, 1, 1)
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def generate(name: str, count: int, per_parent: int = 1, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Детерминированные синтетические строки таблицы с id 1..count.
+
+    Родитель строки ``i`` — ``(i - 1) // per_parent + 1``; одинаковые аргументы дают
+    одинаковые данные (генератор инициализируется от ``seed`` и имени таблицы).
+    """
+    rng = random.Random(f"{seed}:{name}")
+    for i in range(1, count + 1):
+        parent_id = (i - 1) // per_parent + 1
+        if name == "projects":
+            start = date(2024, 1, 1) + timedelta(days=rng.randrange(365))
+            yield {"id": i, "name": f"Project {i} {_text(rng, 2)}", "description": _text(rng, 12),
+                   "start_date": start, "end_date": start + timedelta(days=rng.randrange(30, 400)),
+                   "budget": round(rng.uniform(1_000, 1_000_000), 2), "is_active": rng.random() < 0.8}
+        elif name == "tasks":
+            yield {"id": i, "project_id": parent_id, "name": f"Task {i} {_text(rng, 3)}",
+                   "priority": rng.choice(_PRIORITIES), "status": rng.choice(_STATUSES),
+                   "period_of_execution": date(2024, 1, 1) + timedelta(days=rng.randrange(730)),
+                   "time_estimation": rng.randrange(1, 80)}
+        elif name == "comments":
+            yield {"id": i, "task_id": parent_id, "author": f"user{rng.randrange(500)}",
+                   "message": _text(rng, rng.randrange(5, 30)),
+                   "created_at": _EPOCH + timedelta(seconds=rng.randrange(63_072_000)),
+                   "is_edit": rng.random() < 0.1, "rating": rng.randrange(1, 6)}
+        elif name == "attachments":
+            kind = rng.choice(_TYPES)
+            yield {"id": i, "comment_id": parent_id, "file_name": f"file{i}.{kind}", "type": kind,
+                   "size_kb": rng.randrange(1, 50_000),
+                   "created_at": _EPOCH + timedelta(seconds=rng.randrange(63_072_000)),
+                   "is_visible": rng.random() < 0.95}
+        else:
+            raise LoadError(f"Unknown table: {name}")
@@ -0,0 +1,130 @@
+"""Сортировка и постраничная выдача для списочных эндпоинтов.
+
+Поддерживаются два режима:
+- offset/limit — прежний режим, сохранён для обратной совместимости;
+- keyset (cursor) — страница начинается сразу после последней строки предыдущей
+  по ключу ``(колонка сортировки, id)``, поэтому стоимость любой страницы одинакова.
+
+Курсор — непрозрачная base64-строка; внутри лежат поле и направление сортировки,
+значение колонки сортировки и id последней строки страницы.
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_
+
+
+class CursorError(ValueError):
+    """Курсор повреждён или не соответствует параметрам сортировки."""
+
+
+def sort_column(model, sort_by: Optional[str]):
+    """Вернуть атрибут-колонку модели для сортировки или None, если поля нет в таблице."""
+    if sort_by and sort_by in model.__table__.columns:
+        return getattr(model, sort_by)
+    return None
+
+
+def _dump_value(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _load_value(col, value: Any) -> Any:
+    if value is None:
+        return None
+    python_type = col.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is Decimal:
+        return Decimal(value)
+    return python_type(value)
+
+
+def encode_cursor(sort_by: Optional[str], sort_dir: str, value: Any, last_id: int) -> str:
+    payload = json.dumps([sort_by, sort_dir, _dump_value(value), last_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[str], str, Any, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_by, sort_dir, value, last_id = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise CursorError("Invalid cursor") from e
+    if not isinstance(last_id, int):
+        raise CursorError("Invalid cursor")
+    return sort_by, sort_dir, value, last_id
+
+
+def keyset_clause(col, id_col, desc: bool, value: Any, last_id: int):
+    """Условие «строго после (value, last_id)» в порядке сортировки.
+
+    И MSSQL, и SQLite считают NULL наименьшим значением: при asc NULL идут первыми,
+    при desc — последними. Условие повторяет этот порядок, поэтому колонка может
+    быть nullable (budget, start_date и т.п.). Ведущее ``col >= value`` / ``col <= value``
+    оставлено отдельным конъюнктом, чтобы оптимизатор мог искать по индексу
+    ``(col, id)``: MSSQL не поддерживает сравнение кортежей ``(col, id) > (...)``.
+    """
+    if col is None:
+        return id_col < last_id if desc else id_col > last_id
+    if desc:
+        if value is None:
+            return and_(col.is_(None), id_col < last_id)
+        return or_(and_(col <= value, or_(col < value, id_col < last_id)), col.is_(None))
+    if value is None:
+        return or_(col.isnot(None), and_(col.is_(None), id_col > last_id))
+    return and_(col >= value, or_(col > value, id_col > last_id))
+
+
+def paginate(q, model, sort_by: Optional[str], sort_dir: Optional[str], limit: int,
+             offset: int = 0, cursor: Optional[str] = None):
+    """Применить сортировку и offset- либо keyset-пагинацию к запросу.
+
+    ``id`` всегда добавляется последним ключом сортировки, чтобы порядок был
+    детерминирован и из последней строки можно было построить курсор.
+    Работает как с ``Query``, так и с ``Select``.
+    """
+    col = sort_column(model, sort_by)
+    # без поля сортировки порядок — по id asc, sort_dir игнорируется (как и раньше)
+    desc = col is not None and sort_dir == "desc"
+    id_col = model.id
+    if cursor:
+        c_sort_by, c_sort_dir, value, last_id = decode_cursor(cursor)
+        if c_sort_by != (sort_by if col is not None else None) or (c_sort_dir == "desc") != desc:
+            raise CursorError("Cursor does not match sort_by/sort_dir")
+        try:
+            value = _load_value(col, value) if col is not None else None
+        except (ValueError, TypeError) as e:
+            raise CursorError("Invalid cursor") from e
+        q = q.where(keyset_clause(col, id_col, desc, value, last_id))
+    if col is None:
+        order = [id_col.asc()]
+    elif desc:
+        order = [col.desc(), id_col.desc()]
+    else:
+        order = [col.asc(), id_col.asc()]
+    q = q.order_by(*order)
+    if not cursor and offset:
+        q = q.offset(offset)
+    return q.limit(limit)
+
+
+def next_cursor(rows: Sequence[Any], model, sort_by: Optional[str], sort_dir: Optional[str],
+                limit: int) -> Optional[str]:
+    """Курсор следующей страницы или None, если страница неполная (данных больше нет)."""
+    if not rows or len(rows) < limit:
+        return None
+    col = sort_column(model, sort_by)
+    last = rows[-1]
+    if col is None:
+        return encode_cursor(None, "asc", None, last.id)
+    return encode_cursor(sort_by, "desc" if sort_dir == "desc" else "asc", getattr(last, sort_by), last.id)
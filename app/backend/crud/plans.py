@@ -0,0 +1,80 @@
+"""Общая логика синхронного и асинхронного режимов (DB_ASYNC): планы запросов.
+
+План — генератор, который отдаёт операции над сессией (функции от сессии, например
+``execute(stmt)``) и получает обратно их результаты; ошибка операции бросается
+в план в точке ``yield`` (``except IntegrityError`` работает как обычно). Запросы,
+ветвления и сброс кэша пишутся один раз, а режимы различаются только исполнителем:
+``run`` выполняет план на ``Session``, ``run_async`` — на ``AsyncSession``,
+дожидаясь awaitable-результатов операций.
+
+    def _read(model, pk):
+        row = (yield execute(select(model).where(model.id == pk))).first()
+        return row
+
+    run(session, _read(Task, 1))                # crud.py, api.py
+    await run_async(session, _read(Task, 1))    # crud_async.py, api_async.py
+"""
+import inspect
+from typing import Any, Callable, Generator
+
+Plan = Generator[Callable[[Any], Any], Any, Any]
+
+
+def execute(stmt, params=None):
+    return lambda session: session.execute(stmt, params)
+
+
+def scalars(stmt):
+    return lambda session: session.scalars(stmt)
+
+
+def get(model, pk):
+    return lambda session: session.get(model, pk)
+
+
+def delete(obj):
+    # AsyncSession.delete сам дозагружает потомков для ORM-каскада
+    return lambda session: session.delete(obj)
+
+
+def commit(session):
+    return session.commit()
+
+
+def rollback(session):
+    return session.rollback()
+
+
+def dialect(session):
+    return session.get_bind().dialect
+
+
+def run(session, plan: Plan) -> Any:
+    """Выполнить план на синхронной сессии (или Connection) и вернуть его результат."""
+    send, value = plan.send, None
+    while True:
+        try:
+            op = send(value)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            value, send = op(session), plan.send
+        except Exception as exc:
+            value, send = exc, plan.throw
+
+
+async def run_async(session, plan: Plan) -> Any:
+    """То же, что ``run``, для AsyncSession."""
+    send, value = plan.send, None
+    while True:
+        try:
+            op = send(value)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            value = op(session)
+            if inspect.isawaitable(value):
+                value = await value
+            send = plan.send
+        except Exception as exc:
+            value, send = exc, plan.throw
@@ -0,0 +1,22 @@
+"""Запросы отчётов; общие для синхронного и асинхронного API."""
+from sqlalchemy import func, select
+
+from ..models.models import Project, Task
+
+TASKS_WITH_PROJECT_COLUMNS = ("task_id", "task_name", "project_id", "project_name")
+
+
+def tasks_with_project_stmt(left: bool = True):
+    """Задачи с данными проектов: только четыре нужные колонки, LEFT или INNER JOIN."""
+    return select(Task.id, Task.name, Project.id, Project.name).join(
+        Project, Task.project_id == Project.id, isouter=left
+    )
+
+
+def project_task_count_stmt():
+    """Количество задач на проект (LEFT JOIN + GROUP BY)."""
+    return (
+        select(Project.id, Project.name, func.count(Task.id).label("task_count"))
+        .outerjoin(Task)
+        .group_by(Project.id, Project.name)
+    )
@@ -0,0 +1,93 @@
+"""Полнотекстовый поиск для GET /search по Project.name/description, Task.name и Comment.message.
+
+На MSSQL используется полнотекстовый каталог (``schemas/sql/fulltext.sql``):
+``FREETEXTTABLE`` по каждой таблице с ограничением ``top_n_by_rank`` = offset + limit,
+так что сервер ранжирует внутри индекса и не читает все совпадения. На SQLite —
+индекс FTS5 ``search_fts`` с триггерами (``schemas/sql/sqlite/search_fts5.sql``),
+который создаётся вместе с таблицами. Ранг в ответе — «больше = релевантнее».
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import event, text
+
+from .db import Base
+
+KINDS = ("project", "task", "comment")
+# вид -> остаток rowid в search_fts
+_KIND_CODES = {"project": 1, "task": 2, "comment": 3}
+_CODE_KINDS = {v: k for k, v in _KIND_CODES.items()}
+
+_FTS5_DDL = Path(__file__).resolve().parents[3] / "schemas" / "sql" / "sqlite" / "search_fts5.sql"
+
+_MSSQL_BRANCHES = {
+    "project": "SELECT 'project' AS kind, p.id, NULL AS parent_id, LEFT(p.[name], 200) AS snippet, ft.[RANK] AS rank "
+               "FROM FREETEXTTABLE(projects, ([name], description), :q, :top_n) ft JOIN projects p ON p.id = ft.[KEY]",
+    "task": "SELECT 'task', t.id, t.project_id, LEFT(t.[name], 200), ft.[RANK] "
+            "FROM FREETEXTTABLE(tasks, [name], :q, :top_n) ft JOIN tasks t ON t.id = ft.[KEY]",
+    "comment": "SELECT 'comment', c.id, c.task_id, LEFT(c.message, 200), ft.[RANK] "
+               "FROM FREETEXTTABLE(comments, message, :q, :top_n) ft JOIN comments c ON c.id = ft.[KEY]",
+}
+
+
+class SearchError(ValueError):
+    """Неизвестный вид сущности или пустой запрос."""
+
+
+def _split_go(sql_text: str) -> List[str]:
+    parts, current = [], []
+    for line in sql_text.splitlines():
+        if line.strip().upper() == "GO":
+            parts.append("\n".join(current))
+            current = []
+        elif not line.lstrip().startswith("--"):
+            current.append(line)
+    parts.append("\n".join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_sqlite_fts(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        for stmt in _split_go(_FTS5_DDL.read_text(encoding="utf-8")):
+            connection.exec_driver_sql(stmt)
+
+
+def parse_kinds(kinds: Optional[str]) -> Sequence[str]:
+    if not kinds:
+        return KINDS
+    requested = [k.strip() for k in kinds.split(",") if k.strip()]
+    unknown = [k for k in requested if k not in KINDS]
+    if unknown:
+        raise SearchError(f"Unknown kind: {unknown[0]}")
+    return [k for k in KINDS if k in requested]
+
+
+def _fts5_query(q: str) -> str:
+    # каждое слово — отдельная фраза в кавычках: операторы FTS5 во вводе пользователя не интерпретируются
+    return " ".join('"' + word.replace('"', '""') + '"' for word in q.split())
+
+
+def search_stmt(dialect_name: str, q: str, kinds: Sequence[str], limit: int, offset: int):
+    """Выражение и параметры ранжированного поиска для диалекта."""
+    if not q.split():
+        raise SearchError("Empty search query")
+    if dialect_name == "mssql":
+        union = " UNION ALL ".join(_MSSQL_BRANCHES[k] for k in kinds)
+        sql = (f"SELECT kind, id, parent_id, snippet, rank FROM ({union}) hits "
+               "ORDER BY rank DESC, kind, id OFFSET :offset ROWS FETCH NEXT :limit ROWS ONLY")
+        return text(sql), {"q": q, "top_n": offset + limit, "offset": offset, "limit": limit}
+    codes = ", ".join(str(_KIND_CODES[k]) for k in kinds)
+    sql = ("SELECT rowid % 4 AS kind, rowid / 4 AS id, parent_id, "
+           "snippet(search_fts, -1, '[', ']', '…', 16) AS snippet, -bm25(search_fts, 0.0, 2.0, 1.0) AS rank "
+           f"FROM search_fts WHERE search_fts MATCH :q AND rowid % 4 IN ({codes}) "
+           "ORDER BY bm25(search_fts, 0.0, 2.0, 1.0), rowid LIMIT :limit OFFSET :offset")
+    return text(sql), {"q": _fts5_query(q), "offset": offset, "limit": limit}
+
+
+def as_hits(rows) -> List[Dict[str, Any]]:
+    return [
+        {"kind": _CODE_KINDS.get(r.kind, r.kind), "id": r.id, "parent_id": r.parent_id,
+         "snippet": r.snippet, "rank": float(r.rank)}
+        for r in rows
+    ]
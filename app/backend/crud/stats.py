@@ -0,0 +1,75 @@
+"""Сгруппированная статистика для /tasks/stats и /projects/stats.
+
+Поля группировки и метрики проверяются по белому списку и собираются в один
+``SELECT ... GROUP BY``. Колонки группировки всегда идут в порядке белого списка,
+а не запроса: для задач это ``status, priority, project_id``, так что
+группировка по статусу и приоритету совпадает с префиксом индекса
+``IX_tasks_status_priority`` и сервер может агрегировать по индексу без сортировки.
+"""
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, select
+
+from ..models.models import Project, Task
+
+
+class StatsError(ValueError):
+    """Неизвестное поле группировки или метрика."""
+
+
+# допустимые поля группировки (в порядке колонок GROUP BY) и колонки метрик
+GROUP_FIELDS = {
+    "tasks": {"status": Task.status, "priority": Task.priority, "project_id": Task.project_id},
+    "projects": {"is_active": Project.is_active, "start_date": Project.start_date, "end_date": Project.end_date},
+}
+METRIC_FIELDS = {
+    "tasks": {"time_estimation": Task.time_estimation},
+    "projects": {"budget": Project.budget},
+}
+FUNCTIONS = {"sum": func.sum, "avg": func.avg, "min": func.min, "max": func.max}
+MODELS = {"tasks": Task, "projects": Project}
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [part.strip() for part in (value or "").split(",") if part.strip()]
+
+
+def _metric(kind: str, spec: str):
+    """``count`` или ``<функция>:<поле>`` -> подписанное выражение (``avg:budget`` -> ``avg_budget``)."""
+    if spec == "count":
+        return func.count().label("count")
+    fn, _, field = spec.partition(":")
+    if fn not in FUNCTIONS or field not in METRIC_FIELDS[kind]:
+        raise StatsError(f"Unknown metric: {spec}")
+    col = METRIC_FIELDS[kind][field]
+    if fn == "avg":
+        # AVG по INT на MSSQL целочисленный
+        col = col * 1.0
+    return FUNCTIONS[fn](col).label(f"{fn}_{field}")
+
+
+def stats_stmt(kind: str, group_by: Optional[str], metrics: Optional[str], filters: List):
+    """Один SELECT с GROUP BY по проверенным полям и метрикам; строки упорядочены по группам."""
+    allowed = GROUP_FIELDS[kind]
+    requested = _split(group_by)
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise StatsError(f"Unknown group_by field: {unknown[0]}")
+    groups = [col.label(name) for name, col in allowed.items() if name in requested]
+    specs = list(dict.fromkeys(_split(metrics) or ["count"]))
+    stmt = select(*groups, *[_metric(kind, s) for s in specs]).select_from(MODELS[kind]).where(*filters)
+    if groups:
+        stmt = stmt.group_by(*[g.element for g in groups]).order_by(*[g.element for g in groups])
+    return stmt
+
+
+def _json_value(value: Any) -> Any:
+    # Decimal из SUM/AVG по Numeric -> float, как в /projects/aggregate
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def as_dicts(rows) -> List[Dict[str, Any]]:
+    return [{k: _json_value(v) for k, v in row._mapping.items()} for row in rows]
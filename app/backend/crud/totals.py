@@ -0,0 +1,47 @@
+"""Общее число строк для ``with_total`` списков в том же запросе, что и страница.
+
+- ``exact``: в offset-режиме к странице добавляется ``COUNT(*) OVER()`` — окно
+  считается до OFFSET/LIMIT, то есть по всем строкам под фильтрами. В keyset-режиме
+  условие курсора стоит в WHERE и окно посчитало бы только оставшиеся строки,
+  поэтому там добавляется скалярный подзапрос ``(SELECT COUNT(*) ... WHERE фильтры)``.
+  Отдельный COUNT выполняется, только если страница пуста.
+- ``approx``: без фильтров число строк берётся из статистики каталога
+  (``sys.partitions`` на MSSQL) без обращения к таблице; на других СУБД —
+  из поддерживаемого агрегата ``aggregate_stats`` (для таблиц без агрегата — COUNT).
+  С фильтрами — как ``exact``.
+"""
+from typing import List
+
+from sqlalchemy import func, select, text
+
+from . import aggregates, plans
+from .plans import Plan, execute
+
+TOTAL_KEY = "_total"
+
+_MSSQL_ROWS = text(
+    "SELECT SUM(p.rows) FROM sys.partitions p WHERE p.object_id = OBJECT_ID(:name) AND p.index_id IN (0, 1)"
+)
+
+
+def is_exact(with_total, filters: List) -> bool:
+    return with_total == "exact" or (with_total == "approx" and bool(filters))
+
+
+def total_column(model, filters: List, cursor):
+    if cursor:
+        return select(func.count()).select_from(model).where(*filters).scalar_subquery().label(TOTAL_KEY)
+    return func.count().over().label(TOTAL_KEY)
+
+
+def count_stmt(model, filters: List):
+    return select(func.count()).select_from(model).where(*filters)
+
+
+def approx_count_plan(model) -> Plan:
+    name = model.__tablename__
+    if (yield plans.dialect).name == "mssql":
+        return int((yield execute(_MSSQL_ROWS, {"name": name})).scalar() or 0)
+    if name not in aggregates.TRACKED:
+        return (yield execute(count_stmt(model, []))).scalar_one()
+    return (yield from aggregates.read_plan(name))["count"]
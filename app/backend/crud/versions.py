@@ -0,0 +1,72 @@
+"""Счётчики версий таблиц для ETag списочных эндпоинтов.
+
+Версия таблицы — хранимая строка ``table_versions`` плюс число несвёрнутых строк
+журнала ``table_changes``, которые добавляют триггеры БД при каждой записи
+(``changes.py``); каскадное удаление вызывает триггеры и дочерних таблиц. Версия
+меняется при любой записи, в том числе в обход API, а пути записи в приложении
+не обновляют общую строку версии. ETag списка — это версия его таблицы, и ответ
+``304`` можно дать одним SELECT, не выполняя запрос списка.
+
+Без триггеров журнала (``changes.journal_ok``) версия не меняется, поэтому ``read_plan``
+возвращает ``None`` и список отдаётся без ETag.
+
+Версию нужно читать до запроса данных: запись между ними даст устаревший ETag
+при свежих данных (лишняя загрузка у клиента), но не наоборот. ``bump_all``
+сбрасывает ETag всех списков вручную (например, после записи с выключенными триггерами).
+"""
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models.models import Attachment, Comment, Project, TableVersion, Task
+from . import changes
+from .changes import Pending
+from .plans import Plan, commit, execute, rollback, run, run_async
+
+TRACKED = {Project: "projects", Task: "tasks", Comment: "comments", Attachment: "attachments"}
+
+
+def bump_stmt(names: List[str]):
+    v = TableVersion
+    return update(v).where(v.name.in_(names)).values(version=v.version + 1)
+
+
+def _missing_stmt(names: List[str]):
+    return insert(TableVersion), [{"name": n, "version": 0} for n in names]
+
+
+def _read_stmt(names: List[str]):
+    v = TableVersion
+    return select(v.name, v.version + Pending(v.name).changes).where(v.name.in_(names))
+
+
+def read_plan(*names: str) -> Plan:
+    """Текущие версии таблиц; недостающие строки создаются с версией 0. ``None`` — журнал не ведётся."""
+    if not changes.journal_ok():
+        return None
+    versions = dict((yield execute(_read_stmt(list(names)))).all())
+    missing = [n for n in names if n not in versions]
+    if missing:
+        try:
+            yield execute(*_missing_stmt(missing))
+            yield commit
+        except IntegrityError:
+            # строку параллельно создал другой запрос
+            yield rollback
+        versions = dict((yield execute(_read_stmt(list(names)))).all())
+    return {n: versions[n] for n in names}
+
+
+def read(session: Session, *names: str) -> Optional[Dict[str, int]]:
+    return run(session, read_plan(*names))
+
+
+async def read_async(session, *names: str) -> Optional[Dict[str, int]]:
+    return await run_async(session, read_plan(*names))
+
+
+def bump_all(session: Session) -> None:
+    session.execute(bump_stmt(list(TRACKED.values())))
+    session.commit()
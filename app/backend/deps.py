@@ -0,0 +1,65 @@
+"""Общие зависимости FastAPI для синхронных (api.py) и асинхронных (api_async.py) эндпоинтов."""
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, Query
+
+from .crud.db import AsyncSessionLocal
+from .crud import fieldsets
+from .crud.filters import attachment_filters, comment_filters, project_filters, task_filters
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def project_filter_params(
+    name: Optional[str] = Query(None, description="Фильтр по имени проекта (подстрока)"),
+    min_budget: Optional[float] = Query(None, description="Минимум бюджета"),
+    max_budget: Optional[float] = Query(None, description="Максимум бюджета"),
+    is_active: Optional[bool] = Query(None, description="Фильтр по активности"),
+) -> list:
+    return project_filters(name, min_budget, max_budget, is_active)
+
+
+def task_filter_params(
+    project_id: Optional[int] = Query(None),
+    status: Optional[str] = Query(None),
+    priority: Optional[str] = Query(None),
+) -> list:
+    return task_filters(project_id, status, priority)
+
+
+def comment_filter_params(
+    task_id: Optional[int] = Query(None),
+    author: Optional[str] = Query(None, description="Автор (точное совпадение)"),
+    created_from: Optional[datetime] = Query(None, description="created_at >= (ISO 8601)"),
+    created_to: Optional[datetime] = Query(None, description="created_at < (ISO 8601)"),
+    min_rating: Optional[int] = Query(None),
+    max_rating: Optional[int] = Query(None),
+) -> list:
+    return comment_filters(task_id, author, created_from, created_to, min_rating, max_rating)
+
+
+def attachment_filter_params(
+    comment_id: Optional[int] = Query(None),
+    created_from: Optional[datetime] = Query(None, description="created_at >= (ISO 8601)"),
+    created_to: Optional[datetime] = Query(None, description="created_at < (ISO 8601)"),
+    is_visible: Optional[bool] = Query(None),
+) -> list:
+    return attachment_filters(comment_id, created_from, created_to, is_visible)
+
+
+def require_filters(filters: list):
+    # массовые операции без фильтра затронули бы всю таблицу
+    if not filters:
+        raise HTTPException(status_code=400, detail="At least one filter is required")
+
+
+def fields_columns(model, fields: Optional[str]):
+    """Колонки для ?fields=... или None; неизвестное поле — 400."""
+    try:
+        return fieldsets.parse(model, fields)
+    except fieldsets.FieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
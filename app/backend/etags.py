@@ -0,0 +1,47 @@
+"""Условные GET: ETag, If-None-Match и заголовки кэширования для прокси.
+
+Списки получают ETag из версий таблиц (``crud/versions.py``), так что ``304``
+отдаётся до запроса списка. Ответы по id уже читаются из кэша сущностей,
+поэтому их ETag — хэш содержимого: это экономит трафик, не добавляя запросов к БД.
+"""
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+from .config import config as cfg
+
+
+def version_etag(versions: Optional[Dict[str, int]]) -> Optional[str]:
+    if versions is None:
+        return None
+    return '"' + ";".join(f"{name}.{v}" for name, v in versions.items()) + '"'
+
+
+def content_etag(value: Any) -> str:
+    raw = json.dumps(value, sort_keys=True, default=str).encode()
+    return '"' + hashlib.blake2b(raw, digest_size=12).hexdigest() + '"'
+
+
+def _matches(header: str, etag: str) -> bool:
+    # слабое сравнение (RFC 9110): префикс W/ не учитывается
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def conditional(request: Request, response: Response, etag: Optional[str]) -> Optional[Response]:
+    """Проставить ETag и Cache-Control; вернуть готовый ``304``, если клиент прислал тот же ETag.
+
+    Без ETag (версии таблиц не ведутся) ответ не кэшируется и всегда отдаётся целиком.
+    """
+    if etag is None:
+        response.headers["Cache-Control"] = "no-cache"
+        return None
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={cfg.HTTP_CACHE_MAX_AGE}, must-revalidate"}
+    inm = request.headers.get("if-none-match")
+    if inm and _matches(inm, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,27 @@
+"""Сериализация отчётов для потоковой выгрузки (NDJSON/CSV)."""
+import csv
+import io
+import json
+from typing import AsyncIterator, Iterator, Sequence, Union
+
+from fastapi.responses import StreamingResponse
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def csv_header(columns: Sequence[str]) -> str:
+    return encode_rows(columns, [columns], "csv")
+
+
+def encode_rows(columns: Sequence[str], rows, fmt: str) -> str:
+    """Пачка строк результата в виде текста NDJSON или CSV."""
+    if fmt == "csv":
+        buf = io.StringIO()
+        csv.writer(buf).writerows(rows)
+        return buf.getvalue()
+    return "".join(json.dumps(dict(zip(columns, r)), ensure_ascii=False, default=str) + "\n" for r in rows)
+
+
+def streaming_response(body: Union[Iterator[str], AsyncIterator[str]], fmt: str, filename: str) -> StreamingResponse:
+    headers = {"Content-Disposition": f'attachment; filename="{filename}.csv"'} if fmt == "csv" else None
+    return StreamingResponse(body, media_type=MEDIA_TYPES[fmt], headers=headers)
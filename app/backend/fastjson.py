@@ -0,0 +1,61 @@
+"""Быстрая сериализация списков: кортежи колонок -> JSON-байты без ORM и Pydantic.
+
+Списочные эндпоинты в режиме FAST_JSON выбирают колонки таблицы, а не ORM-объекты,
+и кодируют строки сразу в байты (orjson, если установлен, иначе стандартный json).
+Повторная валидация через ``*Read`` с ``from_attributes`` пропускается: данные
+только что прочитаны из собственной БД и уже имеют типы колонок. Формат ответа
+совпадает с прежним: Numeric -> float, даты и время — ISO 8601.
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional, Sequence
+
+from fastapi import Response
+
+# модулем, а не именем: instrumentation сам импортирует fastjson для лога запросов
+from . import instrumentation
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson указан в requirements.txt
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(obj: Any) -> bytes:
+    with instrumentation.serialization():
+        if orjson is not None:
+            return orjson.dumps(obj, default=_default)
+        return json.dumps(obj, default=_default, separators=(",", ":")).encode()
+
+
+def _headers(response: Response) -> dict:
+    return {k: v for k, v in response.headers.items() if k not in ("content-length", "content-type")}
+
+
+def rows_response(rows: Sequence, response: Response, keys: Optional[Sequence[str]] = None) -> Response:
+    """JSON-массив объектов из строк результата; заголовки (ETag, X-Next-Cursor) берутся из ``response``.
+
+    ``keys`` ограничивает вывод частью колонок строки (например, без колонки сортировки).
+    """
+    if not rows:
+        return Response(content=b"[]", media_type="application/json", headers=_headers(response))
+    fields = rows[0]._fields
+    if keys is None or list(keys) == list(fields):
+        items = [dict(zip(fields, row)) for row in rows]
+    else:
+        idx = [fields.index(k) for k in keys]
+        items = [dict(zip(keys, [row[i] for i in idx])) for row in rows]
+    return Response(content=dumps(items), media_type="application/json", headers=_headers(response))
+
+
+def json_response(value: Any, response: Response) -> Response:
+    return Response(content=dumps(value), media_type="application/json", headers=_headers(response))
@@ -0,0 +1,256 @@
+"""Замеры запроса: SQL-выражения, время БД, прочитанные строки и сериализация.
+
+``RequestTimingMiddleware`` (чистый ASGI) заводит на каждый HTTP-запрос объект
+``RequestStats`` в ``ContextVar``; синхронные эндпоинты и зависимости выполняются
+в пуле потоков с копией контекста, так что видят тот же объект. Слушатели
+``before/after_cursor_execute`` на классе ``Engine`` (т. е. на движках ``db.py``
+и любых других, включая тестовые) добавляют в него число выражений и время БД,
+а курсор SELECT оборачивается счётчиком строк; начало выражения хранится в его
+``ExecutionContext``, так что упавшее выражение ничего не оставляет на соединении.
+Время сериализации — это время от возврата эндпоинта до готового ``Response`` в
+обработчике маршрута (``TimedRoute``: валидация ``response_model`` + JSON) и
+``fastjson.dumps`` быстрого пути.
+
+Итог уходит в заголовок ``Server-Timing`` (``db``, ``ser``, ``app`` — остальное время
+обработчика, в том числе гидратация ORM, ``total``) и в строку JSON логгера
+``app.requests`` (уровень INFO).
+
+Бюджет запросов: ``@query_budget(n)`` на эндпоинте объявляет допустимое число
+SQL-выражений. ``QUERY_BUDGET_MODE=raise`` (включается в тестах) бросает
+``QueryBudgetExceeded`` на выражении сверх бюджета — так N+1 ловится на месте,
+``warn`` пишет предупреждение в лог, ``off`` не проверяет.
+"""
+import functools
+import inspect
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from . import fastjson
+from .config import config as cfg
+
+logger = logging.getLogger("app.requests")
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Эндпоинт выполнил больше SQL-выражений, чем объявлено в ``@query_budget``."""
+
+
+class RequestStats:
+    __slots__ = ("scope", "started", "statements", "db_time", "rows", "serialize_time", "budget_warned",
+                 "endpoint_done")
+
+    def __init__(self, scope: Dict[str, Any]):
+        self.scope = scope
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.serialize_time = 0.0
+        self.budget_warned = False
+        self.endpoint_done: Optional[float] = None
+
+    def budget(self) -> Optional[int]:
+        # маршрут известен только после роутинга — ищется при каждом выражении, это дёшево
+        endpoint = getattr(self.scope.get("route"), "endpoint", None)
+        # эндпоинт TimedRoute обёрнут — бюджет стоит на исходной функции
+        return getattr(getattr(endpoint, "__wrapped__", endpoint), "query_budget", None)
+
+    def route(self) -> str:
+        return getattr(self.scope.get("route"), "path", None) or self.scope.get("path", "")
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current() -> Optional[RequestStats]:
+    return _current.get()
+
+
+def query_budget(limit: int) -> Callable:
+    """Объявить бюджет SQL-выражений эндпоинта (функция не оборачивается)."""
+    def mark(fn):
+        fn.query_budget = limit
+        return fn
+    return mark
+
+
+@contextmanager
+def serialization():
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serialize_time += time.perf_counter() - started
+
+
+class _CountingCursor:
+    """Курсор DBAPI, считающий прочитанные строки; остальное делегируется."""
+
+    __slots__ = ("_cursor", "_stats")
+
+    def __init__(self, cursor, stats: RequestStats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.rows += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        self._stats.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats.rows += len(rows)
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    stats.statements += 1
+    if cfg.QUERY_BUDGET_MODE != "off":
+        limit = stats.budget()
+        if limit is not None and stats.statements > limit:
+            message = (f"{stats.scope.get('method')} {stats.route()}: SQL statement #{stats.statements} "
+                       f"exceeds query budget {limit}: {statement[:200]}")
+            if cfg.QUERY_BUDGET_MODE == "raise":
+                raise QueryBudgetExceeded(message)
+            if not stats.budget_warned:
+                stats.budget_warned = True
+                logger.warning(message)
+    if context is not None:
+        context.request_stats_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None or context is None:
+        return
+    started = getattr(context, "request_stats_started", None)
+    if started is not None:
+        stats.db_time += time.perf_counter() - started
+    if cursor.description is not None:
+        # результат создаётся после этого события и читает строки через context.cursor
+        context.cursor = _CountingCursor(cursor, stats)
+
+
+def _mark_endpoint_done():
+    stats = _current.get()
+    if stats is not None:
+        stats.endpoint_done = time.perf_counter()
+
+
+def _marking_endpoint(endpoint: Callable) -> Callable:
+    """Обёртка эндпоинта, отмечающая момент его возврата (синхронная остаётся синхронной)."""
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def marked(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _mark_endpoint_done()
+    else:
+        @functools.wraps(endpoint)
+        def marked(*args, **kwargs):
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                _mark_endpoint_done()
+    return marked
+
+
+class TimedRoute(APIRoute):
+    """Маршрут, относящий к сериализации время от возврата эндпоинта до готового Response.
+
+    В этом промежутке обработчик FastAPI валидирует результат по ``response_model``
+    и кодирует JSON. Подключается как ``APIRouter(route_class=TimedRoute)``.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _marking_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            response = await handler(request)
+            stats = _current.get()
+            if stats is not None and stats.endpoint_done is not None:
+                stats.serialize_time += time.perf_counter() - stats.endpoint_done
+                stats.endpoint_done = None
+            return response
+
+        return timed_handler
+
+
+def server_timing(stats: RequestStats, total: float) -> str:
+    app_time = max(total - stats.db_time - stats.serialize_time, 0.0)
+    return (f'db;dur={stats.db_time * 1000:.2f};desc="{stats.statements} queries, {stats.rows} rows", '
+            f"ser;dur={stats.serialize_time * 1000:.2f}, app;dur={app_time * 1000:.2f}, total;dur={total * 1000:.2f}")
+
+
+class RequestTimingMiddleware:
+    """Заводит ``RequestStats`` на запрос, ставит ``Server-Timing`` и пишет строку лога по окончании ответа."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not cfg.SQL_INSTRUMENTATION:
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if cfg.SERVER_TIMING:
+                    total = time.perf_counter() - stats.started
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing(stats, total).encode()))
+                    message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            if logger.isEnabledFor(logging.INFO):
+                total = time.perf_counter() - stats.started
+                logger.info(fastjson.dumps({
+                    "method": scope.get("method"), "path": scope.get("path"), "route": stats.route(),
+                    "status": status, "duration_ms": round(total * 1000, 3),
+                    "db_ms": round(stats.db_time * 1000, 3), "queries": stats.statements, "rows": stats.rows,
+                    "serialize_ms": round(stats.serialize_time * 1000, 3), "bytes": size,
+                }).decode())
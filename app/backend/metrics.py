@@ -0,0 +1,258 @@
+"""Метрики в текстовом формате Prometheus для ``GET /metrics``.
+
+Собственные сборщики вместо ``prometheus_client``: счётчик, gauge и гистограмма
+с метками — словарь под одной блокировкой, наблюдение в гистограмму — ``bisect``
+по границам корзин, накопительные суммы считаются только при выдаче ``/metrics``.
+Значения пула соединений (``db.py``) читаются в момент выдачи, на горячем пути
+добавляется только гистограмма ожидания выдачи соединения.
+
+- ``http_requests_total``, ``http_request_errors_total`` (статус >= 400) — по методу, маршруту и статусу;
+- ``http_request_duration_seconds``, ``http_response_size_bytes`` — гистограммы по методу и маршруту;
+- ``http_requests_in_flight`` — gauge по методу;
+- ``db_queries_total`` — SQL-выражения по таблице и операции;
+- ``db_pool_*`` — ожидание выдачи (гистограмма), выдачи, таймауты, занятые соединения.
+
+Маршрут — шаблон пути (``/tasks/{task_id}``), запросы мимо маршрутов идут с
+``route="unmatched"``, так что число рядов не растёт от id в URL; нестандартные
+HTTP-методы идут с ``method="other"`` по той же причине.
+Метрики у каждого процесса свои: при нескольких воркерах каждый отдаёт свои значения.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import config as cfg
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+# методы HTTP (RFC 9110 и PATCH) — метка method; остальные — "other"
+HTTP_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "TRACE", "CONNECT"))
+POOL_WAIT_BUCKETS = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = defaultdict(float)
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] += amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_labels(self.label_names, k)} {_num(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self.bounds = tuple(buckets)
+        self._lock = threading.Lock()
+        # метки -> [счётчики корзин (последняя — +Inf, не накопительные), сумма, число]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        idx = bisect_left(self.bounds, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.bounds) + 1), 0.0, 0]
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            series = self._series.get(labels)
+            return series[2] if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(s[0]), s[1], s[2]) for k, s in self._series.items()]
+        lines = []
+        for key, buckets, total, count in items:
+            cumulative = 0
+            for bound, n in zip(self.bounds + (float("inf"),), buckets):
+                cumulative += n
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_num(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_num(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, List[str]]]]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, fn: Callable):
+        """fn() -> [(имя, тип, описание, [строки сэмплов])]; вызывается при каждой выдаче."""
+        self._collectors.append(fn)
+
+    def render(self) -> str:
+        out = []
+        families = [(m.name, m.kind, m.help, m.render()) for m in self._metrics]
+        for fn in self._collectors:
+            families.extend(fn())
+        for name, kind, help, lines in families:
+            out.append(f"# HELP {name} {help}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(lines)
+        return "\n".join(out) + "\n"
+
+
+registry = Registry()
+
+REQUESTS = registry.register(Counter("http_requests_total", "HTTP requests", ("method", "route", "status")))
+ERRORS = registry.register(Counter("http_request_errors_total", "HTTP responses with status >= 400",
+                                   ("method", "route", "status")))
+LATENCY = registry.register(Histogram("http_request_duration_seconds", "Request latency", ("method", "route")))
+RESPONSE_SIZE = registry.register(Histogram("http_response_size_bytes", "Response body size", ("method", "route"),
+                                            SIZE_BUCKETS))
+IN_FLIGHT = registry.register(Gauge("http_requests_in_flight", "Requests being processed", ("method",)))
+QUERIES = registry.register(Counter("db_queries_total", "SQL statements by table and operation", ("table", "op")))
+POOL_WAIT = registry.register(Histogram("db_pool_checkout_wait_seconds", "Wait for a pooled connection",
+                                        buckets=POOL_WAIT_BUCKETS))
+
+
+def _pool_samples():
+    from .crud.db import async_engine, pool_stats
+
+    pools = [("sync", pool_stats())]
+    if async_engine is not None:
+        pools.append(("async", pool_stats(async_engine)))
+    gauges = {"checked_out": [], "checked_in": [], "overflow": []}
+    counters = {"checkouts": [], "checkout_timeouts": []}
+    for engine_label, stats in pools:
+        label = f'{{engine="{engine_label}"}}'
+        for key, lines in list(gauges.items()) + list(counters.items()):
+            if key in stats:
+                lines.append(f"db_pool_{key}{'_total' if key in counters else ''}{label} {stats[key]}")
+    return [
+        ("db_pool_checked_out", "gauge", "Connections in use", gauges["checked_out"]),
+        ("db_pool_checked_in", "gauge", "Idle connections in the pool", gauges["checked_in"]),
+        ("db_pool_overflow", "gauge", "Connections over pool_size", gauges["overflow"]),
+        ("db_pool_checkouts_total", "counter", "Connection checkouts", counters["checkouts"]),
+        ("db_pool_checkout_timeouts_total", "counter", "Checkouts that hit pool_timeout", counters["checkout_timeouts"]),
+    ]
+
+
+registry.add_collector(_pool_samples)
+
+
+_TABLE_AFTER = {
+    "select": re.compile(r"\bFROM\s+\[?(\w+)", re.IGNORECASE),
+    "delete": re.compile(r"\bFROM\s+\[?(\w+)", re.IGNORECASE),
+    "insert": re.compile(r"\bINTO\s+\[?(\w+)", re.IGNORECASE),
+    "update": re.compile(r"\bUPDATE\s+(?:TOP\s*\(\s*\S+\s*\)\s+)?\[?(\w+)", re.IGNORECASE),
+}
+_table_cache: Dict[str, Tuple[str, str]] = {}
+
+
+def statement_table(statement: str) -> Tuple[str, str]:
+    """(таблица, операция) по тексту выражения; результат кэшируется — тексты выражений повторяются."""
+    hit = _table_cache.get(statement)
+    if hit is not None:
+        return hit
+    words = statement.split(None, 1)
+    op = words[0].lower() if words else "other"
+    pattern = _TABLE_AFTER.get(op)
+    m = pattern.search(statement) if pattern else None
+    result = (m.group(1).lower() if m else "-", op)
+    if len(_table_cache) < 4096:
+        _table_cache[statement] = result
+    return result
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if cfg.METRICS_ENABLED:
+        QUERIES.inc(*statement_table(statement))
+
+
+def observe_pool_wait(seconds: float):
+    if cfg.METRICS_ENABLED:
+        POOL_WAIT.observe(seconds)
+
+
+class MetricsMiddleware:
+    """Счётчики и гистограммы на каждый HTTP-запрос (чистый ASGI, без буферизации тела)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not cfg.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        method = scope.get("method", "")
+        if method not in HTTP_METHODS:
+            method = "other"
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        IN_FLIGHT.inc(method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec(method)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            code = str(status)
+            REQUESTS.inc(method, route, code)
+            if status >= 400:
+                ERRORS.inc(method, route, code)
+            LATENCY.observe(time.perf_counter() - started, method, route)
+            RESPONSE_SIZE.observe(size, method, route)
@@ -1,4 +1,5 @@
 from sqlalchemy import (
+    BigInteger,
     Column,
     Integer,
     String,
@@ -15,6 +16,8 @@ from ..crud.db import Base
 
 class Project(Base):
     __tablename__ = "projects"
+    # AFTER-триггер журнала table_changes: на MSSQL вставка и обновление без OUTPUT
+    __table_args__ = {"implicit_returning": False}
 
     id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
@@ -29,6 +32,8 @@ class Project(Base):
 
 class Task(Base):
     __tablename__ = "tasks"
+    # AFTER-триггеры аудита и журнала table_changes: MSSQL не выполняет OUTPUT без INTO на такой таблице
+    __table_args__ = {"implicit_returning": False}
 
     id = Column(Integer, primary_key=True)
     project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
@@ -44,6 +49,8 @@ class Task(Base):
 
 class Comment(Base):
     __tablename__ = "comments"
+    # AFTER-триггер журнала table_changes: на MSSQL вставка и обновление без OUTPUT
+    __table_args__ = {"implicit_returning": False}
 
     id = Column(Integer, primary_key=True)
     task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
@@ -59,6 +66,8 @@ class Comment(Base):
 
 class Attachment(Base):
     __tablename__ = "attachments"
+    # AFTER-триггер журнала table_changes: на MSSQL вставка и обновление без OUTPUT
+    __table_args__ = {"implicit_returning": False}
 
     id = Column(Integer, primary_key=True)
     comment_id = Column(Integer, ForeignKey("comments.id", ondelete="CASCADE"), nullable=False)
@@ -69,3 +78,36 @@ class Attachment(Base):
     is_visible = Column(Boolean, default=True)
 
     comment = relationship("Comment", back_populates="attachments")
+
+
+class AggregateStat(Base):
+    """Поддерживаемые агрегаты таблицы: число строк, сумма и число непустых значений отслеживаемой колонки."""
+
+    __tablename__ = "aggregate_stats"
+
+    name = Column(String(50), primary_key=True)
+    row_count = Column(BigInteger, nullable=False, default=0)
+    value_sum = Column(Numeric(20, 2), nullable=False, default=0)
+    value_count = Column(BigInteger, nullable=False, default=0)
+
+
+class TableChange(Base):
+    """Строка журнала изменений, которую добавляет триггер: дельты числа строк, суммы и числа непустых значений."""
+
+    __tablename__ = "table_changes"
+
+    # на SQLite автоинкремент есть только у INTEGER PRIMARY KEY
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    name = Column(String(50), nullable=False, index=True)
+    row_delta = Column(BigInteger, nullable=False, default=0)
+    value_sum = Column(Numeric(20, 2), nullable=False, default=0)
+    value_count = Column(BigInteger, nullable=False, default=0)
+
+
+class TableVersion(Base):
+    """Свёрнутая версия таблицы: к ней прибавляется число строк журнала table_changes, используется как ETag списков."""
+
+    __tablename__ = "table_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
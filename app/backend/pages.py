@@ -0,0 +1,50 @@
+"""Запрос страницы списка — общий для синхронных (api.py) и асинхронных (api_async.py) эндпоинтов.
+
+``page_plan`` — план запросов (``crud/plans.py``): api.py выполняет его на Session,
+api_async.py — на AsyncSession.
+"""
+from fastapi import HTTPException, Response
+from sqlalchemy import select
+
+from . import fastjson
+from .config import config as cfg
+from .crud import fieldsets, totals
+from .crud.pagination import CursorError, next_cursor, paginate
+from .crud.plans import Plan, execute, scalars
+
+
+def page_plan(model, filters, response: Response, sort_by, sort_dir, limit, offset, cursor,
+              columns=None, with_total=None) -> Plan:
+    """Запрос страницы; курсор следующей страницы отдаётся в заголовке X-Next-Cursor.
+
+    При FAST_JSON выбираются колонки таблицы и ответ сразу кодируется в JSON-байты
+    (``fastjson.py``), иначе возвращаются ORM-объекты для валидации через response_model.
+    ``with_total`` добавляет заголовок X-Total-Count (см. ``crud/totals.py``).
+    """
+    limit = min(limit, cfg.MAX_PAGE_SIZE)
+    fast = columns is not None or cfg.FAST_JSON
+    if fast:
+        columns = columns if columns is not None else list(model.__table__.columns)
+        stmt = select(*fieldsets.with_sort_column(model, columns, sort_by))
+    else:
+        stmt = select(model)
+    exact = totals.is_exact(with_total, filters)
+    if exact:
+        stmt = stmt.add_columns(totals.total_column(model, filters, cursor))
+    try:
+        stmt = paginate(stmt.where(*filters), model, sort_by, sort_dir, limit, offset, cursor)
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    rows = (yield execute(stmt)).all() if fast or exact else (yield scalars(stmt)).all()
+    if exact:
+        total = rows[0][-1] if rows else (yield execute(totals.count_stmt(model, filters))).scalar_one()
+        response.headers["X-Total-Count"] = str(total)
+        if not fast:
+            rows = [r[0] for r in rows]
+    elif with_total == "approx":
+        response.headers["X-Total-Count"] = str((yield from totals.approx_count_plan(model)))
+        response.headers["X-Total-Count-Approximate"] = "1"
+    nxt = next_cursor(rows, model, sort_by, sort_dir, limit)
+    if nxt:
+        response.headers["X-Next-Cursor"] = nxt
+    return fastjson.rows_response(rows, response, [c.key for c in columns]) if fast else rows
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime
 
 
@@ -104,3 +104,33 @@ class AttachmentUpdate(BaseModel):
 class AttachmentRead(AttachmentBase):
     id: int
     model_config = ConfigDict(from_attributes=True)
+
+
+# Вложенные схемы для ?expand=...: дочерние списки присутствуют, только если уровень запрошен
+class CommentExpanded(CommentRead):
+    attachments: Optional[List[AttachmentRead]] = None
+
+
+class TaskExpanded(TaskRead):
+    comments: Optional[List[CommentExpanded]] = None
+
+
+class ProjectExpanded(ProjectRead):
+    tasks: Optional[List[TaskExpanded]] = None
+
+
+class BulkCreateResult(BaseModel):
+    count: int
+    ids: List[int]
+
+
+class BulkWriteResult(BaseModel):
+    affected: int
+
+
+class SearchHit(BaseModel):
+    kind: str  # project | task | comment
+    id: int
+    parent_id: Optional[int] = None  # project_id задачи, task_id комментария
+    snippet: Optional[str] = None
+    rank: float
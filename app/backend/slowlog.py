@@ -0,0 +1,288 @@
+"""Журнал медленных SQL-выражений с планами выполнения.
+
+Слушатели ``before/after_cursor_execute`` на классе ``Engine`` замеряют каждое
+выражение; всё, что дольше ``SLOW_QUERY_MS``, агрегируется по отпечатку —
+тексту выражения, в котором литералы и плейсхолдеры заменены на ``?``, а списки
+``IN (?, ?, ...)`` свёрнуты, так что ``list_tasks`` с одними и теми же фильтрами
+и сортировкой даёт один отпечаток независимо от значений. Для отпечатка
+хранятся число, суммарное/максимальное время, форма параметров (типы, не
+значения) и маршруты, из которых он пришёл.
+
+С ``SLOW_QUERY_PLANS=1`` при первом медленном выполнении отпечатка снимается план:
+``EXPLAIN QUERY PLAN`` на SQLite (отдельным курсором того же соединения: выражение
+только компилируется, а in-memory базу другое соединение не видит),
+``SET SHOWPLAN_XML ON`` на MSSQL — фоновым потоком ``plan_worker`` на отдельном
+соединении без пула, вне запроса: запрос не ждёт ни план, ни второе соединение, а
+соединения пула приложения SHOWPLAN не видят (в режиме DB_ASYNC — через pyodbc по тому
+же URL: у асинхронного пула нет соединений вне цикла событий, а текст выражения aioodbc
+уже в стиле ``?``). Выражение при этом не выполняется.
+По плану ставятся флаги ``full_scan`` (скан таблицы без индекса) и ``sort``
+(сортировка не покрыта индексом) — это и есть промахи мимо ``create_indexes.sql``.
+
+Отчёт — ``GET /admin/slow-queries``.
+"""
+import hashlib
+import logging
+import queue
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool
+
+from . import instrumentation
+from .config import config as cfg
+
+logger = logging.getLogger("app.slow_queries")
+
+_LITERALS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),                 # строки
+    (re.compile(r"%\(\w+\)s|%s|:\w+|@P\d+"), "?"),        # плейсхолдеры pyformat/format/named/pyodbc
+    (re.compile(r"(?<![\w.\]])-?\d+(?:\.\d+)?\b"), "?"),  # числа вне идентификаторов
+    (re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE), "IN (?+)"),  # IN (?, ?, ...) любой длины
+    (re.compile(r"\s+"), " "),
+]
+
+
+def fingerprint(statement: str) -> str:
+    text = statement
+    for pattern, repl in _LITERALS:
+        text = pattern.sub(repl, text)
+    return text.strip()
+
+
+def param_shape(parameters: Any, executemany: bool = False) -> str:
+    """Типы связанных параметров без значений: ``(int, str)``, ``{name: str}``, ``executemany[500] (int)``."""
+    if executemany:
+        rows = list(parameters or [])
+        return f"executemany[{len(rows)}] " + (param_shape(rows[0]) if rows else "()")
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+    return type(parameters).__name__
+
+
+def plan_flags(plan: str) -> List[str]:
+    flags = []
+    # SQLite: «SCAN tasks» без USING INDEX; виртуальные таблицы (FTS5) и константы — не скан таблицы
+    scans = [line.strip() for line in plan.splitlines() if line.strip().startswith("SCAN ")]
+    if any("USING" not in line and "VIRTUAL TABLE" not in line and "CONSTANT ROW" not in line for line in scans) or \
+            re.search(r'PhysicalOp="(?:Table Scan|Clustered Index Scan)"', plan):
+        flags.append("full_scan")
+    if "USE TEMP B-TREE" in plan or 'PhysicalOp="Sort"' in plan:
+        flags.append("sort")
+    return flags
+
+
+def _sqlite_plan(dbapi_connection, statement: str, parameters) -> str:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    depth = {0: 0}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, 0) + 1
+        lines.append("  " * (depth[node_id] - 1) + detail)
+    return "\n".join(lines)
+
+
+def _mssql_plan(engine, statement: str, parameters) -> str:
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute("SET SHOWPLAN_XML ON")
+        try:
+            cursor.execute(statement, parameters)
+            return "".join(str(r[0]) for r in cursor.fetchall())
+        finally:
+            try:
+                cursor.execute("SET SHOWPLAN_XML OFF")
+            except Exception:
+                # соединение с включённым SHOWPLAN не выполняло бы запросы — оно не возвращается в пул
+                raw.invalidate()
+    finally:
+        raw.close()
+
+
+_sync_plan_engines: Dict[str, Engine] = {}
+
+
+def _plan_engine(engine: Engine) -> Engine:
+    """Отдельный синхронный движок без пула на URL ``engine`` (для aioodbc — pyodbc).
+
+    Соединения пула приложения планы не трогают: ``SET SHOWPLAN_XML`` на них не попадает.
+    """
+    url = engine.url
+    if engine.dialect.is_async:
+        url = url.set(drivername=f"{url.get_backend_name()}+pyodbc")
+    key = url.render_as_string(hide_password=False)
+    if key not in _sync_plan_engines:  # только поток plan_worker
+        _sync_plan_engines[key] = create_engine(url, poolclass=NullPool)
+    return _sync_plan_engines[key]
+
+
+class PlanWorker:
+    """Фоновый поток, который снимает планы вне запроса; очередь ограничена ``maxsize``."""
+
+    def __init__(self, maxsize: int = 100):
+        self._queue: "queue.Queue" = queue.Queue(maxsize)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, fn: Callable[..., Any], *args) -> bool:
+        """Поставить ``fn(*args)`` в очередь; False, если очередь заполнена."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="slowlog-plans", daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait((fn, args))
+        except queue.Full:
+            return False
+        return True
+
+    def join(self):
+        """Дождаться обработки всех поставленных задач."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            fn, args = self._queue.get()
+            try:
+                fn(*args)
+            except Exception:
+                logger.exception("plan worker task failed")
+            finally:
+                self._queue.task_done()
+
+
+plan_worker = PlanWorker()
+
+
+class SlowQueryLog:
+    """Агрегаты медленных выражений по отпечатку; не больше ``max_fingerprints`` отпечатков."""
+
+    def __init__(self, max_fingerprints: int):
+        self.max_fingerprints = max_fingerprints
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self.recorded = 0
+        self.dropped = 0
+
+    def record(self, statement: str, parameters, executemany: bool, elapsed: float,
+               route: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Учесть медленное выполнение; возвращает запись отпечатка, если для неё ещё нет плана."""
+        text = fingerprint(statement)
+        key = hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+        ms = elapsed * 1000
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_fingerprints:
+                    self.dropped += 1
+                    return None
+                entry = self._entries[key] = {
+                    "fingerprint": key, "statement": text, "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "param_shapes": [], "routes": [], "last_seen": 0.0, "plan": None, "flags": [],
+                    "plan_pending": True,
+                }
+            self.recorded += 1
+            entry["count"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+            entry["last_seen"] = time.time()
+            shape = param_shape(parameters, executemany)
+            if shape not in entry["param_shapes"] and len(entry["param_shapes"]) < 5:
+                entry["param_shapes"].append(shape)
+            if route and route not in entry["routes"] and len(entry["routes"]) < 5:
+                entry["routes"].append(route)
+            if entry["plan_pending"] and not executemany:
+                entry["plan_pending"] = False
+                return entry
+        return None
+
+    def retry_plan(self, entry: Dict[str, Any]):
+        """Снять план при следующем медленном выполнении (очередь воркера была заполнена)."""
+        with self._lock:
+            entry["plan_pending"] = True
+
+    def set_plan(self, entry: Dict[str, Any], plan: Optional[str]):
+        with self._lock:
+            entry["plan"] = plan
+            entry["flags"] = plan_flags(plan) if plan else []
+
+    def top(self, n: int = 20, sort: str = "total_ms") -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = [
+                {**{k: v for k, v in e.items() if k != "plan_pending"},
+                 "total_ms": round(e["total_ms"], 3), "max_ms": round(e["max_ms"], 3),
+                 "mean_ms": round(e["total_ms"] / e["count"], 3)}
+                for e in self._entries.values()
+            ]
+        return sorted(entries, key=lambda e: e[sort], reverse=True)[:n]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"threshold_ms": cfg.SLOW_QUERY_MS, "plans": cfg.SLOW_QUERY_PLANS,
+                    "fingerprints": len(self._entries), "max_fingerprints": self.max_fingerprints,
+                    "recorded": self.recorded, "dropped": self.dropped}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.recorded = 0
+            self.dropped = 0
+
+
+slow_queries = SlowQueryLog(cfg.SLOW_QUERY_MAX_FINGERPRINTS)
+
+
+def _store_plan(entry: Dict[str, Any], capture: Callable[[], Optional[str]]):
+    try:
+        slow_queries.set_plan(entry, capture())
+    except Exception as e:  # план — диагностика, запрос пользователя от неё не падает
+        slow_queries.set_plan(entry, None)
+        logger.warning("plan capture failed for %s: %s", entry["fingerprint"], e)
+
+
+def request_plan(conn, entry: Dict[str, Any], statement: str, parameters):
+    """Снять план отпечатка: SQLite — сразу на соединении выражения, MSSQL — в ``plan_worker``."""
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        _store_plan(entry, lambda: _sqlite_plan(conn.connection.dbapi_connection, statement, parameters))
+    elif dialect == "mssql":
+        engine = conn.engine
+        if not plan_worker.submit(_store_plan, entry, lambda: _mssql_plan(_plan_engine(engine), statement, parameters)):
+            slow_queries.retry_plan(entry)
+    else:
+        slow_queries.set_plan(entry, None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # начало — в ExecutionContext выражения: упавшее выражение не оставляет состояния на соединении
+    if cfg.SLOW_QUERY_LOG and context is not None:
+        context.slowlog_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "slowlog_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    if elapsed * 1000 < cfg.SLOW_QUERY_MS:
+        return
+    stats = instrumentation.current()
+    route = f"{stats.scope.get('method')} {stats.route()}" if stats else None
+    entry = slow_queries.record(statement, parameters, executemany, elapsed, route)
+    logger.warning("slow query %.1f ms [%s] %s", elapsed * 1000, route or "-", statement[:300])
+    if entry is not None and cfg.SLOW_QUERY_PLANS:
+        request_plan(conn, entry, statement, parameters)
@@ -1,17 +1,91 @@
 """Единая точка входа для запуска бэкенда.
 
 Запускает Uvicorn-сервер с приложением FastAPI из `app.backend.api`.
+Режим dev (по умолчанию) — один процесс с перезагрузкой по изменениям файлов.
+Режим prod — несколько воркеров (по умолчанию по числу ядер) без перезагрузки,
+uvloop/httptools, если установлены, и без `create_all` при старте каждого воркера
+(схему создают `scripts/apply_sql.py` и миграции).
+Настройки — из `.env` (`SERVER_*`, `THREADPOOL_SIZE`, `DB_CREATE_TABLES`), аргументы командной строки их перекрывают.
 Пример запуска:
     python main.py
+    python main.py --prod --host 0.0.0.0 --workers 8
 или
     python -m main
 """
-import uvicorn
+import argparse
+import os
 
+from app.backend.config import config as cfg
 
-def main():
-    # Запускаем сервер на localhost:8000
-    uvicorn.run("app.backend.api:app", host="127.0.0.1", port=8000, reload=True)
+APP = "app.backend.api:app"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Запуск API (uvicorn)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--prod", dest="mode", action="store_const", const="prod", help="Воркеры без перезагрузки")
+    mode.add_argument("--dev", dest="mode", action="store_const", const="dev", help="Один процесс с перезагрузкой")
+    parser.add_argument("--host", default=cfg.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=cfg.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=cfg.SERVER_WORKERS, help="0 — по числу ядер (только prod)")
+    parser.add_argument("--loop", default=cfg.SERVER_LOOP, choices=("auto", "uvloop", "asyncio"))
+    parser.add_argument("--http", default=cfg.SERVER_HTTP, choices=("auto", "httptools", "h11"))
+    parser.add_argument("--backlog", type=int, default=cfg.SERVER_BACKLOG, help="Очередь непринятых соединений")
+    parser.add_argument("--keep-alive", type=int, default=cfg.SERVER_KEEPALIVE, help="Секунд держать keep-alive")
+    parser.add_argument("--graceful-timeout", type=int, default=cfg.SERVER_GRACEFUL_TIMEOUT,
+                        help="Секунд ждать текущие запросы при остановке")
+    parser.add_argument("--threadpool", type=int, default=cfg.THREADPOOL_SIZE,
+                        help="Потоков для синхронных эндпоинтов в каждом воркере")
+    parser.add_argument("--create-tables", action=argparse.BooleanOptionalAction, default=None,
+                        help="create_all при старте воркера (по умолчанию DB_CREATE_TABLES; в prod — только если он задан явно)")
+    parser.add_argument("--no-access-log", dest="access_log", action="store_false", default=cfg.SERVER_ACCESS_LOG)
+    args = parser.parse_args(argv)
+    args.mode = args.mode or cfg.SERVER_MODE
+    if args.mode not in ("dev", "prod"):
+        parser.error(f"SERVER_MODE must be dev or prod, got {args.mode!r}")
+    return args
+
+
+def server_options(args) -> dict:
+    """Аргументы uvicorn.run для выбранного режима."""
+    options = {
+        "host": args.host,
+        "port": args.port,
+        "loop": args.loop,
+        "http": args.http,
+        "backlog": args.backlog,
+        "timeout_keep_alive": args.keep_alive,
+        "timeout_graceful_shutdown": args.graceful_timeout,
+        "access_log": args.access_log,
+    }
+    if args.mode == "dev":
+        options["reload"] = True
+    else:
+        options["workers"] = args.workers or os.cpu_count() or 1
+    return options
+
+
+def worker_env(args) -> dict:
+    """Настройки, которые воркеры читают из окружения при импорте config."""
+    create_tables = args.create_tables
+    if create_tables is None:
+        # prod создаёт таблицы, только если DB_CREATE_TABLES задан явно
+        create_tables = cfg.DB_CREATE_TABLES if args.mode == "dev" or "DB_CREATE_TABLES" in os.environ else False
+    return {"DB_CREATE_TABLES": "1" if create_tables else "0", "THREADPOOL_SIZE": str(args.threadpool)}
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    env = worker_env(args)
+    # воркеры (и перезагрузчик) — отдельные процессы, они наследуют окружение;
+    # один процесс prod импортирует приложение здесь же, поэтому правится и загруженный config
+    os.environ.update(env)
+    cfg.DB_CREATE_TABLES = env["DB_CREATE_TABLES"] == "1"
+    cfg.THREADPOOL_SIZE = args.threadpool
+
+    import uvicorn
+
+    uvicorn.run(APP, **server_options(args))
 
 
 if __name__ == "__main__":
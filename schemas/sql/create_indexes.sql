@@ -1,9 +1,36 @@
 -- Создать индексы для ускорения типичных запросов
+-- Каждый индекс создаётся, только если его ещё нет: файл можно применять повторно.
+-- С scripts/apply_sql.py --online индексы строятся с ONLINE = ON.
 -- 1) индекс по projects(name)
-CREATE INDEX IX_projects_name ON projects([name]);
+IF INDEXPROPERTY(OBJECT_ID('projects'), 'IX_projects_name', 'IndexID') IS NULL
+    CREATE INDEX IX_projects_name ON projects([name]);
+GO
 
 -- 2) индекс по tasks(project_id)
-CREATE INDEX IX_tasks_project_id ON tasks(project_id);
+IF INDEXPROPERTY(OBJECT_ID('tasks'), 'IX_tasks_project_id', 'IndexID') IS NULL
+    CREATE INDEX IX_tasks_project_id ON tasks(project_id);
+GO
 
 -- 3) частичный/композитный индекс по tasks(status, priority)
-CREATE INDEX IX_tasks_status_priority ON tasks(status, priority);
+--    INCLUDE покрывает /tasks/stats: GROUP BY status, priority с метриками по time_estimation
+--    и фильтром project_id читается только из индекса
+--    Индекс прежней версии (без INCLUDE) перестраивается через DROP_EXISTING.
+IF INDEXPROPERTY(OBJECT_ID('tasks'), 'IX_tasks_status_priority', 'IndexID') IS NULL
+    CREATE INDEX IX_tasks_status_priority ON tasks(status, priority) INCLUDE (project_id, time_estimation);
+ELSE IF NOT EXISTS (SELECT 1 FROM sys.index_columns ic
+                    JOIN sys.indexes i ON i.object_id = ic.object_id AND i.index_id = ic.index_id
+                    WHERE i.object_id = OBJECT_ID('tasks') AND i.name = 'IX_tasks_status_priority'
+                      AND ic.is_included_column = 1)
+    CREATE INDEX IX_tasks_status_priority ON tasks(status, priority) INCLUDE (project_id, time_estimation)
+        WITH (DROP_EXISTING = ON);
+GO
+
+-- 4) комментарии задачи в хронологическом порядке: фильтр task_id + сортировка/keyset по created_at
+IF INDEXPROPERTY(OBJECT_ID('comments'), 'IX_comments_task_id_created_at', 'IndexID') IS NULL
+    CREATE INDEX IX_comments_task_id_created_at ON comments(task_id, created_at);
+GO
+
+-- 5) вложения комментария (фильтр comment_id, каскадное удаление)
+IF INDEXPROPERTY(OBJECT_ID('attachments'), 'IX_attachments_comment_id', 'IndexID') IS NULL
+    CREATE INDEX IX_attachments_comment_id ON attachments(comment_id);
+GO
@@ -0,0 +1,36 @@
+-- Полнотекстовый поиск для GET /search (T-SQL)
+-- Каталог ft_viewer и индексы по projects(name, description), tasks(name), comments(message).
+-- CREATE FULLTEXT CATALOG/INDEX нельзя выполнять внутри пользовательской транзакции,
+-- поэтому apply_sql.py выполняет этот файл в режиме autocommit:
+-- apply_sql: autocommit
+-- CHANGE_TRACKING AUTO обновляет индексы в фоне после каждой записи, отдельный пересчёт не нужен.
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.fulltext_catalogs WHERE name = 'ft_viewer')
+    CREATE FULLTEXT CATALOG ft_viewer;
+GO
+
+-- KEY INDEX — первичный ключ таблицы; его имя генерирует сервер, поэтому берётся из sys.indexes
+DECLARE @pk sysname;
+
+IF NOT EXISTS (SELECT 1 FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('projects'))
+BEGIN
+    SELECT @pk = name FROM sys.indexes WHERE object_id = OBJECT_ID('projects') AND is_primary_key = 1;
+    EXEC('CREATE FULLTEXT INDEX ON projects([name], description) KEY INDEX ' + QUOTENAME(@pk)
+         + ' ON ft_viewer WITH CHANGE_TRACKING AUTO');
+END
+
+IF NOT EXISTS (SELECT 1 FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('tasks'))
+BEGIN
+    SELECT @pk = name FROM sys.indexes WHERE object_id = OBJECT_ID('tasks') AND is_primary_key = 1;
+    EXEC('CREATE FULLTEXT INDEX ON tasks([name]) KEY INDEX ' + QUOTENAME(@pk)
+         + ' ON ft_viewer WITH CHANGE_TRACKING AUTO');
+END
+
+IF NOT EXISTS (SELECT 1 FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('comments'))
+BEGIN
+    SELECT @pk = name FROM sys.indexes WHERE object_id = OBJECT_ID('comments') AND is_primary_key = 1;
+    EXEC('CREATE FULLTEXT INDEX ON comments(message) KEY INDEX ' + QUOTENAME(@pk)
+         + ' ON ft_viewer WITH CHANGE_TRACKING AUTO');
+END
+GO
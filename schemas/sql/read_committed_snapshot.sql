@@ -0,0 +1,10 @@
+-- apply_sql: autocommit
+-- Чтение версий и агрегатов (crud/versions.py, crud/aggregates.py) складывает хранимую строку
+-- с несвёрнутыми строками журнала table_changes одним SELECT. С READ_COMMITTED_SNAPSHOT такой
+-- SELECT видит согласованный снимок на начало выражения: не ждёт незафиксированные строки
+-- журнала пишущих транзакций и не считает строки дважды (или не теряет их) во время свёртки.
+-- ALTER DATABASE нельзя выполнять в транзакции; ROLLBACK IMMEDIATE прерывает открытые
+-- транзакции других сессий, поэтому скрипт стоит применять вне пиковой нагрузки.
+IF (SELECT is_read_committed_snapshot_on FROM sys.databases WHERE name = DB_NAME()) = 0
+    ALTER DATABASE CURRENT SET READ_COMMITTED_SNAPSHOT ON WITH ROLLBACK IMMEDIATE;
+GO
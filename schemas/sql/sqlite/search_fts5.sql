@@ -0,0 +1,50 @@
+-- Замена полнотекстового каталога MSSQL для SQLite (тесты, локальный запуск): FTS5 + триггеры.
+-- Выполняется автоматически после create_all на SQLite (crud/search.py).
+-- rowid индекса = id * 4 + вид (1 — проект, 2 — задача, 3 — комментарий): триггеры
+-- обновляют и удаляют строку индекса поиском по rowid, а не сканированием.
+CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+    parent_id UNINDEXED,
+    title,
+    body,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+GO
+
+CREATE TRIGGER IF NOT EXISTS search_projects_ai AFTER INSERT ON projects BEGIN
+    INSERT INTO search_fts(rowid, parent_id, title, body) VALUES (new.id * 4 + 1, NULL, new.name, new.description);
+END
+GO
+CREATE TRIGGER IF NOT EXISTS search_projects_au AFTER UPDATE OF name, description ON projects BEGIN
+    UPDATE search_fts SET title = new.name, body = new.description WHERE rowid = old.id * 4 + 1;
+END
+GO
+CREATE TRIGGER IF NOT EXISTS search_projects_ad AFTER DELETE ON projects BEGIN
+    DELETE FROM search_fts WHERE rowid = old.id * 4 + 1;
+END
+GO
+
+CREATE TRIGGER IF NOT EXISTS search_tasks_ai AFTER INSERT ON tasks BEGIN
+    INSERT INTO search_fts(rowid, parent_id, title, body) VALUES (new.id * 4 + 2, new.project_id, new.name, NULL);
+END
+GO
+CREATE TRIGGER IF NOT EXISTS search_tasks_au AFTER UPDATE OF name, project_id ON tasks BEGIN
+    UPDATE search_fts SET title = new.name, parent_id = new.project_id WHERE rowid = old.id * 4 + 2;
+END
+GO
+CREATE TRIGGER IF NOT EXISTS search_tasks_ad AFTER DELETE ON tasks BEGIN
+    DELETE FROM search_fts WHERE rowid = old.id * 4 + 2;
+END
+GO
+
+CREATE TRIGGER IF NOT EXISTS search_comments_ai AFTER INSERT ON comments BEGIN
+    INSERT INTO search_fts(rowid, parent_id, title, body) VALUES (new.id * 4 + 3, new.task_id, NULL, new.message);
+END
+GO
+CREATE TRIGGER IF NOT EXISTS search_comments_au AFTER UPDATE OF message, task_id ON comments BEGIN
+    UPDATE search_fts SET body = new.message, parent_id = new.task_id WHERE rowid = old.id * 4 + 3;
+END
+GO
+CREATE TRIGGER IF NOT EXISTS search_comments_ad AFTER DELETE ON comments BEGIN
+    DELETE FROM search_fts WHERE rowid = old.id * 4 + 3;
+END
+GO
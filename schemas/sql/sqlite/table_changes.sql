@@ -0,0 +1,63 @@
+-- Журнал изменений table_changes для SQLite (аналог schemas/sql/table_changes.sql).
+-- Выполняется автоматически после create_all на SQLite (crud/changes.py).
+-- Триггеры SQLite построчные: по строке журнала на каждую изменённую строку.
+-- Каскад FK (ON DELETE CASCADE) тоже вызывает триггеры дочерних таблиц.
+CREATE TRIGGER IF NOT EXISTS changes_projects_ai AFTER INSERT ON projects BEGIN
+    INSERT INTO table_changes (name, row_delta, value_sum, value_count)
+    VALUES ('projects', 1, COALESCE(new.budget, 0), new.budget IS NOT NULL);
+END
+GO
+CREATE TRIGGER IF NOT EXISTS changes_projects_au AFTER UPDATE ON projects BEGIN
+    INSERT INTO table_changes (name, row_delta, value_sum, value_count)
+    VALUES ('projects', 0, COALESCE(new.budget, 0) - COALESCE(old.budget, 0),
+            (new.budget IS NOT NULL) - (old.budget IS NOT NULL));
+END
+GO
+CREATE TRIGGER IF NOT EXISTS changes_projects_ad AFTER DELETE ON projects BEGIN
+    INSERT INTO table_changes (name, row_delta, value_sum, value_count)
+    VALUES ('projects', -1, -COALESCE(old.budget, 0), -(old.budget IS NOT NULL));
+END
+GO
+
+CREATE TRIGGER IF NOT EXISTS changes_tasks_ai AFTER INSERT ON tasks BEGIN
+    INSERT INTO table_changes (name, row_delta, value_sum, value_count)
+    VALUES ('tasks', 1, COALESCE(new.time_estimation, 0), new.time_estimation IS NOT NULL);
+END
+GO
+CREATE TRIGGER IF NOT EXISTS changes_tasks_au AFTER UPDATE ON tasks BEGIN
+    INSERT INTO table_changes (name, row_delta, value_sum, value_count)
+    VALUES ('tasks', 0, COALESCE(new.time_estimation, 0) - COALESCE(old.time_estimation, 0),
+            (new.time_estimation IS NOT NULL) - (old.time_estimation IS NOT NULL));
+END
+GO
+CREATE TRIGGER IF NOT EXISTS changes_tasks_ad AFTER DELETE ON tasks BEGIN
+    INSERT INTO table_changes (name, row_delta, value_sum, value_count)
+    VALUES ('tasks', -1, -COALESCE(old.time_estimation, 0), -(old.time_estimation IS NOT NULL));
+END
+GO
+
+CREATE TRIGGER IF NOT EXISTS changes_comments_ai AFTER INSERT ON comments BEGIN
+    INSERT INTO table_changes (name, row_delta, value_sum, value_count) VALUES ('comments', 1, 0, 0);
+END
+GO
+CREATE TRIGGER IF NOT EXISTS changes_comments_au AFTER UPDATE ON comments BEGIN
+    INSERT INTO table_changes (name, row_delta, value_sum, value_count) VALUES ('comments', 0, 0, 0);
+END
+GO
+CREATE TRIGGER IF NOT EXISTS changes_comments_ad AFTER DELETE ON comments BEGIN
+    INSERT INTO table_changes (name, row_delta, value_sum, value_count) VALUES ('comments', -1, 0, 0);
+END
+GO
+
+CREATE TRIGGER IF NOT EXISTS changes_attachments_ai AFTER INSERT ON attachments BEGIN
+    INSERT INTO table_changes (name, row_delta, value_sum, value_count) VALUES ('attachments', 1, 0, 0);
+END
+GO
+CREATE TRIGGER IF NOT EXISTS changes_attachments_au AFTER UPDATE ON attachments BEGIN
+    INSERT INTO table_changes (name, row_delta, value_sum, value_count) VALUES ('attachments', 0, 0, 0);
+END
+GO
+CREATE TRIGGER IF NOT EXISTS changes_attachments_ad AFTER DELETE ON attachments BEGIN
+    INSERT INTO table_changes (name, row_delta, value_sum, value_count) VALUES ('attachments', -1, 0, 0);
+END
+GO
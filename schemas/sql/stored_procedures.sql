@@ -2,7 +2,7 @@
 GO
 
 -- 1) Процедура без параметров: возвращает все активные проекты
-CREATE PROCEDURE sp_get_active_projects
+CREATE OR ALTER PROCEDURE sp_get_active_projects
 AS
 BEGIN
     SET NOCOUNT ON;
@@ -11,7 +11,7 @@ END
 GO
 
 -- 2) Процедура с входным параметром: возвращает задачи для проекта
-CREATE PROCEDURE sp_get_tasks_for_project
+CREATE OR ALTER PROCEDURE sp_get_tasks_for_project
     @proj_id INT
 AS
 BEGIN
@@ -21,7 +21,7 @@ END
 GO
 
 -- 3) Процедура с выходным параметром: возвращает количество задач в проекте
-CREATE PROCEDURE sp_count_tasks_for_project
+CREATE OR ALTER PROCEDURE sp_count_tasks_for_project
     @proj_id INT,
     @out_count INT OUTPUT
 AS
@@ -0,0 +1,77 @@
+-- Журнал изменений table_changes (app/backend/crud/changes.py): AFTER-триггеры добавляют
+-- по строке на выражение с дельтами числа строк, суммы и числа непустых значений
+-- отслеживаемой колонки; число строк журнала — прирост версии таблицы для ETag.
+-- Строки только добавляются: у записей нет общей «горячей» строки aggregate_stats или
+-- table_versions, а приложение не выполняет лишних выражений. Журнал сворачивает в
+-- хранимые строки фоновая задача API (STATS_COMPACT_INTERVAL).
+-- Таблицы с этими триггерами помечены implicit_returning=False (OUTPUT без INTO запрещён).
+GO
+
+IF OBJECT_ID('table_changes') IS NULL
+BEGIN
+    CREATE TABLE table_changes (
+        id BIGINT IDENTITY(1,1) PRIMARY KEY,
+        name NVARCHAR(50) NOT NULL,
+        row_delta BIGINT NOT NULL DEFAULT 0,
+        value_sum NUMERIC(20, 2) NOT NULL DEFAULT 0,
+        value_count BIGINT NOT NULL DEFAULT 0
+    );
+    CREATE INDEX ix_table_changes_name ON table_changes (name);
+END
+GO
+
+CREATE OR ALTER TRIGGER trg_projects_changes
+ON projects
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    IF NOT EXISTS (SELECT 1 FROM inserted) AND NOT EXISTS (SELECT 1 FROM deleted) RETURN;
+    INSERT INTO table_changes (name, row_delta, value_sum, value_count)
+    SELECT 'projects',
+           (SELECT COUNT(*) FROM inserted) - (SELECT COUNT(*) FROM deleted),
+           ISNULL((SELECT SUM(budget) FROM inserted), 0) - ISNULL((SELECT SUM(budget) FROM deleted), 0),
+           (SELECT COUNT(budget) FROM inserted) - (SELECT COUNT(budget) FROM deleted);
+END
+GO
+
+CREATE OR ALTER TRIGGER trg_tasks_changes
+ON tasks
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    IF NOT EXISTS (SELECT 1 FROM inserted) AND NOT EXISTS (SELECT 1 FROM deleted) RETURN;
+    INSERT INTO table_changes (name, row_delta, value_sum, value_count)
+    SELECT 'tasks',
+           (SELECT COUNT(*) FROM inserted) - (SELECT COUNT(*) FROM deleted),
+           ISNULL((SELECT SUM(CAST(time_estimation AS BIGINT)) FROM inserted), 0)
+               - ISNULL((SELECT SUM(CAST(time_estimation AS BIGINT)) FROM deleted), 0),
+           (SELECT COUNT(time_estimation) FROM inserted) - (SELECT COUNT(time_estimation) FROM deleted);
+END
+GO
+
+-- comments и attachments: отслеживаемой колонки нет, строка журнала — только версия таблицы
+CREATE OR ALTER TRIGGER trg_comments_changes
+ON comments
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    IF NOT EXISTS (SELECT 1 FROM inserted) AND NOT EXISTS (SELECT 1 FROM deleted) RETURN;
+    INSERT INTO table_changes (name, row_delta)
+    SELECT 'comments', (SELECT COUNT(*) FROM inserted) - (SELECT COUNT(*) FROM deleted);
+END
+GO
+
+CREATE OR ALTER TRIGGER trg_attachments_changes
+ON attachments
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    IF NOT EXISTS (SELECT 1 FROM inserted) AND NOT EXISTS (SELECT 1 FROM deleted) RETURN;
+    INSERT INTO table_changes (name, row_delta)
+    SELECT 'attachments', (SELECT COUNT(*) FROM inserted) - (SELECT COUNT(*) FROM deleted);
+END
+GO
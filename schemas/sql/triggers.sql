@@ -13,7 +13,7 @@ BEGIN
 END
 GO
 
-CREATE TRIGGER trg_tasks_after_insert
+CREATE OR ALTER TRIGGER trg_tasks_after_insert
 ON tasks
 AFTER INSERT
 AS
@@ -25,7 +25,7 @@ END
 GO
 
 -- AFTER UPDATE на tasks: логируем изменения
-CREATE TRIGGER trg_tasks_after_update
+CREATE OR ALTER TRIGGER trg_tasks_after_update
 ON tasks
 AFTER UPDATE
 AS
@@ -37,7 +37,7 @@ END
 GO
 
 -- AFTER DELETE на tasks: логируем удаление
-CREATE TRIGGER trg_tasks_after_delete
+CREATE OR ALTER TRIGGER trg_tasks_after_delete
 ON tasks
 AFTER DELETE
 AS
@@ -63,7 +63,7 @@ LEFT JOIN tasks t ON t.project_id = p.id
 GROUP BY p.id, p.name;
 GO
 
-CREATE TRIGGER trg_v_project_summaries_instead_of_insert
+CREATE OR ALTER TRIGGER trg_v_project_summaries_instead_of_insert
 ON v_project_summaries
 INSTEAD OF INSERT
 AS
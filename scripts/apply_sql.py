@@ -1,8 +1,34 @@
+"""Применение SQL-скриптов из schemas/sql/ на MSSQL (разделитель ``GO``).
+
+Применённые файлы записываются в таблицу-журнал ``schema_migrations`` вместе с
+контрольной суммой: при следующем запуске неизменённые файлы пропускаются,
+новые и изменённые — выполняются. Каждый файл выполняется в своей транзакции
+(вместе с записью в журнал), ошибка откатывает только его и останавливает запуск.
+Файл с строкой ``-- apply_sql: autocommit`` выполняется без транзакции
+(полнотекстовый DDL внутри транзакции запрещён). С ``--online`` без транзакции
+выполняются и файлы с ``CREATE INDEX``: каждый индекс фиксируется сразу после
+построения и не держит блокировки схемы до конца файла, а ошибка позднего индекса
+не откатывает уже построенные (файлы идемпотентны, повторный запуск достроит остальное).
+
+Запуск из корня проекта:
+    python scripts/apply_sql.py                    # все новые/изменённые файлы
+    python scripts/apply_sql.py --dry-run          # только план
+    python scripts/apply_sql.py --online           # CREATE INDEX ... WITH (ONLINE = ON)
+    python scripts/apply_sql.py create_indexes.sql # один файл
+"""
+import argparse
+import hashlib
 import os
+import re
 import sys
+import time
 from pathlib import Path
 from dotenv import load_dotenv
-import pymssql
+
+LEDGER_TABLE = "schema_migrations"
+AUTOCOMMIT_MARK = "-- apply_sql: autocommit"
+
+_CREATE_INDEX = re.compile(r"\bCREATE\s+(?:UNIQUE\s+)?(?:(?:NON)?CLUSTERED\s+)?INDEX\b[^;]*", re.IGNORECASE)
 
 
 def load_env(env_path: Path):
@@ -41,72 +67,176 @@ def split_sql_statements(sql_text: str):
     return parts
 
 
-def apply_sql_file(cursor, filepath: Path):
-    print(f"Выполняю {filepath}")
-    text = filepath.read_text(encoding='utf-8')
-    statements = split_sql_statements(text)
-    for stmt in statements:
+def checksum(sql_text: str) -> str:
+    # окончания строк нормализуются: checkout на Windows не должен давать «изменённый» файл
+    return hashlib.sha256(sql_text.replace('\r\n', '\n').encode('utf-8')).hexdigest()
+
+
+def needs_autocommit(sql_text: str, online: bool = False) -> bool:
+    # DDL полнотекстового поиска нельзя выполнять внутри транзакции;
+    # онлайн-индексы фиксируются по одному, не дожидаясь конца файла
+    if online and _CREATE_INDEX.search(sql_text):
+        return True
+    return any(line.strip().lower() == AUTOCOMMIT_MARK for line in sql_text.splitlines())
+
+
+def with_online(stmt: str) -> str:
+    """Добавить ONLINE = ON ко всем CREATE INDEX пакета (нужна редакция Enterprise/Developer/Azure SQL)."""
+    def patch(m):
+        sql = m.group(0)
+        if re.search(r"\bONLINE\s*=", sql, re.IGNORECASE):
+            return sql
+        if re.search(r"\bWITH\s*\(", sql, re.IGNORECASE):
+            return re.sub(r"\bWITH\s*\(", "WITH (ONLINE = ON, ", sql, count=1, flags=re.IGNORECASE)
+        return sql.rstrip() + " WITH (ONLINE = ON)"
+    return _CREATE_INDEX.sub(patch, stmt)
+
+
+def plan(sql_files, ledger):
+    """[(файл, текст, контрольная сумма, статус)], статус: new | changed | unchanged."""
+    result = []
+    for f in sql_files:
+        text = f.read_text(encoding='utf-8')
+        digest = checksum(text)
+        applied = ledger.get(f.name)
+        status = 'new' if applied is None else ('unchanged' if applied == digest else 'changed')
+        result.append((f, text, digest, status))
+    return result
+
+
+def ensure_ledger(cursor):
+    cursor.execute(f"""
+IF OBJECT_ID('{LEDGER_TABLE}') IS NULL
+    CREATE TABLE {LEDGER_TABLE} (
+        file_name NVARCHAR(255) NOT NULL PRIMARY KEY,
+        checksum CHAR(64) NOT NULL,
+        applied_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+        duration_ms INT NOT NULL
+    )""")
+
+
+def load_ledger(cursor):
+    cursor.execute(f"IF OBJECT_ID('{LEDGER_TABLE}') IS NOT NULL SELECT file_name, checksum FROM {LEDGER_TABLE}")
+    try:
+        return {name: digest for name, digest in cursor.fetchall()}
+    except Exception:
+        # журнала ещё нет: пакет не вернул результата
+        return {}
+
+
+def record(cursor, name: str, digest: str, duration_ms: int):
+    cursor.execute(f"DELETE FROM {LEDGER_TABLE} WHERE file_name = %s", (name,))
+    cursor.execute(f"INSERT INTO {LEDGER_TABLE} (file_name, checksum, duration_ms) VALUES (%s, %s, %d)",
+                   (name, digest, duration_ms))
+
+
+def apply_sql_file(cursor, filepath: Path, text: str, online: bool = False) -> float:
+    """Выполнить пакеты файла по одному; печатает время каждого пакета, возвращает общее время в секундах."""
+    print(f"Выполняю {filepath.name}")
+    total = 0.0
+    for n, stmt in enumerate(split_sql_statements(text), 1):
         stmt = stmt.strip()
         if not stmt:
             continue
+        if online:
+            stmt = with_online(stmt)
+        first_line = next((line for line in stmt.splitlines() if line.strip() and not line.strip().startswith('--')), '')
+        t0 = time.perf_counter()
         try:
             cursor.execute(stmt)
-            print("Успешно выполнено выражение — длина:", len(stmt))
         except Exception as e:
-            print(f"Ошибка при выполнении выражения: {e}")
+            print(f"  пакет {n}: ошибка: {e}\n  {first_line[:100]}")
             raise
+        elapsed = time.perf_counter() - t0
+        total += elapsed
+        print(f"  пакет {n}: {elapsed * 1000:9.1f} ms  {first_line[:80]}")
+    return total
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Применение новых и изменённых SQL-скриптов из schemas/sql/")
+    parser.add_argument("files", nargs="*", help="Файлы (путь или имя в schemas/sql/); по умолчанию все *.sql")
+    parser.add_argument("--dry-run", action="store_true", help="Показать план и ничего не выполнять")
+    parser.add_argument("--online", action="store_true",
+                        help="Строить индексы с ONLINE = ON (таблица остаётся доступной на запись)")
+    return parser.parse_args()
+
+
+def resolve_files(sql_dir: Path, names):
+    if not names:
+        return sorted(sql_dir.glob('*.sql'))
+    files = []
+    for name in names:
+        arg_path = Path(name)
+        # попытаться отнести к папке schemas/sql
+        candidate = arg_path if arg_path.is_file() else sql_dir / name
+        if not candidate.is_file():
+            raise FileNotFoundError(f"Указанный файл не найден: {name}")
+        files.append(candidate)
+    return files
 
 
 def main():
+    args = parse_args()
     env_path = Path(__file__).resolve().parents[1] / '.env'
     try:
         load_env(env_path)
     except Exception as e:
         print(str(e))
-        return
-
-    server, user, password, database = get_connection_params()
-    print(f"Подключаюсь к серверу {server}, базе {database} как {user}")
+        return 1
 
     sql_dir = Path(__file__).resolve().parents[1] / 'schemas' / 'sql'
     if not sql_dir.exists():
         print(f"Папка со скриптами не найдена: {sql_dir}")
-        return
-
-    # Если передан путь к файлу в аргументе, применяем только его
-    sql_files = []
-    if len(sys.argv) > 1:
-        arg_path = Path(sys.argv[1])
-        if arg_path.is_file():
-            sql_files = [arg_path]
-        else:
-            # попытаться отнести к папке schemas/sql
-            candidate = sql_dir / sys.argv[1]
-            if candidate.is_file():
-                sql_files = [candidate]
-            else:
-                print(f"Указанный файл не найден: {sys.argv[1]}")
-                return
-    else:
-        sql_files = sorted(sql_dir.glob('*.sql'))
-        if not sql_files:
-            print("SQL файлы не найдены в папке schemas/sql/")
-            return
+        return 1
+    try:
+        sql_files = resolve_files(sql_dir, args.files)
+    except FileNotFoundError as e:
+        print(str(e))
+        return 1
+    if not sql_files:
+        print("SQL файлы не найдены в папке schemas/sql/")
+        return 1
 
+    import pymssql
+
+    server, user, password, database = get_connection_params()
+    print(f"Подключаюсь к серверу {server}, базе {database} как {user}")
     conn = pymssql.connect(server=server, user=user, password=password, database=database)
     cursor = conn.cursor()
     try:
-        for f in sql_files:
-            apply_sql_file(cursor, f)
+        steps = plan(sql_files, load_ledger(cursor))
+        for f, _, _, status in steps:
+            print(f"  {status:9s} {f.name}")
+        todo = [s for s in steps if s[3] != 'unchanged']
+        if args.dry_run or not todo:
+            print("Нечего применять." if not todo else f"К применению: {len(todo)} (dry-run, ничего не выполнено)")
+            return 0
+
+        ensure_ledger(cursor)
         conn.commit()
+        for f, text, digest, status in todo:
+            autocommit = needs_autocommit(text, online=args.online)
+            conn.autocommit(autocommit)
+            try:
+                elapsed = apply_sql_file(cursor, f, text, online=args.online)
+                record(cursor, f.name, digest, int(elapsed * 1000))
+                if not autocommit:
+                    conn.commit()
+            except Exception as e:
+                if not autocommit:
+                    conn.rollback()
+                print(f"Ошибка в {f.name}, файл откатан, дальнейшие файлы не применялись: {e}")
+                return 1
+            finally:
+                conn.autocommit(False)
+            print(f"Применён {f.name} ({status}) за {elapsed:.2f} s")
         print("Все скрипты успешно применены.")
-    except Exception as e:
-        print("Ошибка при применении скриптов:", e)
-        conn.rollback()
+        return 0
     finally:
         cursor.close()
         conn.close()
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
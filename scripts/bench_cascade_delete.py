@@ -0,0 +1,76 @@
+"""Бенчмарк удаления проекта: ORM-каскад против пассивного удаления (каскад в БД).
+
+Для каждого режима заново создаёт проект с заданным числом потомков
+(задачи, комментарии, вложения) в файловой SQLite-базе и замеряет
+``crud.delete_project``.
+
+Запуск из корня проекта:
+    python -m scripts.bench_cascade_delete --descendants 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--descendants", type=int, default=100_000,
+                        help="Всего потомков проекта (делятся между задачами, комментариями и вложениями 1:2:2)")
+    parser.add_argument("--db", type=Path, default=None, help="Путь к файлу SQLite (по умолчанию временный)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    db_path = args.db or Path(tempfile.mkdtemp()) / "bench_cascade.db"
+    os.environ["DATABASE_URL"] = f"sqlite+pysqlite:///{db_path}"
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+    from sqlalchemy import func, insert, select, text
+
+    from app.backend.crud import crud
+    from app.backend.crud.db import Base, SessionLocal, engine
+    from app.backend.models import models
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        # без индексов по FK каскад в БД сканирует дочерние таблицы целиком
+        conn.execute(text("CREATE INDEX IF NOT EXISTS IX_tasks_project_id ON tasks(project_id)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS IX_comments_task_id ON comments(task_id)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS IX_attachments_comment_id ON attachments(comment_id)"))
+    n_tasks = max(args.descendants // 5, 1)
+
+    def seed() -> int:
+        with engine.begin() as conn:
+            project_id = conn.execute(insert(models.Project).values(name="bench").returning(models.Project.id)).scalar_one()
+            base = conn.execute(select(func.coalesce(func.max(models.Task.id), 0))).scalar_one()
+            task_ids = range(base + 1, base + n_tasks + 1)
+            conn.execute(insert(models.Task), [{"id": i, "project_id": project_id, "name": f"t{i}"} for i in task_ids])
+            base_c = conn.execute(select(func.coalesce(func.max(models.Comment.id), 0))).scalar_one()
+            comments = [{"id": base_c + k + 1, "task_id": task_ids[k // 2], "message": "m"} for k in range(2 * n_tasks)]
+            conn.execute(insert(models.Comment), comments)
+            conn.execute(insert(models.Attachment), [{"comment_id": c["id"], "file_name": "f"} for c in comments])
+        return project_id
+
+    total = n_tasks * 5
+    for passive in (False, True):
+        project_id = seed()
+        session = SessionLocal()
+        try:
+            t0 = time.perf_counter()
+            assert crud.delete_project(session, project_id, passive=passive)
+            elapsed = time.perf_counter() - t0
+        finally:
+            session.close()
+        with engine.connect() as conn:
+            left = conn.execute(select(func.count()).select_from(models.Attachment)).scalar_one()
+        assert left == 0, "каскад не удалил вложения"
+        mode = "passive (каскад в БД)" if passive else "ORM cascade"
+        print(f"{mode:24s} потомков: {total:>8d}  время: {elapsed:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,445 @@
+"""Бенчмарк эндпоинтов api.py: задержки p50/p95/p99, пропускная способность и пиковая память.
+
+Заполняет базу детерминированным набором (``app/backend/crud/loader.py``, генератор
+с ``--seed``) — по умолчанию файловая SQLite, ``--database-url`` для MSSQL (например,
+локальный контейнер), — и прогоняет сценарии по всем эндпоинтам на нескольких
+уровнях конкурентности: в процессе (``TestClient``) и через сокет (``uvicorn``
+в отдельном процессе). Уже заполненная база переиспользуется.
+
+Пишущие сценарии трогают только строки, созданные самим бенчмарком до замера
+(удаления — каждое свою новую строку), и по окончании режима эти строки удаляются,
+так что набор данных между запусками не меняется. Ответы не 2xx считаются ошибками
+и в задержки не попадают. Тяжёлые выгрузки целых таблиц (отчёты,
+``/demo/*``) выполняются меньшее число раз.
+
+Результат — JSON (``--out``); с ``--baseline`` запуск сравнивается с сохранённым
+результатом и завершается с кодом 1, если p95 вырос или пропускная способность
+упала больше чем на ``--threshold``.
+
+Запуск из корня проекта:
+    python -m scripts.bench_endpoints --projects 1000 --tasks-per-project 20 --concurrency 1,8 --out bench.json
+    python -m scripts.bench_endpoints --projects 10000 --tasks-per-project 100 --comments-per-task 5 \\
+        --mode both --baseline bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None, help="URL SQLAlchemy (по умолчанию файловая SQLite в --db)")
+    parser.add_argument("--db", type=Path, default=None, help="Файл SQLite (по умолчанию во временной папке по размеру набора)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--projects", type=int, default=1000)
+    parser.add_argument("--tasks-per-project", type=int, default=20)
+    parser.add_argument("--comments-per-task", type=int, default=2)
+    parser.add_argument("--attachments-per-comment", type=int, default=1)
+    parser.add_argument("--mode", choices=("in-process", "socket", "both"), default="in-process")
+    parser.add_argument("--concurrency", default="1,8,32", help="Уровни конкурентности через запятую")
+    parser.add_argument("--requests", type=int, default=200, help="Запросов на сценарий и уровень")
+    parser.add_argument("--scenarios", default=None, help="Регулярное выражение по имени сценария")
+    parser.add_argument("--workers", type=int, default=1, help="Воркеров uvicorn в режиме socket")
+    parser.add_argument("--out", type=Path, default=None, help="Записать результат в JSON")
+    parser.add_argument("--baseline", type=Path, default=None, help="JSON прошлого запуска для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Допустимое ухудшение (0.2 = 20%%)")
+    parser.add_argument("--min-ms", type=float, default=1.0,
+                        help="Рост p95 меньше этого числа миллисекунд не считается регрессией (шум)")
+    return parser.parse_args()
+
+
+class Workload:
+    """Детерминированные параметры запросов и строки, созданные самим бенчмарком.
+
+    Пишущие сценарии меняют и удаляют только свои строки, набор данных не трогают:
+    ``own`` отдаёт строку бенчмарка (при необходимости создаёт её), ``fresh`` — новую
+    строку под одно удаление. Строки создаются через ``send`` до начала замера, каждая —
+    потомок проекта бенчмарка, и ``cleanup`` удаляет их вместе с этими проектами.
+    Неудачное создание — ошибка запуска, а не запрос к чужой или несуществующей строке.
+    """
+
+    PARENTS = {"tasks": ("projects", "project_id"), "comments": ("tasks", "task_id"),
+               "attachments": ("comments", "comment_id")}
+    BODIES = {
+        "projects": lambda i: {"name": f"bench {i}", "budget": i},
+        "tasks": lambda i: {"name": f"bench {i}", "status": "open"},
+        "comments": lambda i: {"author": "bench", "message": "m"},
+        "attachments": lambda i: {"file_name": f"b{i}.txt"},
+    }
+
+    def __init__(self, projects: int, tasks: int, comments: int, attachments: int):
+        self.n = {"projects": projects, "tasks": tasks, "comments": comments, "attachments": attachments}
+        self.send = None  # задаёт run_mode
+        self._lock = threading.Lock()
+        self._created = {table: [] for table in self.n}
+        self._projects = []  # все проекты бенчмарка, в том числе созданные под удаление
+
+    def pick(self, table: str, i: int) -> int:
+        # разброс по всей таблице без генератора случайных чисел (один и тот же порядок в каждом запуске)
+        return (i * 7919) % self.n[table] + 1
+
+    def created(self, table: str, ids):
+        with self._lock:
+            self._created[table].extend(ids)
+            if table == "projects":
+                self._projects.extend(ids)
+
+    def post(self, url: str, body):
+        r = self.send("POST", url, body)
+        if not 200 <= r.status_code < 300:
+            raise RuntimeError(f"подготовка POST {url}: {r.status_code} {r.text[:200]}")
+        return r.json()
+
+    def own(self, table: str, i: int) -> int:
+        with self._lock:
+            pool = self._created[table]
+            if pool:
+                return pool[i % len(pool)]
+        return self.fresh(table, i, keep=True)
+
+    def fresh(self, table: str, i: int, keep: bool = False) -> int:
+        body = self.BODIES[table](i)
+        if table in self.PARENTS:
+            parent, fk = self.PARENTS[table]
+            body[fk] = self.own(parent, i)
+        pk = self.post(f"/{table}/", body)["id"]
+        if keep:
+            self.created(table, [pk])
+        elif table == "projects":
+            with self._lock:
+                self._projects.append(pk)
+        return pk
+
+    def cleanup(self):
+        """Удалить проекты бенчмарка (потомки — каскадом); удалённые сценарием дают 404."""
+        with self._lock:
+            ids, self._projects = self._projects, []
+            self._created = {table: [] for table in self.n}
+        for pk in ids:
+            self.send("DELETE", f"/projects/{pk}", None)
+
+
+def scenarios(w: Workload):
+    """[(имя, тяжёлый, запрос(i) -> (метод, url, тело), обработчик ответа)]; порядок важен для пишущих."""
+    def keep(table):
+        return lambda r: w.created(table, [r.json()["id"]])
+
+    def project_with_tasks(i):
+        pk = w.fresh("projects", i)
+        w.post("/tasks/bulk", [{"name": f"bulk {i}.{k}", "project_id": pk} for k in range(10)])
+        return pk
+    return [
+        ("GET /projects/", False, lambda i: ("GET", f"/projects/?limit=50&offset={i % 20 * 50}", None), None),
+        ("GET /projects/ keyset+total", False,
+         lambda i: ("GET", "/projects/?limit=50&sort_by=budget&sort_dir=desc&with_total=exact", None), None),
+        ("GET /projects/ filter", False, lambda i: ("GET", f"/projects/?name=Project%20{i % 9 + 1}&limit=50", None), None),
+        ("GET /projects/ fields", False, lambda i: ("GET", "/projects/?limit=200&fields=name,budget", None), None),
+        ("GET /projects/{id}", False, lambda i: ("GET", f"/projects/{w.pick('projects', i)}", None), None),
+        ("GET /projects/{id} expand", False,
+         lambda i: ("GET", f"/projects/{w.pick('projects', i)}?expand=tasks.comments", None), None),
+        ("GET /projects/aggregate", False, lambda i: ("GET", "/projects/aggregate", None), None),
+        ("GET /projects/stats", False, lambda i: ("GET", "/projects/stats?group_by=is_active&metrics=count,sum:budget", None), None),
+        ("GET /tasks/", False, lambda i: ("GET", f"/tasks/?project_id={w.pick('projects', i)}&limit=50", None), None),
+        ("GET /tasks/ filter", False, lambda i: ("GET", "/tasks/?status=open&priority=high&limit=100", None), None),
+        ("GET /tasks/{id}", False, lambda i: ("GET", f"/tasks/{w.pick('tasks', i)}", None), None),
+        ("GET /tasks/aggregate", False, lambda i: ("GET", "/tasks/aggregate", None), None),
+        ("GET /tasks/stats", False, lambda i: ("GET", "/tasks/stats?group_by=status,priority&metrics=count,avg:time_estimation", None), None),
+        ("GET /comments/", False, lambda i: ("GET", f"/comments/?task_id={w.pick('tasks', i)}&limit=50", None), None),
+        ("GET /comments/{id}", False, lambda i: ("GET", f"/comments/{w.pick('comments', i)}", None), None),
+        ("GET /attachments/", False, lambda i: ("GET", f"/attachments/?comment_id={w.pick('comments', i)}", None), None),
+        ("GET /attachments/{id}", False, lambda i: ("GET", f"/attachments/{w.pick('attachments', i)}", None), None),
+        ("GET /search", False, lambda i: ("GET", "/search?q=database%20migration&limit=20", None), None),
+        ("GET /admin/pool", False, lambda i: ("GET", "/admin/pool", None), None),
+        ("GET /admin/cache", False, lambda i: ("GET", "/admin/cache", None), None),
+        ("GET /admin/aggregates/check", True, lambda i: ("GET", "/admin/aggregates/check", None), None),
+        ("GET /reports/project_task_count", True, lambda i: ("GET", "/reports/project_task_count", None), None),
+        ("GET /reports/tasks_with_project ndjson", True,
+         lambda i: ("GET", "/reports/tasks_with_project?format=ndjson", None), None),
+        ("GET /demo/sets", True, lambda i: ("GET", "/demo/sets", None), None),
+        ("GET /demo/functions", False, lambda i: ("GET", "/demo/functions", None), None),
+        # пишущие сценарии: создают свои строки и меняют/удаляют только их
+        ("POST /projects/", False, lambda i: ("POST", "/projects/", {"name": f"bench {i}", "budget": i}), keep("projects")),
+        ("PUT /projects/{id}", False,
+         lambda i: ("PUT", f"/projects/{w.own('projects', i)}", {"name": f"bench {i}", "budget": i + 1}), None),
+        ("POST /tasks/", False,
+         lambda i: ("POST", "/tasks/", {"name": f"bench {i}", "project_id": w.own("projects", i)}), keep("tasks")),
+        ("POST /tasks/bulk", False, lambda i: ("POST", "/tasks/bulk", [
+            {"name": f"bulk {i}.{k}", "project_id": w.own("projects", i), "status": "open"} for k in range(10)]), None),
+        ("PATCH /tasks/", False,
+         lambda i: ("PATCH", f"/tasks/?project_id={w.own('projects', i)}", {"status": "review"}), None),
+        ("POST /comments/", False,
+         lambda i: ("POST", "/comments/", {"task_id": w.own("tasks", i), "author": "bench", "message": "m"}),
+         keep("comments")),
+        ("POST /attachments/", False,
+         lambda i: ("POST", "/attachments/", {"comment_id": w.own("comments", i), "file_name": f"b{i}.txt"}), None),
+        # удаления: каждая строка создаётся под свой запрос до замера
+        ("DELETE /attachments/{id}", False, lambda i: ("DELETE", f"/attachments/{w.fresh('attachments', i)}", None), None),
+        ("DELETE /tasks/", False, lambda i: ("DELETE", f"/tasks/?project_id={project_with_tasks(i)}", None), None),
+        ("DELETE /projects/{id}", False, lambda i: ("DELETE", f"/projects/{w.fresh('projects', i)}", None), None),
+    ]
+
+
+def percentile(sorted_ms, q: float) -> float:
+    if not sorted_ms:
+        return 0.0
+    k = (len(sorted_ms) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_ms) - 1)
+    return sorted_ms[lo] + (sorted_ms[hi] - sorted_ms[lo]) * (k - lo)
+
+
+def run_scenario(send, build, on_response, n: int, concurrency: int):
+    """n запросов с concurrency параллельными потоками; задержки в мс и число ошибок.
+
+    Запросы (и строки, нужные пишущим сценариям) готовятся до замера. В задержки и
+    пропускную способность идут только ответы 2xx: ошибка не выполняет работу
+    эндпоинта и исказила бы перцентили, поэтому она только считается в ``errors``.
+    """
+    requests = [build(i) for i in range(n)]
+    latencies, errors = [], []
+
+    def one(request):
+        t0 = time.perf_counter()
+        r = send(*request)
+        elapsed = (time.perf_counter() - t0) * 1000
+        if not 200 <= r.status_code < 300:
+            errors.append(r.status_code)
+            return
+        if on_response:
+            on_response(r)
+        latencies.append(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, requests))
+    wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": n,
+        "samples": len(latencies),
+        "errors": len(errors),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        "rps": round(len(latencies) / wall, 1) if wall else 0.0,
+    }
+
+
+def run_mode(send, workload: Workload, levels, n: int, pattern):
+    results = {}
+    workload.send = send
+    try:
+        for level in levels:
+            per_level = results[f"c{level}"] = {}
+            for name, heavy, build, on_response in scenarios(workload):
+                if pattern and not re.search(pattern, name):
+                    continue
+                count = max(2, n // 20) if heavy else n
+                warmup = send(*build(0))  # прогрев: кэш планов, пул соединений
+                if on_response and 200 <= warmup.status_code < 300:
+                    on_response(warmup)
+                per_level[name] = stats = run_scenario(send, build, on_response, count, level)
+                print(f"  c={level:<3d} {name:40s} p50 {stats['p50_ms']:8.2f}  p95 {stats['p95_ms']:8.2f}  "
+                      f"p99 {stats['p99_ms']:8.2f} ms  {stats['rps']:8.1f} rps"
+                      + (f"  ошибок: {stats['errors']}" if stats["errors"] else ""))
+    finally:
+        workload.cleanup()
+    return results
+
+
+def own_peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(kb / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+
+
+def process_peak_rss_mb(pid: int):
+    """VmHWM процесса и его прямых потомков (воркеры uvicorn); None вне Linux."""
+    def hwm(p):
+        try:
+            for line in Path(f"/proc/{p}/status").read_text().splitlines():
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+        except OSError:
+            return 0
+        return 0
+
+    if not Path("/proc").exists():
+        return None
+    try:
+        children = Path(f"/proc/{pid}/task/{pid}/children").read_text().split()
+    except OSError:
+        children = []
+    return round((hwm(pid) + sum(hwm(int(c)) for c in children)) / 1024, 1)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run_socket(env, workload, levels, n, pattern, workers):
+    import httpx
+
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.backend.api:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT, env=env,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        with httpx.Client(base_url=base, timeout=120,
+                          limits=httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))) as client:
+            for _ in range(300):
+                if proc.poll() is not None:
+                    raise RuntimeError(f"uvicorn завершился с кодом {proc.returncode}")
+                try:
+                    if client.get("/admin/pool").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    time.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn не поднялся за 30 секунд")
+            results = run_mode(lambda m, u, b: client.request(m, u, json=b), workload, levels, n, pattern)
+        return results, process_peak_rss_mb(proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def seed(args, counts):
+    from sqlalchemy import func, select, text
+
+    from app.backend.crud import loader
+    from app.backend.crud.db import Base, engine
+    from app.backend.models import models
+
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(models.Project)).scalar_one():
+            print("База уже заполнена — используется как есть")
+            return
+        if conn.dialect.name == "sqlite":
+            # аналоги schemas/sql/create_indexes.sql; на MSSQL — scripts/apply_sql.py
+            for ddl in ("CREATE INDEX IF NOT EXISTS IX_projects_name ON projects(name)",
+                        "CREATE INDEX IF NOT EXISTS IX_tasks_project_id ON tasks(project_id)",
+                        "CREATE INDEX IF NOT EXISTS IX_tasks_status_priority ON tasks(status, priority)",
+                        "CREATE INDEX IF NOT EXISTS IX_comments_task_id_created_at ON comments(task_id, created_at)",
+                        "CREATE INDEX IF NOT EXISTS IX_attachments_comment_id ON attachments(comment_id)"):
+                conn.execute(text(ddl))
+            conn.commit()
+        offsets = {}
+        per_parent = {"projects": 1, "tasks": args.tasks_per_project, "comments": args.comments_per_task,
+                      "attachments": args.attachments_per_comment}
+        for name in loader.TABLES:
+            rows = loader.generate(name, counts[name], per_parent[name], seed=args.seed)
+            report = loader.load_table(conn, name, rows, offsets, batch_size=20_000, keep_ids=True, check=False)
+            print(f"  {name:12s} {report['rows']:>10d} строк  {report['rows_per_sec']:>10.0f} строк/с")
+        loader.finalize(conn)
+
+
+def compare(current, baseline, threshold: float, min_ms: float):
+    """Регрессии относительно baseline: рост p95 и падение rps больше threshold."""
+    regressions = []
+    for mode, levels in current["results"].items():
+        for level, per_scenario in levels.items():
+            for name, cur in per_scenario.items():
+                base = baseline.get("results", {}).get(mode, {}).get(level, {}).get(name)
+                if not base:
+                    continue
+                where = f"{mode} {level} {name}"
+                if cur["p95_ms"] > base["p95_ms"] * (1 + threshold) and cur["p95_ms"] - base["p95_ms"] > min_ms:
+                    regressions.append(f"{where}: p95 {base['p95_ms']:.2f} -> {cur['p95_ms']:.2f} ms")
+                if cur["rps"] < base["rps"] * (1 - threshold):
+                    regressions.append(f"{where}: rps {base['rps']:.1f} -> {cur['rps']:.1f}")
+                if cur["errors"] > base.get("errors", 0):
+                    regressions.append(f"{where}: errors {base.get('errors', 0)} -> {cur['errors']}")
+    return regressions
+
+
+def main():
+    args = parse_args()
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    n_tasks = args.projects * args.tasks_per_project
+    n_comments = n_tasks * args.comments_per_task
+    counts = {"projects": args.projects, "tasks": n_tasks, "comments": n_comments,
+              "attachments": n_comments * args.attachments_per_comment}
+    if args.database_url:
+        url = args.database_url
+    else:
+        db_path = args.db or Path(tempfile.gettempdir()) / (
+            f"bench_endpoints_{args.seed}_{'_'.join(str(v) for v in counts.values())}.db")
+        url = f"sqlite+pysqlite:///{db_path}"
+    os.environ["DATABASE_URL"] = url
+    sys.path.insert(0, str(ROOT))
+
+    print(f"Набор данных: {counts}, seed={args.seed}")
+    seed(args, counts)
+    workload = Workload(**counts)
+    result = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": url.split("://")[0],
+            "dataset": counts,
+            "seed": args.seed,
+            "requests": args.requests,
+        },
+        "results": {},
+        "peak_rss_mb": {},
+    }
+
+    if args.mode in ("in-process", "both"):
+        from fastapi.testclient import TestClient
+
+        from app.backend.api import app
+
+        print("Режим in-process (TestClient)")
+        with TestClient(app) as client:
+            result["results"]["in-process"] = run_mode(
+                lambda m, u, b: client.request(m, u, json=b), workload, levels, args.requests, args.scenarios)
+        result["peak_rss_mb"]["in-process"] = own_peak_rss_mb()
+    if args.mode in ("socket", "both"):
+        print(f"Режим socket (uvicorn, воркеров: {args.workers})")
+        result["results"]["socket"], result["peak_rss_mb"]["socket"] = run_socket(
+            dict(os.environ), workload, levels, args.requests, args.scenarios, args.workers)
+    print(f"Пиковый RSS, МБ: {result['peak_rss_mb']}")
+
+    if args.out:
+        args.out.write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Результат записан в {args.out}")
+    if args.baseline:
+        regressions = compare(result, json.loads(args.baseline.read_text(encoding="utf-8")),
+                              args.threshold, args.min_ms)
+        if regressions:
+            print(f"Регрессии относительно {args.baseline} (порог {args.threshold:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"Регрессий относительно {args.baseline} нет (порог {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""Накладные расходы метрик ``/metrics``: запрос с ``METRICS_ENABLED`` и без, стоимость сборщиков.
+
+Приложение запускается в процессе (``TestClient``) на временной файловой SQLite с
+небольшим набором данных; для каждого сценария прогоны с метриками и без чередуются
+раундами, чтобы дрейф машины не попадал в разницу. Отдельно замеряются ``inc``,
+``observe`` и выдача ``/metrics`` при заданном числе рядов.
+
+Запуск из корня проекта:
+    python -m scripts.bench_metrics --requests 2000 --rounds 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000, help="Запросов на сценарий в раунде")
+    parser.add_argument("--rounds", type=int, default=5, help="Раундов с метриками и без (чередуются)")
+    parser.add_argument("--series", type=int, default=200, help="Рядов гистограммы для замера выдачи /metrics")
+    return parser.parse_args()
+
+
+def per_call_ns(fn, n: int = 200_000) -> float:
+    started = time.perf_counter_ns()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter_ns() - started) / n
+
+
+def main():
+    args = parse_args()
+    tmp = tempfile.mkdtemp(prefix="bench_metrics_")
+    os.environ["DATABASE_URL"] = f"sqlite+pysqlite:///{Path(tmp) / 'bench.db'}"
+    os.environ.setdefault("QUERY_BUDGET_MODE", "off")
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+    from fastapi.testclient import TestClient
+
+    from app.backend import metrics
+    from app.backend.api import app
+    from app.backend.config import config as cfg
+
+    scenarios = {
+        "GET /projects/{id}": lambda c, i: c.get(f"/projects/{i % 100 + 1}"),
+        "GET /projects/?limit=20": lambda c, i: c.get("/projects/?limit=20"),
+        "GET /unmatched": lambda c, i: c.get("/no/such/path"),
+    }
+    with TestClient(app) as client:
+        for i in range(100):
+            client.post("/projects/", json={"name": f"P{i}"})
+        print(f"{'сценарий':26s} {'без, мкс':>10s} {'с метриками, мкс':>17s} {'разница, мкс':>13s} {'%':>6s}")
+        for name, call in scenarios.items():
+            timings = {False: [], True: []}
+            for _ in range(args.rounds):
+                for enabled in (False, True):
+                    cfg.METRICS_ENABLED = enabled
+                    for i in range(50):  # прогрев
+                        call(client, i)
+                    started = time.perf_counter()
+                    for i in range(args.requests):
+                        call(client, i)
+                    timings[enabled].append((time.perf_counter() - started) / args.requests * 1e6)
+            off, on = statistics.median(timings[False]), statistics.median(timings[True])
+            print(f"{name:26s} {off:10.1f} {on:17.1f} {on - off:13.1f} {(on - off) / off * 100:6.1f}")
+        cfg.METRICS_ENABLED = True
+
+    counter = metrics.Counter("bench_total", "bench", ("method", "route", "status"))
+    histogram = metrics.Histogram("bench_seconds", "bench", ("method", "route"))
+    print()
+    print(f"Counter.inc:          {per_call_ns(lambda: counter.inc('GET', '/tasks/{task_id}', '200')):8.0f} нс")
+    print(f"Histogram.observe:    {per_call_ns(lambda: histogram.observe(0.0042, 'GET', '/tasks/{task_id}')):8.0f} нс")
+    statement = "SELECT tasks.id, tasks.name FROM tasks WHERE tasks.project_id = ? ORDER BY tasks.id LIMIT ?"
+    print(f"statement_table:      {per_call_ns(lambda: metrics.statement_table(statement)):8.0f} нс (из кэша)")
+
+    registry = metrics.Registry()
+    registry.register(histogram)
+    for i in range(args.series):
+        histogram.observe(0.01, "GET", f"/route/{i}")
+    started = time.perf_counter()
+    text = registry.render()
+    print(f"выдача /metrics:      {(time.perf_counter() - started) * 1000:8.2f} мс "
+          f"({args.series} рядов гистограммы, {len(text.splitlines())} строк, {len(text)} байт)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""Бенчмарк пагинации /tasks/: offset против keyset (cursor).
+
+Заполняет файловую SQLite-базу задачами и замеряет время первой и «глубокой»
+страницы в обоих режимах. Курсор для глубокой страницы строится по строке,
+предшествующей ей, — так же, как его вернул бы сервер при последовательном обходе.
+
+Запуск из корня проекта:
+    python -m scripts.bench_pagination --rows 1000000 --limit 100 --page 10000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Сколько задач создать")
+    parser.add_argument("--limit", type=int, default=100, help="Размер страницы")
+    parser.add_argument("--page", type=int, default=10_000, help="Номер глубокой страницы (с 1)")
+    parser.add_argument("--repeat", type=int, default=20, help="Повторов на замер")
+    parser.add_argument("--db", type=Path, default=None, help="Путь к файлу SQLite (по умолчанию временный)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    db_path = args.db or Path(tempfile.mkdtemp()) / "bench_pagination.db"
+    os.environ["DATABASE_URL"] = f"sqlite+pysqlite:///{db_path}"
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import insert, select, text
+
+    from app.backend.api import app
+    from app.backend.crud.db import Base, engine
+    from app.backend.crud.pagination import encode_cursor
+    from app.backend.models import models
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        have = conn.execute(select(models.Task.id).limit(1)).first()
+        if not have:
+            print(f"Заполняю {db_path}: {args.rows} задач...")
+            conn.execute(insert(models.Project), [{"id": 1, "name": "bench"}])
+            chunk = 50_000
+            for start in range(1, args.rows + 1, chunk):
+                conn.execute(insert(models.Task), [
+                    {"id": i, "project_id": 1, "name": f"task {i}", "status": "open",
+                     "time_estimation": i % 97}
+                    for i in range(start, min(start + chunk, args.rows + 1))
+                ])
+        conn.execute(text("CREATE INDEX IF NOT EXISTS IX_tasks_time_estimation_id ON tasks(time_estimation, id)"))
+
+    client = TestClient(app)
+    deep_offset = (args.page - 1) * args.limit
+
+    def timed(url):
+        samples = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            r = client.get(url)
+            samples.append((time.perf_counter() - t0) * 1000)
+            assert r.status_code == 200, r.text
+        return statistics.median(samples)
+
+    for sort_by in (None, "time_estimation"):
+        base = f"/tasks/?limit={args.limit}" + (f"&sort_by={sort_by}" if sort_by else "")
+        col = getattr(models.Task, sort_by) if sort_by else None
+        order = [col, models.Task.id] if col is not None else [models.Task.id]
+        with engine.connect() as conn:
+            prev = conn.execute(
+                select(models.Task.id, *([col] if col is not None else [])).order_by(*order).offset(deep_offset - 1).limit(1)
+            ).first()
+        cursor = encode_cursor(sort_by, "asc", prev[1] if col is not None else None, prev[0])
+
+        print(f"\nsort_by={sort_by or 'id'}, limit={args.limit}, страница {args.page} из ~{args.rows // args.limit}")
+        print(f"  offset, страница 1:       {timed(base):8.2f} ms")
+        print(f"  offset, страница {args.page}: {timed(f'{base}&offset={deep_offset}'):8.2f} ms")
+        print(f"  cursor, страница 1:       {timed(base):8.2f} ms")
+        print(f"  cursor, страница {args.page}: {timed(f'{base}&cursor={cursor}'):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
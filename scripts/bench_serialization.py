@@ -0,0 +1,85 @@
+"""Бенчмарк сериализации списков: ORM + Pydantic (FAST_JSON=0) против кортежей колонок + orjson (FAST_JSON=1).
+
+Заполняет файловую SQLite-базу и для каждого списочного эндпоинта замеряет
+медианное время ответа со страницей из ``--limit`` строк в обоих режимах.
+``/comments/`` и ``/attachments/`` отдают таблицу целиком, поэтому в них
+вставляется ровно ``--limit`` строк.
+
+Запуск из корня проекта:
+    python -m scripts.bench_serialization --limit 1000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=1000, help="Строк в ответе")
+    parser.add_argument("--repeat", type=int, default=30, help="Повторов на замер")
+    parser.add_argument("--db", type=Path, default=None, help="Путь к файлу SQLite (по умолчанию временный)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    db_path = args.db or Path(tempfile.mkdtemp()) / "bench_serialization.db"
+    os.environ["DATABASE_URL"] = f"sqlite+pysqlite:///{db_path}"
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+    from datetime import date, datetime
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import insert, select
+
+    from app.backend import fastjson
+    from app.backend.api import app
+    from app.backend.config import config as cfg
+    from app.backend.crud.db import Base, engine
+    from app.backend.models import models
+
+    n = args.limit
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        if not conn.execute(select(models.Project.id).limit(1)).first():
+            conn.execute(insert(models.Project), [
+                {"id": i, "name": f"project {i}", "description": "d" * 40, "start_date": date(2024, 1, 1),
+                 "budget": i * 10.5, "is_active": i % 2 == 0} for i in range(1, n + 1)])
+            conn.execute(insert(models.Task), [
+                {"id": i, "project_id": 1, "name": f"task {i}", "priority": "high", "status": "open",
+                 "period_of_execution": date(2024, 2, 1), "time_estimation": i % 40} for i in range(1, n + 1)])
+            conn.execute(insert(models.Comment), [
+                {"id": i, "task_id": 1, "author": "bench", "message": "m" * 60,
+                 "created_at": datetime(2024, 3, 1, 12, 0), "rating": 5} for i in range(1, n + 1)])
+            conn.execute(insert(models.Attachment), [
+                {"id": i, "comment_id": 1, "file_name": f"f{i}.txt", "type": "text", "size_kb": i,
+                 "created_at": datetime(2024, 3, 1, 12, 0)} for i in range(1, n + 1)])
+
+    client = TestClient(app)
+
+    def timed(url):
+        samples = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            r = client.get(url)
+            samples.append((time.perf_counter() - t0) * 1000)
+            assert r.status_code == 200, r.text
+        return statistics.median(samples)
+
+    encoder = "orjson" if fastjson.orjson is not None else "json"
+    print(f"{n} строк в ответе, медиана из {args.repeat}, быстрый путь: {encoder}")
+    print(f"{'эндпоинт':28s} {'ORM+Pydantic':>14s} {'FAST_JSON':>12s} {'ускорение':>10s}")
+    for url in (f"/projects/?limit={n}", f"/tasks/?limit={n}", "/comments/", "/attachments/"):
+        cfg.FAST_JSON = False
+        before = timed(url)
+        cfg.FAST_JSON = True
+        after = timed(url)
+        print(f"{url:28s} {before:11.2f} ms {after:9.2f} ms {before / after:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
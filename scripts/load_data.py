@@ -0,0 +1,118 @@
+"""Массовая загрузка CSV/NDJSON в projects/tasks/comments/attachments и генератор синтетических данных.
+
+Таблица определяется по имени файла (``tasks.csv``, ``comments-2024.ndjson``);
+файлы загружаются в порядке projects -> tasks -> comments -> attachments, так что
+ссылки детей на родителей из того же запуска пересчитываются (см. ``app/backend/crud/loader.py``).
+Подключение — как у приложения (``.env``: ``DATABASE_URL`` или ``MSSQL_*``), либо ``--database-url``.
+
+Запуск из корня проекта:
+    python -m scripts.load_data data/projects.csv data/tasks.ndjson
+    python -m scripts.load_data --generate --projects 10000 --tasks-per-project 20 --seed 1
+    python -m scripts.load_data --generate --projects 100 --out data/   # только записать NDJSON
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", type=Path, help="Файлы .csv/.ndjson/.jsonl")
+    parser.add_argument("--database-url", default=None, help="URL SQLAlchemy вместо настроек из .env")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Строк в пачке проверки и транзакции")
+    parser.add_argument("--keep-ids", action="store_true",
+                        help="Вставлять id источника без сдвига (пустая база, перенос один в один)")
+    parser.add_argument("--max-errors", type=int, default=0,
+                        help="Сколько неверных строк на таблицу пропустить, прежде чем прервать загрузку")
+    parser.add_argument("--create-tables", action="store_true", help="Создать таблицы (create_all) перед загрузкой")
+    gen = parser.add_argument_group("генератор")
+    gen.add_argument("--generate", action="store_true", help="Вместо файлов — детерминированные синтетические данные")
+    gen.add_argument("--seed", type=int, default=0)
+    gen.add_argument("--projects", type=int, default=1000)
+    gen.add_argument("--tasks-per-project", type=int, default=10)
+    gen.add_argument("--comments-per-task", type=int, default=3)
+    gen.add_argument("--attachments-per-comment", type=int, default=1)
+    gen.add_argument("--validate", action="store_true", help="Проверять сгенерированные строки схемами (по умолчанию нет)")
+    gen.add_argument("--out", type=Path, default=None, help="Записать сгенерированные данные в NDJSON в папку и не загружать")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    elif args.generate and args.out:
+        # запись файлов не обращается к БД — настройки подключения не нужны
+        os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+    from app.backend.crud import loader
+    from app.backend.crud.db import Base, engine
+
+    if args.generate:
+        n_tasks = args.projects * args.tasks_per_project
+        n_comments = n_tasks * args.comments_per_task
+        sources = {
+            "projects": loader.generate("projects", args.projects, seed=args.seed),
+            "tasks": loader.generate("tasks", n_tasks, args.tasks_per_project, seed=args.seed),
+            "comments": loader.generate("comments", n_comments, args.comments_per_task, seed=args.seed),
+            "attachments": loader.generate("attachments", n_comments * args.attachments_per_comment,
+                                           args.attachments_per_comment, seed=args.seed),
+        }
+        if args.out:
+            args.out.mkdir(parents=True, exist_ok=True)
+            for name, rows in sources.items():
+                print(f"{name}: {loader.write_ndjson(args.out / f'{name}.ndjson', rows)} строк -> {args.out / name}.ndjson")
+            return 0
+        check = args.validate
+    else:
+        if not args.files:
+            print("Укажите файлы или --generate")
+            return 1
+        try:
+            by_table = {}
+            for path in args.files:
+                by_table.setdefault(loader.table_for(path), []).append(path)
+            sources = {name: _chain(loader.read_file(p) for p in by_table[name])
+                       for name in loader.TABLES if name in by_table}
+        except loader.LoadError as e:
+            print(str(e))
+            return 1
+        check = True
+
+    if args.create_tables:
+        Base.metadata.create_all(bind=engine)
+
+    offsets = {}
+    total_rows, total_seconds = 0, 0.0
+    with engine.connect() as conn:
+        try:
+            for name, rows in sources.items():
+                report = loader.load_table(conn, name, rows, offsets, batch_size=args.batch_size,
+                                           keep_ids=args.keep_ids, check=check, max_errors=args.max_errors)
+                total_rows += report["rows"]
+                total_seconds += report["seconds"]
+                print(f"{name:12s} {report['rows']:>10d} строк  {report['seconds']:8.2f} s  "
+                      f"{report['rows_per_sec']:>10.0f} строк/с  отклонено: {report['rejected']}  "
+                      f"(сдвиг id: {offsets[name]})")
+                for error in report["errors"]:
+                    print(f"    {error}")
+        except loader.LoadError as e:
+            print(f"Загрузка прервана: {e}")
+            return 1
+        finally:
+            # зафиксированные пачки уже в таблицах — агрегаты и версии пересчитываются в любом случае
+            loader.finalize(conn)
+    if total_seconds:
+        print(f"Итого: {total_rows} строк за {total_seconds:.2f} s, {total_rows / total_seconds:.0f} строк/с")
+    return 0
+
+
+def _chain(iterables):
+    for rows in iterables:
+        yield from rows
+
+
+if __name__ == "__main__":
+    sys.exit(main())
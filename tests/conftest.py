@@ -1,14 +1,28 @@
+import os
+from types import SimpleNamespace
+
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+# приложение не должно требовать настроек MSSQL при импорте в тестах
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+# превышение @query_budget эндпоинта роняет тест (N+1 и лишние запросы)
+os.environ.setdefault("QUERY_BUDGET_MODE", "raise")
 
 from app.backend.crud.db import Base
-from app.backend.api import app, get_db
+from app.backend.api import create_app, get_db
+from app.backend.cache import entity_cache
+from app.backend.deps import get_async_db
 
 
 TEST_DATABASE_URL = "sqlite+pysqlite:///:memory:"
 engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False}, future=True)
 TestingSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+# каждый тест с client/db_session выполняется на обоих приложениях независимо от DB_ASYNC
+APPS = {"sync": create_app(async_mode=False), "async": create_app(async_mode=True)}
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -18,8 +32,33 @@ def prepare_database():
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(params=list(APPS))
+def backend(request, tmp_path):
+    """Приложение теста и синхронный движок, через который тест готовит и проверяет данные.
+
+    sync — общий in-memory движок, тест идёт в откатываемой транзакции. async — своя
+    файловая SQLite на тест: её видят и get_db (синхронные маршруты), и get_async_db
+    (aiosqlite), поэтому данные теста фиксируются, а не откатываются.
+    """
+    if request.param == "sync":
+        yield SimpleNamespace(mode="sync", app=APPS["sync"], engine=engine, async_engine=None)
+        return
+    path = tmp_path / "test.db"
+    file_engine = create_engine(f"sqlite+pysqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=file_engine)
+    # TestClient без with выполняет каждый запрос в своём цикле событий — соединения не переиспользуются
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    yield SimpleNamespace(mode="async", app=APPS["async"], engine=file_engine, async_engine=async_engine)
+    file_engine.dispose()
+
+
 @pytest.fixture()
-def db_session():
+def db_session(backend):
+    if backend.mode == "async":
+        session = TestingSessionLocal(bind=backend.engine)
+        yield session
+        session.close()
+        return
     connection = engine.connect()
     trans = connection.begin()
     session = TestingSessionLocal(bind=connection)
@@ -31,8 +70,18 @@ def db_session():
         connection.close()
 
 
+@pytest.fixture(autouse=True)
+def clear_entity_cache():
+    # id переиспользуются после отката транзакции теста — кэш не должен переживать тест
+    entity_cache.clear()
+    yield
+    entity_cache.clear()
+
+
 @pytest.fixture()
-def client(db_session):
+def client(backend, db_session):
+    app = backend.app
+
     def override_get_db():
         try:
             yield db_session
@@ -40,8 +89,30 @@ def client(db_session):
             pass
 
     app.dependency_overrides[get_db] = override_get_db
+    if backend.async_engine is not None:
+        AsyncTestingSessionLocal = async_sessionmaker(bind=backend.async_engine, autoflush=False)
+
+        async def override_get_async_db():
+            async with AsyncTestingSessionLocal() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
     from fastapi.testclient import TestClient
 
     client = TestClient(app)
     yield client
-    app.dependency_overrides.pop(get_db, None)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture()
+def sql_statements(backend):
+    """Список SQL-выражений, отправленных в БД приложением теста за время теста."""
+    statements = []
+    target = backend.async_engine.sync_engine if backend.async_engine is not None else backend.engine
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(target, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(target, "before_cursor_execute", before_cursor_execute)
@@ -0,0 +1,127 @@
+def _consistent(client):
+    report = client.get("/admin/aggregates/check").json()
+    return all(v["consistent"] for v in report.values())
+
+
+def test_aggregates_follow_writes(client, sql_statements):
+    client.get("/projects/aggregate")  # первое чтение строит агрегаты
+    base = client.get("/projects/aggregate").json()
+    p = client.post("/projects/", json={"name": "AggP", "budget": 100}).json()
+    q = client.post("/projects/", json={"name": "AggQ", "budget": 50}).json()
+    client.put(f"/projects/{q['id']}", json={"budget": 70})
+    client.post("/tasks/bulk", json=[{"name": f"AT{i}", "project_id": p["id"], "time_estimation": 2} for i in range(3)])
+    client.post("/tasks/", json={"name": "AT-none", "project_id": q["id"]})
+    client.patch(f"/tasks/?project_id={p['id']}", json={"time_estimation": 4})
+    assert _consistent(client)
+
+    sql_statements.clear()
+    j = client.get("/projects/aggregate").json()
+    assert j == {"count": base["count"] + 2, "sum_budget": base["sum_budget"] + 170}
+    assert len(sql_statements) == 1 and "aggregate_stats" in sql_statements[0]
+
+    # удаление проекта уменьшает и агрегат задач, удалённых каскадом
+    client.delete(f"/projects/{p['id']}")
+    client.delete(f"/projects/?name={q['name']}")
+    assert _consistent(client)
+
+
+def test_aggregates_track_direct_writes_and_rebuild(client, db_session):
+    from sqlalchemy import update
+
+    from app.backend.models import models
+
+    client.get("/tasks/aggregate")
+    client.get("/projects/aggregate")
+    # запись в обход API учитывают триггеры журнала table_changes
+    db_session.add(models.Project(name="Direct", budget=5))
+    db_session.flush()
+    assert _consistent(client)
+
+    db_session.execute(update(models.AggregateStat).where(models.AggregateStat.name == "projects")
+                       .values(row_count=models.AggregateStat.row_count + 1))
+    db_session.flush()
+    assert not _consistent(client)
+    assert all(v["consistent"] for v in client.post("/admin/aggregates/rebuild").json().values())
+
+
+def test_compact_folds_journal(client, db_session):
+    from sqlalchemy import func, select
+
+    from app.backend.crud import changes
+    from app.backend.models.models import TableChange
+
+    client.get("/projects/aggregate")
+    p = client.post("/projects/", json={"name": "Fold", "budget": 10}).json()
+    client.put(f"/projects/{p['id']}", json={"budget": 4})
+    before = client.get("/projects/aggregate").json()
+    assert changes.compact(db_session) >= 2
+    assert db_session.execute(select(func.count()).select_from(TableChange)).scalar_one() == 0
+    assert client.get("/projects/aggregate").json() == before
+    assert _consistent(client)
+
+
+def test_missing_triggers_reported_by_health(client, db_session, monkeypatch):
+    from sqlalchemy import text
+
+    from app.backend.crud import changes
+
+    monkeypatch.setattr(changes, "triggers_missing", [])
+    assert changes.missing_triggers(db_session.connection()) == []
+    health = client.get("/admin/health")
+    assert health.status_code == 200 and health.json()["triggers_missing"] == []
+
+    db_session.execute(text("DROP TRIGGER changes_projects_ai"))
+    db_session.commit()
+    try:
+        assert changes.missing_triggers(db_session.connection()) == ["projects"]
+        health = client.get("/admin/health")
+        assert health.status_code == 503 and health.json()["triggers_missing"] == ["projects"]
+        assert not changes.journal_ok()
+        # версия таблицы не меняется: список отдаётся без ETag, 304 невозможен
+        r = client.get("/projects/")
+        assert "etag" not in r.headers and r.headers["cache-control"] == "no-cache"
+    finally:
+        # pysqlite выполняет DDL вне транзакции теста — триггер возвращается скриптом create_all
+        changes._create_sqlite_triggers(None, db_session.connection())
+        db_session.commit()
+
+
+def test_compact_all_waits_for_row_threshold(monkeypatch):
+    from app.backend.crud import changes
+
+    class Session:
+        def __init__(self):
+            self.compacted = False
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def commit(self):
+            pass
+
+    session = Session()
+    monkeypatch.setattr(changes, "SessionLocal", lambda: session)
+    monkeypatch.setattr(changes, "pending_rows", lambda s: 5)
+    monkeypatch.setattr(changes, "compact", lambda s: 5)
+    assert changes.compact_all(min_rows=10) == 0
+    assert changes.compact_all(min_rows=5) == 5
+    assert changes.compact_all() == 5
+
+
+def test_aggregates_fall_back_to_live_without_triggers(client, db_session, monkeypatch):
+    from sqlalchemy import update
+
+    from app.backend.crud import changes
+    from app.backend.models import models
+
+    client.get("/projects/aggregate")
+    monkeypatch.setattr(changes, "triggers_missing", ["projects"])
+    # хранимая строка без триггеров не следит за записями — отдаются живые COUNT/SUM
+    db_session.execute(update(models.AggregateStat).where(models.AggregateStat.name == "projects").values(row_count=-1))
+    db_session.commit()
+    client.post("/projects/", json={"name": "NoTrigger", "budget": 3})
+    live = client.get("/admin/aggregates/check").json()["projects"]["live"]
+    assert client.get("/projects/aggregate").json() == {"count": live["count"], "sum_budget": live["sum"]}
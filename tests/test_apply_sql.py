@@ -0,0 +1,47 @@
+import importlib.util
+from pathlib import Path
+
+_PATH = Path(__file__).resolve().parents[1] / "scripts" / "apply_sql.py"
+_spec = importlib.util.spec_from_file_location("apply_sql", _PATH)
+apply_sql = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(apply_sql)
+
+
+def test_split_on_go_lines():
+    parts = apply_sql.split_sql_statements("SELECT 1;\nGO\n\nSELECT 2;\n  go  \nSELECT 3;")
+    assert [p.strip() for p in parts] == ["SELECT 1;", "SELECT 2;", "SELECT 3;"]
+
+
+def test_checksum_ignores_line_endings():
+    assert apply_sql.checksum("A\r\nB\r\n") == apply_sql.checksum("A\nB\n")
+    assert apply_sql.checksum("A\nB\n") != apply_sql.checksum("A\nC\n")
+
+
+def test_plan_marks_new_changed_unchanged(tmp_path):
+    a, b, c = tmp_path / "a.sql", tmp_path / "b.sql", tmp_path / "c.sql"
+    a.write_text("SELECT 1;", encoding="utf-8")
+    b.write_text("SELECT 2;", encoding="utf-8")
+    c.write_text("SELECT 3;", encoding="utf-8")
+    ledger = {"a.sql": apply_sql.checksum("SELECT 1;"), "b.sql": apply_sql.checksum("SELECT 0;")}
+    statuses = {f.name: status for f, _, _, status in apply_sql.plan([a, b, c], ledger)}
+    assert statuses == {"a.sql": "unchanged", "b.sql": "changed", "c.sql": "new"}
+
+
+def test_online_rewrite():
+    assert apply_sql.with_online("CREATE INDEX IX_a ON t(a);") == "CREATE INDEX IX_a ON t(a) WITH (ONLINE = ON);"
+    assert (apply_sql.with_online("CREATE NONCLUSTERED INDEX IX_a ON t(a) WITH (DROP_EXISTING = ON);")
+            == "CREATE NONCLUSTERED INDEX IX_a ON t(a) WITH (ONLINE = ON, DROP_EXISTING = ON);")
+    already = "CREATE INDEX IX_a ON t(a) WITH (ONLINE = ON);"
+    assert apply_sql.with_online(already) == already
+    assert apply_sql.with_online("CREATE FULLTEXT INDEX ON t(a) KEY INDEX PK_t;") == "CREATE FULLTEXT INDEX ON t(a) KEY INDEX PK_t;"
+
+
+def test_repo_index_script_goes_online():
+    text = (_PATH.parents[1] / "schemas" / "sql" / "create_indexes.sql").read_text(encoding="utf-8")
+    for batch in apply_sql.split_sql_statements(text):
+        if "CREATE INDEX" in batch:
+            assert "ONLINE = ON" in apply_sql.with_online(batch)
+    assert not apply_sql.needs_autocommit(text)
+    # онлайн-индексы фиксируются по одному пакету, а не транзакцией на весь файл
+    assert apply_sql.needs_autocommit(text, online=True)
+    assert not apply_sql.needs_autocommit("CREATE OR ALTER PROCEDURE p AS SELECT 1;", online=True)
@@ -0,0 +1,78 @@
+"""Сквозные сценарии; как и весь набор (фикстура client), идут на синхронном и асинхронном (DB_ASYNC) приложении."""
+from app.backend import api, api_async
+
+
+def test_async_routes_registered_first():
+    routers = lambda app: [r.original_router for r in app.routes if hasattr(r, "original_router")]
+    assert routers(api.create_app(async_mode=True)) == [api_async.router, api.router]
+    assert routers(api.create_app(async_mode=False)) == [api.router]
+
+
+def test_crud_lifecycle(client):
+    r = client.post("/projects/", json={"name": "AProj", "budget": 10, "is_active": True})
+    assert r.status_code == 200
+    proj = r.json()
+    r = client.post("/tasks/", json={"name": "AT", "project_id": proj["id"], "status": "open", "time_estimation": 4})
+    task = r.json()
+    r = client.post("/comments/", json={"task_id": task["id"], "author": "bob", "message": "hi"})
+    comment = r.json()
+    r = client.post("/attachments/", json={"comment_id": comment["id"], "file_name": "a.txt"})
+    att = r.json()
+
+    assert client.get(f"/projects/{proj['id']}").json()["name"] == "AProj"
+    assert client.put(f"/tasks/{task['id']}", json={"status": "done"}).json()["status"] == "done"
+    assert client.put(f"/comments/{comment['id']}", json={"message": "edited"}).json()["message"] == "edited"
+    assert any(a["id"] == att["id"] for a in client.get("/attachments/").json())
+    assert client.get("/tasks/aggregate").json() == {"count": 1, "avg_time": 4.0}
+    tree = client.get(f"/projects/{proj['id']}?expand=tasks.comments.attachments").json()
+    assert tree["tasks"][0]["comments"][0]["attachments"][0]["id"] == att["id"]
+    assert client.get(f"/comments/{comment['id']}?fields=message").json() == {"id": comment["id"], "message": "edited"}
+    assert client.get("/tasks/?fields=name").json() == [{"id": task["id"], "name": "AT"}]
+    assert client.get("/tasks/?with_total=exact").headers["X-Total-Count"] == "1"
+    assert [h["id"] for h in client.get("/search?q=edited&kinds=comment").json()] == [comment["id"]]
+    assert client.get("/projects/?with_total=approx").headers["X-Total-Count"] == "1"
+    etag = client.get("/tasks/").headers["ETag"]
+    assert client.get("/tasks/", headers={"If-None-Match": etag}).status_code == 304
+
+    # ORM-каскад (на AsyncSession — с дозагрузкой потомков)
+    assert client.delete(f"/projects/{proj['id']}").status_code == 200
+    assert client.get(f"/tasks/{task['id']}").status_code == 404
+    assert client.get(f"/attachments/{att['id']}").status_code == 404
+    assert client.get("/projects/999").status_code == 404
+
+
+def test_list_filters_cursor_and_bulk(client):
+    proj = client.post("/projects/", json={"name": "AL", "budget": 1}).json()
+    r = client.post("/tasks/bulk", json=[
+        {"name": f"L{i}", "project_id": proj["id"], "status": "open" if i % 2 else "done", "time_estimation": i}
+        for i in range(6)
+    ])
+    assert r.json()["count"] == 6
+
+    r = client.get(f"/tasks/?project_id={proj['id']}&status=open&sort_by=time_estimation&sort_dir=desc")
+    assert [t["time_estimation"] for t in r.json()] == [5, 3, 1]
+
+    seen = []
+    r = client.get("/tasks/?limit=4")
+    seen += r.json()
+    r = client.get(f"/tasks/?limit=4&cursor={r.headers['X-Next-Cursor']}")
+    seen += r.json()
+    assert len({t["id"] for t in seen}) == 6 and "X-Next-Cursor" not in r.headers
+
+    r = client.get(f"/tasks/stats?project_id={proj['id']}&group_by=status&metrics=count,sum:time_estimation")
+    assert r.json() == [{"status": "done", "count": 3, "sum_time_estimation": 6}, {"status": "open", "count": 3, "sum_time_estimation": 9}]
+
+    assert client.patch(f"/tasks/?project_id={proj['id']}&status=done", json={"priority": "low"}).json() == {"affected": 3}
+    assert client.delete(f"/tasks/?project_id={proj['id']}&priority=low").json() == {"affected": 3}
+
+
+def test_reports(client):
+    proj = client.post("/projects/", json={"name": "AR"}).json()
+    client.post("/tasks/", json={"name": "RT", "project_id": proj["id"]})
+
+    assert client.get("/reports/project_task_count").json() == [{"project_id": proj["id"], "project_name": "AR", "task_count": 1}]
+    assert client.get("/reports/tasks_with_project").json()[0]["project_name"] == "AR"
+    r = client.get("/reports/tasks_with_project?format=csv")
+    assert r.text.splitlines()[1].endswith(",RT,%d,AR" % proj["id"])
+    r = client.get("/reports/tasks_with_project?format=ndjson")
+    assert r.headers["content-type"].startswith("application/x-ndjson") and '"task_name": "RT"' in r.text
@@ -0,0 +1,60 @@
+import pytest
+
+from scripts.bench_endpoints import Workload, compare, percentile, run_scenario
+
+
+class _Response:
+    def __init__(self, status_code, body=None):
+        self.status_code, self._body, self.text = status_code, body, ""
+
+    def json(self):
+        return self._body
+
+
+def _result(p95, rps, errors=0):
+    return {"results": {"in-process": {"c8": {"GET /tasks/": {"p95_ms": p95, "rps": rps, "errors": errors}}}}}
+
+
+def test_percentile_interpolates():
+    assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], 0.5) == 3.0
+    assert percentile([10.0, 20.0], 0.95) == 19.5
+    assert percentile([], 0.99) == 0.0
+
+
+def test_compare_flags_regressions_over_threshold():
+    base = _result(10.0, 500.0)
+    assert compare(_result(11.5, 450.0), base, threshold=0.2, min_ms=1.0) == []
+    regressions = compare(_result(13.0, 350.0, errors=2), base, threshold=0.2, min_ms=1.0)
+    assert len(regressions) == 3 and "p95 10.00 -> 13.00" in regressions[0]
+    # рост меньше min_ms — шум, а не регрессия
+    assert compare(_result(0.9, 500.0), _result(0.5, 500.0), threshold=0.2, min_ms=1.0) == []
+    # сценарий, которого нет в baseline, не сравнивается
+    assert compare(_result(99.0, 1.0), {"results": {}}, threshold=0.2, min_ms=1.0) == []
+
+
+def test_run_scenario_counts_only_2xx_as_samples():
+    codes = iter([200, 422, 201, 404])
+    stats = run_scenario(lambda m, u, b: _Response(next(codes)), lambda i: ("GET", "/x", None), None, 4, 1)
+    assert (stats["requests"], stats["samples"], stats["errors"]) == (4, 2, 2)
+
+
+def test_workload_writes_only_own_rows():
+    calls = []
+
+    def send(method, url, body):
+        calls.append((method, url, body))
+        return _Response(200, {"id": 100 + len(calls)})
+
+    w = Workload(projects=10, tasks=10, comments=10, attachments=10)
+    w.send = send
+    # новое вложение создаётся со своими проектом, задачей и комментарием
+    assert w.fresh("attachments", 0) == 104
+    assert [c[1] for c in calls] == ["/projects/", "/tasks/", "/comments/", "/attachments/"]
+    assert calls[1][2]["project_id"] == 101 and calls[3][2]["comment_id"] == 103
+    assert w.own("comments", 5) == 103 and w.fresh("projects", 1) == 105 and w.own("projects", 3) == 101
+    w.cleanup()
+    assert calls[-2:] == [("DELETE", "/projects/101", None), ("DELETE", "/projects/105", None)]
+
+    w.send = lambda method, url, body: _Response(422)
+    with pytest.raises(RuntimeError, match="POST /projects/: 422"):
+        w.own("projects", 0)
@@ -0,0 +1,102 @@
+def test_bulk_create_tasks_comments_attachments(client, db_session):
+    p = client.post("/projects/", json={"name": "BulkProj", "budget": 1}).json()
+
+    tasks = [{"name": f"BT{i}", "project_id": p["id"], "status": "open", "time_estimation": i} for i in range(7)]
+    r = client.post("/tasks/bulk", json=tasks)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["count"] == 7 and len(body["ids"]) == 7
+    for i, task_id in enumerate(body["ids"]):
+        assert client.get(f"/tasks/{task_id}").json()["name"] == f"BT{i}"
+
+    comments = [{"task_id": body["ids"][0], "author": "a", "message": f"m{i}"} for i in range(3)]
+    r = client.post("/comments/bulk", json=comments)
+    assert r.status_code == 200
+    comment_ids = r.json()["ids"]
+    assert [client.get(f"/comments/{c}").json()["message"] for c in comment_ids] == ["m0", "m1", "m2"]
+
+    r = client.post("/attachments/bulk", json=[{"comment_id": comment_ids[0], "file_name": "a.txt"}])
+    assert r.status_code == 200 and r.json()["count"] == 1
+
+    assert client.post("/tasks/bulk", json=[]).json() == {"count": 0, "ids": []}
+
+
+def test_bulk_create_chunks(client, monkeypatch):
+    from app.backend.config import config as cfg
+
+    monkeypatch.setattr(cfg, "BULK_INSERT_CHUNK_SIZE", 2)
+    p = client.post("/projects/", json={"name": "ChunkProj"}).json()
+    r = client.post("/tasks/bulk", json=[{"name": f"C{i}", "project_id": p["id"]} for i in range(5)])
+    ids = r.json()["ids"]
+    assert len(ids) == 5 and ids == sorted(ids)
+
+
+def test_bulk_create_validation(client):
+    r = client.post("/tasks/bulk", json=[{"name": "no project"}])
+    assert r.status_code == 422
+
+
+def test_bulk_update_and_delete_tasks_by_filter(client):
+    p = client.post("/projects/", json={"name": "SprintProj"}).json()
+    client.post("/tasks/bulk", json=[
+        {"name": f"S{i}", "project_id": p["id"], "status": "open" if i < 4 else "done"} for i in range(6)
+    ])
+
+    r = client.patch(f"/tasks/?project_id={p['id']}&status=open", json={"status": "closed"})
+    assert r.status_code == 200 and r.json() == {"affected": 4}
+    statuses = [t["status"] for t in client.get(f"/tasks/?project_id={p['id']}").json()]
+    assert sorted(statuses) == ["closed"] * 4 + ["done"] * 2
+
+    r = client.delete(f"/tasks/?project_id={p['id']}&status=done")
+    assert r.json() == {"affected": 2}
+    assert len(client.get(f"/tasks/?project_id={p['id']}").json()) == 4
+
+    # без фильтров и без изменяемых полей — отказ
+    assert client.delete("/tasks/").status_code == 400
+    assert client.patch(f"/tasks/?project_id={p['id']}", json={}).status_code == 400
+
+
+def test_bulk_delete_projects_cascades(client):
+    p = client.post("/projects/", json={"name": "ZZCascade", "is_active": False}).json()
+    t = client.post("/tasks/", json={"name": "CT", "project_id": p["id"]}).json()
+    c = client.post("/comments/", json={"task_id": t["id"], "message": "x"}).json()
+
+    r = client.patch("/projects/?name=ZZCascade", json={"budget": 7})
+    assert r.json() == {"affected": 1}
+    assert float(client.get(f"/projects/{p['id']}").json()["budget"]) == 7
+
+    r = client.delete("/projects/?name=ZZCascade&is_active=false")
+    assert r.json() == {"affected": 1}
+    assert client.get(f"/tasks/{t['id']}").status_code == 404
+    assert client.get(f"/comments/{c['id']}").status_code == 404
+
+
+def test_bulk_insert_mssql_output_into():
+    from sqlalchemy.dialects import mssql
+
+    from app.backend.crud.crud import _insert_batches
+    from app.backend.models.models import Project, Task
+
+    dialect = mssql.pymssql.dialect()
+    rows = [{"name": f"T{i}", "project_id": 1, "status": "open"} for i in range(1500)]
+    batches = _insert_batches(dialect, Task, rows)
+    # у tasks и projects триггеры: OUTPUT только с INTO, не больше 2000 параметров на пакет
+    assert len(batches) == 3
+    sql = str(batches[0][0].compile(dialect=dialect))
+    assert "OUTPUT INSERTED.id INTO @ids" in sql and "ORDER BY n" in sql
+    assert sum(len(stmt.compile(dialect=dialect).params) for stmt, _ in batches) == 1500 * 3
+    assert all(len(stmt.compile(dialect=dialect).params) <= 2000 for stmt, _ in batches)
+
+    (stmt, params), = _insert_batches(dialect, Project, [{"name": "P"}])
+    assert "INTO @ids" in str(stmt.compile(dialect=dialect)) and params is None
+
+
+def test_bulk_insert_without_returning(client, monkeypatch):
+    from app.backend.crud import crud
+
+    p = client.post("/projects/", json={"name": "NoReturning"}).json()
+    monkeypatch.setattr(crud, "_supports_returning", lambda dialect, model, kind: False)
+    r = client.post("/tasks/bulk", json=[{"name": f"NR{i}", "project_id": p["id"]} for i in range(4)])
+    ids = r.json()["ids"]
+    assert len(ids) == 4
+    assert [client.get(f"/tasks/{i}").json()["name"] for i in ids] == ["NR0", "NR1", "NR2", "NR3"]
@@ -0,0 +1,42 @@
+import time
+
+from app.backend.cache import EntityCache, MemoryCacheBackend
+
+
+def test_memory_backend_lru_and_ttl():
+    cache = EntityCache(MemoryCacheBackend(max_entries=2, ttl=0.05))
+    cache.set("project", 1, {"id": 1})
+    cache.set("project", 2, {"id": 2})
+    assert cache.get("project", 1) == {"id": 1}  # 1 становится самым свежим
+    cache.set("project", 3, {"id": 3})  # вытесняет 2
+    assert cache.get("project", 2) is None
+    assert cache.get("project", 3) == {"id": 3}
+    time.sleep(0.06)
+    assert cache.get("project", 1) is None
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 2
+    assert stats["evictions"] == 1 and stats["expirations"] == 1
+
+
+def test_get_is_served_from_cache_and_invalidated_on_write(client, sql_statements):
+    p = client.post("/projects/", json={"name": "Cached", "budget": 1}).json()
+    t = client.post("/tasks/", json={"name": "CT", "project_id": p["id"]}).json()
+
+    client.get(f"/projects/{p['id']}")
+    sql_statements.clear()
+    assert client.get(f"/projects/{p['id']}").json()["name"] == "Cached"
+    assert sql_statements == []
+
+    client.put(f"/projects/{p['id']}", json={"name": "Renamed"})
+    assert client.get(f"/projects/{p['id']}").json()["name"] == "Renamed"
+
+    client.get(f"/tasks/{t['id']}")
+    client.patch(f"/tasks/?project_id={p['id']}", json={"status": "done"})
+    assert client.get(f"/tasks/{t['id']}").json()["status"] == "done"
+
+    client.delete(f"/projects/{p['id']}")
+    assert client.get(f"/projects/{p['id']}").status_code == 404
+    assert client.get(f"/tasks/{t['id']}").status_code == 404
+
+    stats = client.get("/admin/cache").json()
+    assert stats["hits"] >= 1 and stats["misses"] >= 1
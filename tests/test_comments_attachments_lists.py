@@ -0,0 +1,55 @@
+from app.backend.config import config as cfg
+
+
+def _seed(client):
+    p = client.post("/projects/", json={"name": "CL"}).json()
+    t = client.post("/tasks/", json={"name": "CLT", "project_id": p["id"]}).json()
+    other = client.post("/tasks/", json={"name": "CLO", "project_id": p["id"]}).json()
+    comments = [
+        {"task_id": t["id"], "author": "ann" if i % 2 else "bob", "rating": i,
+         "created_at": f"2024-01-0{i + 1}T10:00:00", "message": f"c{i}"}
+        for i in range(5)
+    ]
+    ids = client.post("/comments/bulk", json=comments + [{"task_id": other["id"], "author": "ann"}]).json()["ids"]
+    return t, ids
+
+
+def test_comment_filters_sort_and_cursor(client):
+    t, ids = _seed(client)
+    r = client.get(f"/comments/?task_id={t['id']}&author=ann&min_rating=2")
+    assert [c["message"] for c in r.json()] == ["c3"]
+    r = client.get(f"/comments/?task_id={t['id']}&created_from=2024-01-02T00:00:00&created_to=2024-01-04T00:00:00")
+    assert [c["message"] for c in r.json()] == ["c1", "c2"]
+
+    seen = []
+    url = f"/comments/?task_id={t['id']}&sort_by=created_at&sort_dir=desc&limit=2"
+    r = client.get(url)
+    while True:
+        seen += [c["message"] for c in r.json()]
+        if "X-Next-Cursor" not in r.headers:
+            break
+        r = client.get(f"{url}&cursor={r.headers['X-Next-Cursor']}")
+    assert seen == ["c4", "c3", "c2", "c1", "c0"]
+
+
+def test_attachment_filters_and_hard_cap(client, monkeypatch):
+    _, ids = _seed(client)
+    client.post("/attachments/bulk", json=[{"comment_id": ids[0], "file_name": f"a{i}", "is_visible": i != 0} for i in range(3)])
+    r = client.get(f"/attachments/?comment_id={ids[0]}&is_visible=true&with_total=exact")
+    assert [a["file_name"] for a in r.json()] == ["a1", "a2"] and r.headers["X-Total-Count"] == "2"
+
+    monkeypatch.setattr(cfg, "MAX_PAGE_SIZE", 2)
+    r = client.get("/comments/?limit=100000")
+    assert len(r.json()) == 2 and "X-Next-Cursor" in r.headers
+    # проекты и задачи урезаются так же
+    client.post("/projects/", json={"name": "CL2"})
+    client.post("/projects/", json={"name": "CL3"})
+    for url in ("/projects/?limit=100000", "/tasks/?limit=100000"):
+        r = client.get(url)
+        assert len(r.json()) == 2 and "X-Next-Cursor" in r.headers
+
+
+def test_attachment_sort_fields_documented(client):
+    params = {p["name"]: p for p in client.get("/openapi.json").json()["paths"]["/attachments/"]["get"]["parameters"]}
+    assert "rating" not in params["sort_by"]["description"]
+    assert "MAX_PAGE_SIZE" in params["limit"]["description"]
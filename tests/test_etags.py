@@ -0,0 +1,57 @@
+def test_list_etag_304_without_list_query(client, sql_statements):
+    p = client.post("/projects/", json={"name": "ETagP"}).json()
+    r = client.get("/projects/")
+    etag = r.headers["ETag"]
+    assert "public" in r.headers["Cache-Control"]
+
+    sql_statements.clear()
+    r = client.get("/projects/", headers={"If-None-Match": etag})
+    assert r.status_code == 304 and r.headers["ETag"] == etag and r.content == b""
+    assert len(sql_statements) == 1 and "table_versions" in sql_statements[0]
+    assert client.get("/projects/", headers={"If-None-Match": f'W/{etag}, "other"'}).status_code == 304
+
+    # запись задачи меняет ETag задач, но не проектов
+    tasks_etag = client.get("/tasks/").headers["ETag"]
+    client.post("/tasks/", json={"name": "ET", "project_id": p["id"]})
+    assert client.get("/projects/", headers={"If-None-Match": etag}).status_code == 304
+    r = client.get("/tasks/", headers={"If-None-Match": tasks_etag})
+    assert r.status_code == 200 and r.headers["ETag"] != tasks_etag
+
+    # удаление проекта каскадом меняет и версию задач
+    tasks_etag = r.headers["ETag"]
+    client.delete(f"/projects/{p['id']}")
+    assert client.get("/projects/", headers={"If-None-Match": etag}).status_code == 200
+    assert client.get("/tasks/", headers={"If-None-Match": tasks_etag}).status_code == 200
+
+
+def test_detail_etag(client):
+    p = client.post("/projects/", json={"name": "ETagD"}).json()
+    etag = client.get(f"/projects/{p['id']}").headers["ETag"]
+    assert client.get(f"/projects/{p['id']}", headers={"If-None-Match": etag}).status_code == 304
+    client.put(f"/projects/{p['id']}", json={"name": "ETagD2"})
+    r = client.get(f"/projects/{p['id']}", headers={"If-None-Match": etag})
+    assert r.status_code == 200 and r.json()["name"] == "ETagD2"
+
+
+def test_version_follows_direct_writes_and_compaction(client, db_session, monkeypatch):
+    from app.backend.config import config as cfg
+    from app.backend.crud import changes, versions
+    from app.backend.models import models
+
+    # commit: в асинхронном варианте запросы приложения идут через другое соединение
+    before = versions.read(db_session, "projects", "tasks")
+    p = models.Project(name="DirectV")
+    db_session.add(p)
+    db_session.commit()
+    db_session.add(models.Task(name="DT", project_id=p.id))
+    db_session.commit()
+    after = versions.read(db_session, "projects", "tasks")
+    assert after["projects"] > before["projects"] and after["tasks"] > before["tasks"]
+
+    changes.compact(db_session)
+    db_session.commit()
+    assert versions.read(db_session, "projects", "tasks") == after
+    # каскад FK вызывает триггер дочерней таблицы
+    monkeypatch.setattr(cfg, "PASSIVE_DELETES", True)
+    client.delete(f"/projects/{p.id}")
+    assert versions.read(db_session, "tasks")["tasks"] > after["tasks"]
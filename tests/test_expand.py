@@ -0,0 +1,51 @@
+def _project_with_children(client, n):
+    p = client.post("/projects/", json={"name": f"Tree{n}"}).json()
+    task_ids = client.post("/tasks/bulk", json=[{"name": f"T{i}", "project_id": p["id"]} for i in range(n)]).json()["ids"]
+    comment_ids = client.post("/comments/bulk", json=[{"task_id": t, "message": "m"} for t in task_ids for _ in range(2)]).json()["ids"]
+    client.post("/attachments/bulk", json=[{"comment_id": c, "file_name": "f"} for c in comment_ids])
+    return p
+
+
+def test_expand_query_count_is_constant(client, sql_statements):
+    counts = []
+    for n in (2, 10):
+        p = _project_with_children(client, n)
+        sql_statements.clear()
+        r = client.get(f"/projects/{p['id']}?expand=tasks.comments.attachments")
+        assert r.status_code == 200
+        body = r.json()
+        assert len(body["tasks"]) == n
+        assert all(len(t["comments"]) == 2 and len(t["comments"][0]["attachments"]) == 1 for t in body["tasks"])
+        counts.append(len(sql_statements))
+    assert counts == [4, 4]
+
+
+def test_expand_levels_and_validation(client):
+    p = _project_with_children(client, 1)
+    body = client.get(f"/projects/{p['id']}?expand=tasks").json()
+    assert "comments" not in body["tasks"][0]
+    assert "tasks" not in client.get(f"/projects/{p['id']}").json()
+
+    task_id = body["tasks"][0]["id"]
+    body = client.get(f"/tasks/{task_id}?expand=comments.attachments").json()
+    assert body["comments"][0]["attachments"][0]["file_name"] == "f"
+
+    assert client.get(f"/projects/{p['id']}?expand=comments").status_code == 400
+    assert client.get(f"/tasks/{task_id}?expand=comments.tasks").status_code == 400
+    assert client.get("/projects/999999?expand=tasks").status_code == 404
+
+
+def test_expand_level_over_max_page_size(client, monkeypatch, sql_statements):
+    from app.backend.config import config as cfg
+
+    p = _project_with_children(client, 3)  # 3 задачи, 6 комментариев, 6 вложений
+    monkeypatch.setattr(cfg, "MAX_PAGE_SIZE", 6)
+    sql_statements.clear()
+    assert client.get(f"/projects/{p['id']}?expand=tasks.comments.attachments").status_code == 200
+    # уровень читает не больше MAX_PAGE_SIZE + 1 строк
+    assert all("LIMIT" in s for s in sql_statements[1:]) and len(sql_statements) == 4
+
+    monkeypatch.setattr(cfg, "MAX_PAGE_SIZE", 5)
+    assert len(client.get(f"/projects/{p['id']}?expand=tasks").json()["tasks"]) == 3
+    r = client.get(f"/projects/{p['id']}?expand=tasks.comments")
+    assert r.status_code == 400 and "'comments' has more than 5 rows" in r.json()["detail"]
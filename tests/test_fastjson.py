@@ -0,0 +1,24 @@
+import pytest
+
+from app.backend.config import config as cfg
+
+
+@pytest.mark.parametrize("path", ["/projects/?limit=2&sort_by=budget", "/tasks/?limit=2", "/comments/", "/attachments/"])
+def test_fast_path_matches_orm_path(client, monkeypatch, path):
+    p = client.post("/projects/", json={"name": "FJ", "budget": 12.5, "start_date": "2024-01-02"}).json()
+    client.post("/projects/", json={"name": "FJ2", "budget": 3})
+    client.post("/projects/", json={"name": "FJ3"})
+    t = client.post("/tasks/", json={"name": "FT", "project_id": p["id"], "time_estimation": 2}).json()
+    client.post("/tasks/", json={"name": "FT2", "project_id": p["id"]})
+    client.post("/tasks/", json={"name": "FT3", "project_id": p["id"]})
+    c = client.post("/comments/", json={"task_id": t["id"], "message": "m", "created_at": "2024-01-02T03:04:05"}).json()
+    client.post("/attachments/", json={"comment_id": c["id"], "file_name": "a.txt", "size_kb": 7})
+
+    monkeypatch.setattr(cfg, "FAST_JSON", True)
+    fast = client.get(path)
+    monkeypatch.setattr(cfg, "FAST_JSON", False)
+    slow = client.get(path)
+    assert fast.status_code == slow.status_code == 200
+    assert fast.json() == slow.json()
+    assert fast.headers.get("X-Next-Cursor") == slow.headers.get("X-Next-Cursor")
+    assert fast.headers.get("ETag") == slow.headers.get("ETag")
@@ -0,0 +1,39 @@
+def test_list_fields_narrow_select(client, sql_statements):
+    p = client.post("/projects/", json={"name": "FieldsP", "description": "x" * 1000, "budget": 5}).json()
+    client.post("/projects/", json={"name": "FieldsQ", "budget": 7})
+
+    sql_statements.clear()
+    r = client.get("/projects/?name=Fields&fields=name&sort_by=budget&limit=1")
+    assert r.json() == [{"id": p["id"], "name": "FieldsP"}]
+    select_sql = next(s for s in sql_statements if s.startswith("SELECT projects.id"))
+    assert "description" not in select_sql
+
+    # курсор строится по budget, хотя в ответ он не попал
+    r = client.get(f"/projects/?name=Fields&fields=name&sort_by=budget&limit=1&cursor={r.headers['X-Next-Cursor']}")
+    assert [x["name"] for x in r.json()] == ["FieldsQ"]
+
+    t = client.post("/tasks/", json={"name": "FT", "project_id": p["id"], "status": "open"}).json()
+    c = client.post("/comments/", json={"task_id": t["id"], "message": "long", "author": "me"}).json()
+    assert client.get(f"/tasks/?project_id={p['id']}&fields=name,status").json() == [{"id": t["id"], "name": "FT", "status": "open"}]
+    assert client.get("/comments/?fields=author").json() == [{"id": c["id"], "author": "me"}]
+
+
+def test_detail_fields_and_validation(client, sql_statements):
+    p = client.post("/projects/", json={"name": "FieldsD", "description": "long text"}).json()
+    sql_statements.clear()
+    assert client.get(f"/projects/{p['id']}?fields=name").json() == {"id": p["id"], "name": "FieldsD"}
+    assert "description" not in sql_statements[0]
+
+    client.get(f"/projects/{p['id']}")  # заполняет кэш
+    sql_statements.clear()
+    assert client.get(f"/projects/{p['id']}?fields=name,budget").json() == {"id": p["id"], "name": "FieldsD", "budget": None}
+    assert sql_statements == []
+
+    t = client.post("/tasks/", json={"name": "FDT", "project_id": p["id"]}).json()
+    c = client.post("/comments/", json={"task_id": t["id"], "message": "m", "rating": 3}).json()
+    assert client.get(f"/comments/{c['id']}?fields=rating").json() == {"id": c["id"], "rating": 3}
+
+    assert client.get("/projects/?fields=name,secret").status_code == 400
+    assert client.get(f"/tasks/{t['id']}?fields=project").status_code == 400
+    assert client.get(f"/projects/{p['id']}?fields=name&expand=tasks").status_code == 400
+    assert client.get("/comments/999999?fields=message").status_code == 404
@@ -0,0 +1,88 @@
+import json
+import logging
+import re
+
+import pytest
+
+from app.backend import api, api_async
+from app.backend.config import config as cfg
+from app.backend.instrumentation import QueryBudgetExceeded
+
+
+def _timing(response):
+    header = response.headers["server-timing"]
+    queries, rows = map(int, re.search(r'desc="(\d+) queries, (\d+) rows"', header).groups())
+    return header, queries, rows
+
+
+def test_server_timing_counts_queries_and_rows(client):
+    for name in ("A", "B", "C"):
+        client.post("/projects/", json={"name": name})
+    client.get("/projects/")  # версии таблиц создаются при первом чтении
+
+    header, queries, rows = _timing(client.get("/projects/"))
+    assert (queries, rows) == (2, 4)  # версия таблицы + страница; строки: 1 + 3
+    assert all(f"{m};dur=" in header for m in ("db", "ser", "app", "total"))
+
+    pid = client.get("/projects/").json()[0]["id"]
+    assert _timing(client.get(f"/projects/{pid}"))[1:] == (1, 1)
+    # повторное чтение — из кэша сущностей, без обращения к БД
+    assert _timing(client.get(f"/projects/{pid}"))[1:] == (0, 0)
+
+
+def _set_list_budget(monkeypatch, limit):
+    for module in (api, api_async):
+        monkeypatch.setattr(module.list_projects, "query_budget", limit)
+
+
+def test_query_budget_raises_on_extra_statement(client, monkeypatch):
+    client.post("/projects/", json={"name": "A"})
+    _set_list_budget(monkeypatch, 1)
+    with pytest.raises(QueryBudgetExceeded, match=r"GET /projects/: SQL statement #2 exceeds query budget 1"):
+        client.get("/projects/")
+
+
+def test_query_budget_warn_mode_logs(client, monkeypatch, caplog):
+    _set_list_budget(monkeypatch, 1)
+    monkeypatch.setattr(cfg, "QUERY_BUDGET_MODE", "warn")
+    with caplog.at_level(logging.WARNING, logger="app.requests"):
+        assert client.get("/projects/").status_code == 200
+    assert sum("exceeds query budget" in r.getMessage() for r in caplog.records) == 1
+
+
+def test_structured_request_log(client, caplog):
+    client.post("/projects/", json={"name": "A"})
+    with caplog.at_level(logging.INFO, logger="app.requests"):
+        client.get("/projects/?limit=5")
+    entry = json.loads(caplog.records[-1].getMessage())
+    assert entry["method"] == "GET" and entry["route"] == "/projects/" and entry["status"] == 200
+    assert entry["queries"] >= 1 and entry["rows"] >= 1 and entry["bytes"] > 0
+    assert entry["duration_ms"] >= entry["db_ms"]
+
+
+def test_serialization_timed_by_route(client, monkeypatch):
+    monkeypatch.setattr(cfg, "FAST_JSON", False)
+    p = client.post("/projects/", json={"name": "S"}).json()
+    client.post("/tasks/bulk", json=[{"name": f"T{i}", "project_id": p["id"]} for i in range(50)])
+    header = client.get("/tasks/").headers["server-timing"]
+    assert float(re.search(r"ser;dur=([\d.]+)", header).group(1)) > 0
+
+
+def test_failed_statement_leaves_no_timing_state(db_session):
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+
+    from app.backend import instrumentation
+
+    stats = instrumentation.RequestStats({"method": "GET", "path": "/x"})
+    token = instrumentation._current.set(stats)
+    try:
+        conn = db_session.connection()
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM no_such_table"))
+        conn.execute(text("SELECT 1")).all()
+    finally:
+        instrumentation._current.reset(token)
+    # начало выражения живёт в его ExecutionContext, а не в стеке на соединении
+    assert stats.statements == 2 and stats.rows == 1
+    assert not [k for k in conn.info if "started" in str(k)]
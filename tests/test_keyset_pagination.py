@@ -0,0 +1,51 @@
+def _walk(client, url, limit):
+    seen = []
+    r = client.get(f"{url}&limit={limit}")
+    assert r.status_code == 200
+    seen.extend(r.json())
+    while "X-Next-Cursor" in r.headers:
+        r = client.get(f"{url}&limit={limit}&cursor={r.headers['X-Next-Cursor']}")
+        assert r.status_code == 200
+        seen.extend(r.json())
+    return seen
+
+
+def test_keyset_matches_offset_order(client):
+    budgets = [30, None, 10, 30, None, 50, 10]
+    for i, b in enumerate(budgets):
+        client.post("/projects/", json={"name": f"K{i}", "budget": b, "is_active": True})
+
+    for sort_dir in ("asc", "desc"):
+        url = f"/projects/?sort_by=budget&sort_dir={sort_dir}"
+        full = client.get(f"{url}&limit=100").json()
+        walked = _walk(client, url, 2)
+        assert [p["id"] for p in walked] == [p["id"] for p in full]
+        assert len(walked) == len(budgets)
+
+
+def test_keyset_tasks_default_order(client):
+    p = client.post("/projects/", json={"name": "KP", "budget": 1}).json()
+    for i in range(5):
+        client.post("/tasks/", json={"name": f"KT{i}", "project_id": p["id"], "status": "open"})
+    walked = _walk(client, f"/tasks/?project_id={p['id']}", 2)
+    ids = [t["id"] for t in walked]
+    assert ids == sorted(ids) and len(ids) == 5
+
+
+def test_invalid_cursor(client):
+    r = client.get("/tasks/?cursor=not-a-cursor")
+    assert r.status_code == 400 and r.json()["detail"] == "Invalid cursor"
+
+    for name in ("C1", "C2"):
+        client.post("/projects/", json={"name": name})
+    r = client.get("/projects/?limit=1")
+    assert "X-Next-Cursor" in r.headers
+    cursor = r.headers["X-Next-Cursor"]
+    assert client.get(f"/projects/?limit=1&cursor={cursor}").status_code == 200
+    # курсор, выданный для сортировки по id, не принимается с другими sort_by/sort_dir
+    for params in ("sort_by=name", "sort_by=name&sort_dir=desc"):
+        r = client.get(f"/projects/?{params}&cursor={cursor}")
+        assert r.status_code == 400 and r.json()["detail"] == "Cursor does not match sort_by/sort_dir"
+    r = client.get("/projects/?sort_by=name&limit=1")
+    r = client.get(f"/projects/?sort_by=name&sort_dir=desc&cursor={r.headers['X-Next-Cursor']}")
+    assert r.status_code == 400 and r.json()["detail"] == "Cursor does not match sort_by/sort_dir"
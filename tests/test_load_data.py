@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import create_engine, func, select
+
+from app.backend.crud import aggregates, loader
+from app.backend.crud.db import Base
+from app.backend.models.models import AggregateStat, Project, TableChange, Task
+
+
+@pytest.fixture()
+def load_engine(tmp_path):
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'load.db'}", future=True)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def test_generator_is_deterministic():
+    first = list(loader.generate("tasks", 5, per_parent=2, seed=3))
+    assert first == list(loader.generate("tasks", 5, per_parent=2, seed=3))
+    assert first != list(loader.generate("tasks", 5, per_parent=2, seed=4))
+    assert [r["project_id"] for r in first] == [1, 1, 2, 2, 3]
+
+
+def test_second_load_shifts_ids_and_parent_refs(load_engine):
+    with load_engine.connect() as conn:
+        for _ in range(2):
+            offsets = {}
+            loader.load_table(conn, "projects", loader.generate("projects", 3, seed=1), offsets, batch_size=2)
+            report = loader.load_table(conn, "tasks", loader.generate("tasks", 6, 2, seed=1), offsets, batch_size=4)
+            assert report["rows"] == 6 and report["rejected"] == 0
+        assert offsets == {"projects": 3, "tasks": 6}
+        pairs = conn.execute(select(Task.id, Task.project_id).order_by(Task.id)).all()
+        assert pairs[6:] == [(7, 4), (8, 4), (9, 5), (10, 5), (11, 6), (12, 6)]
+
+
+def test_csv_rejects_invalid_rows_and_unknown_parents(load_engine, tmp_path):
+    with load_engine.connect() as conn:
+        loader.load_table(conn, "projects", [{"name": "existing"}], {})
+        path = tmp_path / "tasks.csv"
+        path.write_text("name,project_id,time_estimation\nok,1,5\nbad,1,many\norphan,999,\n", encoding="utf-8")
+        assert loader.table_for(path) == "tasks"
+
+        with pytest.raises(loader.LoadError):
+            loader.load_table(conn, "tasks", loader.read_file(path), {})
+        report = loader.load_table(conn, "tasks", loader.read_file(path), {}, max_errors=2)
+        assert (report["rows"], report["rejected"]) == (1, 2)
+        assert conn.execute(select(Task.name, Task.time_estimation)).all() == [("ok", 5)]
+
+
+def test_finalize_rebuilds_aggregates(load_engine):
+    with load_engine.connect() as conn:
+        loader.load_table(conn, "projects", loader.generate("projects", 10, seed=2), {}, check=False)
+        assert conn.execute(select(func.count()).select_from(TableChange)).scalar_one() == 10
+        loader.finalize(conn)
+        assert conn.execute(select(func.count()).select_from(TableChange)).scalar_one() == 0
+        stored = conn.execute(select(AggregateStat.row_count).where(AggregateStat.name == "projects")).scalar_one()
+        assert stored == conn.execute(select(func.count()).select_from(Project)).scalar_one() == 10
+        assert conn.execute(aggregates.live_stmt("projects")).one()[0] == 10
@@ -0,0 +1,62 @@
+import os
+
+from fastapi.testclient import TestClient
+
+import main
+from app.backend.api import app
+from app.backend.config import config as cfg
+from app.backend.crud import changes
+from app.backend.crud.db import Base
+
+
+def test_dev_mode_reloads_single_process():
+    options = main.server_options(main.parse_args(["--dev"]))
+    assert options["reload"] is True
+    assert "workers" not in options
+    assert main.worker_env(main.parse_args(["--dev"]))["DB_CREATE_TABLES"] == "1"
+
+
+def test_prod_mode_uses_cores_and_skips_create_all(monkeypatch):
+    monkeypatch.delenv("DB_CREATE_TABLES", raising=False)
+    args = main.parse_args(["--prod", "--host", "0.0.0.0", "--backlog", "4096", "--keep-alive", "15",
+                            "--graceful-timeout", "20", "--threadpool", "100", "--loop", "uvloop", "--http", "httptools"])
+    options = main.server_options(args)
+    assert "reload" not in options
+    assert options["workers"] == (os.cpu_count() or 1)
+    assert options["host"] == "0.0.0.0"
+    assert (options["loop"], options["http"]) == ("uvloop", "httptools")
+    assert (options["backlog"], options["timeout_keep_alive"], options["timeout_graceful_shutdown"]) == (4096, 15, 20)
+    assert main.worker_env(args) == {"DB_CREATE_TABLES": "0", "THREADPOOL_SIZE": "100"}
+    assert main.server_options(main.parse_args(["--prod", "--workers", "3"]))["workers"] == 3
+    assert main.worker_env(main.parse_args(["--prod", "--create-tables"]))["DB_CREATE_TABLES"] == "1"
+
+
+def test_lifespan_honours_create_tables_and_threadpool(monkeypatch):
+    import anyio.to_thread
+
+    calls = []
+    monkeypatch.setattr(cfg, "DB_CREATE_TABLES", False)
+    monkeypatch.setattr(cfg, "THREADPOOL_SIZE", 7)
+    monkeypatch.setattr(Base.metadata, "create_all", lambda *a, **kw: calls.append(a))
+    monkeypatch.setattr(changes, "check_triggers", lambda: [])
+
+    async def limiter_tokens():
+        return anyio.to_thread.current_default_thread_limiter().total_tokens
+
+    with TestClient(app) as client:
+        assert client.portal.call(limiter_tokens) == 7
+    assert calls == []
+
+
+def test_lifespan_fails_without_journal_triggers(monkeypatch):
+    monkeypatch.setattr(cfg, "DB_CREATE_TABLES", False)
+    monkeypatch.setattr(changes, "check_triggers", lambda: ["projects", "tasks"])
+    try:
+        with TestClient(app):
+            raise AssertionError("startup must fail without table_changes triggers")
+    except RuntimeError as e:
+        assert "table_changes triggers missing on projects, tasks" in str(e)
+
+    monkeypatch.setattr(cfg, "STATS_REQUIRE_TRIGGERS", False)
+    with TestClient(app):
+        pass
@@ -0,0 +1,72 @@
+from app.backend.config import config as cfg
+from app.backend.metrics import ERRORS, LATENCY, QUERIES, REQUESTS, Histogram, statement_table
+
+
+def test_statement_table():
+    assert statement_table("SELECT tasks.id FROM tasks WHERE tasks.status = ?") == ("tasks", "select")
+    assert statement_table("INSERT INTO [comments] (text) VALUES (?)") == ("comments", "insert")
+    assert statement_table("UPDATE projects SET name=? WHERE projects.id = ?") == ("projects", "update")
+    assert statement_table("DELETE FROM attachments WHERE attachments.id IN (?)") == ("attachments", "delete")
+    assert statement_table("SAVEPOINT sa_savepoint_1") == ("-", "savepoint")
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram("h_seconds", "test", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        h.observe(value, "/x")
+    lines = h.render()
+    assert 'h_seconds_bucket{route="/x",le="0.1"} 1' in lines
+    assert 'h_seconds_bucket{route="/x",le="1"} 3' in lines
+    assert 'h_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 'h_seconds_count{route="/x"} 4' in lines
+    assert 'h_seconds_sum{route="/x"} 4.05' in lines
+
+
+def test_requests_counted_by_route_template(client):
+    p = client.post("/projects/", json={"name": "P"}).json()
+    before = REQUESTS.value("GET", "/projects/{project_id}", "200")
+    latency_before = LATENCY.count("GET", "/projects/{project_id}")
+    inserts = QUERIES.value("projects", "insert")
+    client.get(f"/projects/{p['id']}")
+    client.get(f"/projects/{p['id']}")
+    assert REQUESTS.value("GET", "/projects/{project_id}", "200") == before + 2
+    assert LATENCY.count("GET", "/projects/{project_id}") == latency_before + 2
+
+    client.post("/projects/", json={"name": "Q"})
+    assert QUERIES.value("projects", "insert") == inserts + 1
+
+    errors = ERRORS.value("GET", "/projects/{project_id}", "404")
+    assert client.get("/projects/999999").status_code == 404
+    assert ERRORS.value("GET", "/projects/{project_id}", "404") == errors + 1
+
+
+def test_metrics_endpoint_text_format(client):
+    client.get("/projects/")
+    client.get("/no/such/path")
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = r.text
+    for family in ("http_requests_total", "http_request_duration_seconds", "http_response_size_bytes",
+                   "http_requests_in_flight", "db_queries_total", "db_pool_checkout_wait_seconds"):
+        assert f"# TYPE {family} " in text
+    assert 'http_requests_total{method="GET",route="/projects/",status="200"}' in text
+    assert 'route="unmatched",status="404"' in text
+    assert "/no/such/path" not in text
+
+
+def test_metrics_disabled(client, monkeypatch):
+    monkeypatch.setattr(cfg, "METRICS_ENABLED", False)
+    before = REQUESTS.value("GET", "/projects/", "200")
+    client.get("/projects/")
+    assert REQUESTS.value("GET", "/projects/", "200") == before
+    assert client.get("/metrics").status_code == 404
+
+
+def test_unknown_methods_share_one_label(client):
+    before = REQUESTS.value("other", "unmatched", "405") + REQUESTS.value("other", "/projects/", "405")
+    for method in ("FOO1", "FOO2", "FOO3"):
+        client.request(method, "/projects/")
+    after = REQUESTS.value("other", "unmatched", "405") + REQUESTS.value("other", "/projects/", "405")
+    assert after == before + 3
+    assert "FOO1" not in client.get("/metrics").text
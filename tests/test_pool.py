@@ -0,0 +1,39 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.backend.crud.db import InstrumentedQueuePool, pool_stats
+
+
+def test_pool_stats_count_waits_and_timeouts(tmp_path):
+    import threading
+
+    eng = create_engine(
+        f"sqlite+pysqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05,
+    )
+    first = eng.connect()
+    stats = pool_stats(eng)
+    # создание соединения — не ожидание
+    assert stats["checked_out"] == 1 and stats["checkouts"] == 1 and stats["wait_time_max_ms"] == 0
+
+    # таймаут считается отдельно: это не выдача и не ожидание
+    with pytest.raises(exc.TimeoutError):
+        eng.connect()
+    stats = pool_stats(eng)
+    assert stats["checkout_timeouts"] == 1 and stats["checkouts"] == 1
+    assert stats["wait_time_max_ms"] == 0
+
+    eng.pool._timeout = 5
+    threading.Timer(0.05, first.close).start()
+    second = eng.connect()  # ждёт, пока первое соединение вернётся в пул
+    stats = pool_stats(eng)
+    assert stats["checkouts"] == 2 and 40 <= stats["wait_time_max_ms"] < 5000
+    second.close()
+    assert pool_stats(eng)["checked_out"] == 0
+    eng.dispose()
+
+
+def test_admin_pool_endpoint(client):
+    r = client.get("/admin/pool")
+    assert r.status_code == 200
+    assert "pool" in r.json()
@@ -25,3 +25,28 @@ def test_error_cases(client):
     assert r.status_code == 404
     r = client.get("/tasks/999999")
     assert r.status_code == 404
+
+
+def test_tasks_with_project_streaming(client):
+    r = client.post("/projects/", json={"name": "SProj", "budget": 1})
+    p = r.json()
+    for i in range(3):
+        client.post("/tasks/", json={"name": f"ST{i}", "project_id": p["id"]})
+
+    r = client.get("/reports/tasks_with_project?format=ndjson")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    import json
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    mine = [row for row in rows if row["project_id"] == p["id"]]
+    assert sorted(row["task_name"] for row in mine) == ["ST0", "ST1", "ST2"]
+    assert all(row["project_name"] == "SProj" for row in mine)
+
+    r = client.get("/reports/tasks_with_project?format=csv&left=false")
+    assert r.status_code == 200
+    lines = r.text.splitlines()
+    assert lines[0] == "task_id,task_name,project_id,project_name"
+    assert sum(1 for line in lines[1:] if line.endswith(",SProj")) == 3
+
+    r = client.get("/reports/tasks_with_project?format=xml")
+    assert r.status_code == 422
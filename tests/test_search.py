@@ -0,0 +1,30 @@
+def test_search_ranked_across_entities(client):
+    p = client.post("/projects/", json={"name": "Migration to cloud", "description": "Move the billing database"}).json()
+    other = client.post("/projects/", json={"name": "Website", "description": "Landing page"}).json()
+    t = client.post("/tasks/", json={"name": "Billing export", "project_id": other["id"]}).json()
+    c = client.post("/comments/", json={"task_id": t["id"], "message": "billing totals are off, billing team notified"}).json()
+    client.post("/comments/", json={"task_id": t["id"], "message": "unrelated note"})
+
+    hits = client.get("/search?q=billing").json()
+    assert {(h["kind"], h["id"]) for h in hits} == {("project", p["id"]), ("task", t["id"]), ("comment", c["id"])}
+    assert [h["rank"] for h in hits] == sorted((h["rank"] for h in hits), reverse=True)
+    comment_hit = next(h for h in hits if h["kind"] == "comment")
+    assert comment_hit["parent_id"] == t["id"] and "[billing]" in comment_hit["snippet"]
+
+    assert [h["kind"] for h in client.get("/search?q=billing&kinds=comment").json()] == ["comment"]
+    page = client.get("/search?q=billing&limit=1&offset=1").json()
+    assert page == hits[1:2]
+    assert client.get('/search?q=billing" OR "x').status_code == 200
+    assert client.get("/search?q=billing&kinds=user").status_code == 400
+
+
+def test_search_index_follows_writes(client):
+    p = client.post("/projects/", json={"name": "Zeppelin"}).json()
+    assert len(client.get("/search?q=zeppelin").json()) == 1
+    client.put(f"/projects/{p['id']}", json={"name": "Airship"})
+    assert client.get("/search?q=zeppelin").json() == []
+    t = client.post("/tasks/", json={"name": "Inflate airship", "project_id": p["id"]}).json()
+    client.post("/comments/", json={"task_id": t["id"], "message": "airship ready"})
+    assert len(client.get("/search?q=airship").json()) == 3
+    client.delete(f"/projects/{p['id']}")  # каскад удаляет и задачи с комментариями
+    assert client.get("/search?q=airship").json() == []
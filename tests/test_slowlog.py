@@ -0,0 +1,129 @@
+import pytest
+
+from app.backend.config import config as cfg
+from app.backend.slowlog import fingerprint, param_shape, plan_flags, slow_queries
+
+
+@pytest.fixture()
+def record_all(monkeypatch):
+    monkeypatch.setattr(cfg, "SLOW_QUERY_MS", 0.0)
+    monkeypatch.setattr(cfg, "SLOW_QUERY_PLANS", True)
+    slow_queries.clear()
+    yield
+    slow_queries.clear()
+
+
+def test_fingerprint_ignores_values_and_in_list_length():
+    a = fingerprint("SELECT * FROM tasks WHERE status = 'open' AND id IN (?, ?, ?) LIMIT 10")
+    b = fingerprint("SELECT *  FROM tasks\n WHERE status = 'done' AND id IN (?) LIMIT 50")
+    assert a == b == "SELECT * FROM tasks WHERE status = ? AND id IN (?+) LIMIT ?"
+    assert fingerprint("SELECT t1.id FROM tasks t1 WHERE x = %(x_1)s") == "SELECT t1.id FROM tasks t1 WHERE x = ?"
+
+
+def test_param_shape_has_types_not_values():
+    assert param_shape(("open", 5, None)) == "(str, int, NoneType)"
+    assert param_shape({"q": "x"}) == "{q: str}"
+    assert param_shape([(1, "a"), (2, "b")], executemany=True) == "executemany[2] (int, str)"
+
+
+def test_plan_flags():
+    assert plan_flags("SCAN tasks\nUSE TEMP B-TREE FOR ORDER BY") == ["full_scan", "sort"]
+    assert plan_flags("SEARCH tasks USING INDEX IX_tasks_project_id (project_id=?)") == []
+    assert plan_flags("SCAN tasks USING INDEX IX_tasks_status_priority") == []
+    assert plan_flags('<RelOp PhysicalOp="Clustered Index Scan" />') == ["full_scan"]
+
+
+def test_admin_report_groups_by_fingerprint_with_plan(client, record_all):
+    p = client.post("/projects/", json={"name": "P"}).json()
+    for status in ("open", "done", "open"):
+        client.post("/tasks/", json={"name": "T", "project_id": p["id"], "status": status})
+        client.get(f"/tasks/?status={status}&sort_by=name")
+
+    report = client.get("/admin/slow-queries", params={"sort": "count", "top": 100}).json()
+    assert report["recorded"] >= 3 and report["fingerprints"] == len(report["queries"])
+    listing = [q for q in report["queries"]
+               if "GET /tasks/" in q["routes"] and "FROM tasks" in q["statement"] and "ORDER BY" in q["statement"]]
+    assert len(listing) == 1
+    entry = listing[0]
+    assert entry["count"] == 3 and "'open'" not in entry["statement"]
+    # в тестовой SQLite нет индекса по status: скан таблицы и сортировка без индекса
+    assert entry["plan"] and set(entry["flags"]) == {"full_scan", "sort"}
+
+    assert client.post("/admin/slow-queries/reset").json()["fingerprints"] == 0
+
+
+def test_mssql_plan_captured_by_worker_outside_request(monkeypatch, record_all):
+    import threading
+    from types import SimpleNamespace
+
+    from app.backend import slowlog
+
+    threads = []
+
+    def fake_plan(engine, statement, parameters):
+        threads.append(threading.current_thread())
+        return '<RelOp PhysicalOp="Table Scan" />'
+
+    monkeypatch.setattr(slowlog, "_mssql_plan", fake_plan)
+    from sqlalchemy import create_engine
+
+    engine = create_engine("sqlite+pysqlite:///plans.db")
+    conn = SimpleNamespace(dialect=SimpleNamespace(name="mssql"), engine=engine)
+    entry = slow_queries.record("SELECT * FROM tasks WHERE status = ?", ("open",), False, 0.5, None)
+    slowlog.request_plan(conn, entry, "SELECT * FROM tasks WHERE status = ?", ("open",))
+    slowlog.plan_worker.join()
+    assert threads and threads[0] is not threading.current_thread()
+    assert entry["flags"] == ["full_scan"]
+
+
+def test_failed_statement_leaves_no_slowlog_state(db_session, record_all):
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+
+    conn = db_session.connection()
+    with pytest.raises(OperationalError):
+        conn.execute(text("SELECT * FROM no_such_table"))
+    conn.execute(text("SELECT 42")).all()
+    assert "slowlog_started" not in conn.info
+    assert any(q["statement"] == "SELECT ?" for q in slow_queries.top(100))
+
+
+def test_plan_engine_is_separate_and_unpooled():
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import NullPool
+
+    from app.backend import slowlog
+
+    app_engine = create_engine("sqlite+pysqlite:///plans.db")
+    plan_engine = slowlog._plan_engine(app_engine)
+    assert plan_engine is not app_engine and isinstance(plan_engine.pool, NullPool)
+    assert slowlog._plan_engine(app_engine) is plan_engine
+
+
+def test_mssql_plan_invalidates_connection_when_showplan_stays_on():
+    from app.backend import slowlog
+
+    class Cursor:
+        def execute(self, statement, parameters=None):
+            if statement == "SET SHOWPLAN_XML OFF":
+                raise RuntimeError("batch aborted")
+
+        def fetchall(self):
+            return [("<ShowPlanXML/>",)]
+
+    class Raw:
+        invalidated = closed = False
+
+        def cursor(self):
+            return Cursor()
+
+        def invalidate(self):
+            self.invalidated = True
+
+        def close(self):
+            self.closed = True
+
+    raw = Raw()
+    engine = type("E", (), {"raw_connection": lambda self: raw})()
+    assert slowlog._mssql_plan(engine, "SELECT 1", ()) == "<ShowPlanXML/>"
+    assert raw.invalidated and raw.closed
@@ -0,0 +1,46 @@
+from sqlalchemy import text
+
+
+def _seed(client):
+    p = client.post("/projects/", json={"name": "StatsP", "budget": 10, "is_active": True}).json()
+    q = client.post("/projects/", json={"name": "StatsQ", "budget": 30, "is_active": False}).json()
+    rows = [("open", "high", 2), ("open", "high", 4), ("open", "low", 6), ("done", "low", None)]
+    client.post("/tasks/bulk", json=[{"name": f"S{i}", "project_id": p["id"], "status": s, "priority": pr, "time_estimation": t}
+                                     for i, (s, pr, t) in enumerate(rows)])
+    client.post("/tasks/", json={"name": "Other", "project_id": q["id"], "status": "open", "priority": "high", "time_estimation": 10})
+    return p, q
+
+
+def test_task_stats_grouped(client, sql_statements):
+    p, _ = _seed(client)
+    sql_statements.clear()
+    r = client.get(f"/tasks/stats?project_id={p['id']}&group_by=priority,status&metrics=count,avg:time_estimation,max:time_estimation")
+    assert r.status_code == 200
+    assert r.json() == [
+        {"status": "done", "priority": "low", "count": 1, "avg_time_estimation": None, "max_time_estimation": None},
+        {"status": "open", "priority": "high", "count": 2, "avg_time_estimation": 3.0, "max_time_estimation": 4},
+        {"status": "open", "priority": "low", "count": 1, "avg_time_estimation": 6.0, "max_time_estimation": 6},
+    ]
+    assert len(sql_statements) == 1 and "GROUP BY tasks.status, tasks.priority" in sql_statements[0]
+
+    assert client.get(f"/tasks/stats?project_id={p['id']}").json() == [{"count": 4}]
+
+
+def test_project_stats_and_whitelist(client):
+    p, q = _seed(client)
+    r = client.get("/projects/stats?name=Stats&group_by=is_active&metrics=count,sum:budget")
+    assert r.json() == [{"is_active": False, "count": 1, "sum_budget": 30.0}, {"is_active": True, "count": 1, "sum_budget": 10.0}]
+
+    assert client.get("/tasks/stats?group_by=name").status_code == 400
+    assert client.get("/tasks/stats?metrics=sum:name").status_code == 400
+    assert client.get("/projects/stats?metrics=avg:time_estimation").status_code == 400
+
+
+def test_task_stats_uses_status_priority_index(db_session):
+    from app.backend.crud import stats
+
+    db_session.execute(text("CREATE INDEX IX_tasks_status_priority ON tasks(status, priority)"))
+    stmt = stats.stats_stmt("tasks", "status,priority", "count", [])
+    compiled = stmt.compile(db_session.get_bind(), compile_kwargs={"literal_binds": True})
+    plan = " ".join(str(r[-1]) for r in db_session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+    assert "IX_tasks_status_priority" in plan and "TEMP B-TREE" not in plan
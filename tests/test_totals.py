@@ -0,0 +1,36 @@
+import pytest
+
+from app.backend.config import config as cfg
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_with_total_exact_same_statement(client, sql_statements, monkeypatch, fast):
+    monkeypatch.setattr(cfg, "FAST_JSON", fast)
+    p = client.post("/projects/", json={"name": "TotalP"}).json()
+    client.post("/tasks/bulk", json=[{"name": f"TT{i}", "project_id": p["id"], "status": "open"} for i in range(5)])
+
+    sql_statements.clear()
+    r = client.get(f"/tasks/?project_id={p['id']}&limit=2&offset=2&with_total=exact")
+    assert len(r.json()) == 2 and "_total" not in r.json()[0]
+    assert r.headers["X-Total-Count"] == "5" and "X-Total-Count-Approximate" not in r.headers
+    assert sum(s.startswith("SELECT tasks.id") for s in sql_statements) == 1
+    assert not any(s.startswith("SELECT count(*)") for s in sql_statements)
+
+    # в keyset-режиме — тоже полное число под фильтрами, а не остаток после курсора
+    r = client.get(f"/tasks/?project_id={p['id']}&limit=2&with_total=exact&cursor={r.headers['X-Next-Cursor']}")
+    assert len(r.json()) == 1 and r.headers["X-Total-Count"] == "5"
+
+    r = client.get(f"/tasks/?project_id={p['id']}&offset=10&with_total=exact")
+    assert r.json() == [] and r.headers["X-Total-Count"] == "5"
+
+
+def test_with_total_approx(client):
+    client.post("/projects/", json={"name": "ApproxP"})
+    stored = client.get("/projects/aggregate").json()["count"]
+    r = client.get("/projects/?limit=1&with_total=approx")
+    assert r.headers["X-Total-Count"] == str(stored) and r.headers["X-Total-Count-Approximate"] == "1"
+
+    # с фильтрами оценка неприменима — точный подсчёт
+    r = client.get("/projects/?name=ApproxP&with_total=approx")
+    assert r.headers["X-Total-Count"] == "1" and "X-Total-Count-Approximate" not in r.headers
+    assert client.get("/projects/?with_total=maybe").status_code == 422
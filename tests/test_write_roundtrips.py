@@ -0,0 +1,130 @@
+def _count(sql_statements, call):
+    sql_statements.clear()
+    r = call()
+    assert r.status_code == 200, r.text
+    return r.json(), list(sql_statements)
+
+
+def test_create_and_update_single_statement(client, sql_statements):
+    proj, stmts = _count(sql_statements, lambda: client.post("/projects/", json={"name": "RT", "budget": 5}))
+    assert len(stmts) == 1 and stmts[0].startswith("INSERT") and "RETURNING" in stmts[0]
+    assert proj["name"] == "RT" and proj["is_active"] is True
+
+    task, stmts = _count(sql_statements, lambda: client.post("/tasks/", json={"name": "RTT", "project_id": proj["id"]}))
+    assert len(stmts) == 1
+    comment, stmts = _count(sql_statements, lambda: client.post("/comments/", json={"task_id": task["id"], "message": "m"}))
+    assert len(stmts) == 1
+    att, stmts = _count(sql_statements, lambda: client.post("/attachments/", json={"comment_id": comment["id"], "file_name": "f"}))
+    assert len(stmts) == 1
+
+    for url, body, key in [
+        (f"/projects/{proj['id']}", {"budget": 9}, "budget"),
+        (f"/tasks/{task['id']}", {"status": "done"}, "status"),
+        (f"/comments/{comment['id']}", {"message": "edited"}, "message"),
+        (f"/attachments/{att['id']}", {"size_kb": 3}, "size_kb"),
+    ]:
+        updated, stmts = _count(sql_statements, lambda: client.put(url, json=body))
+        assert len(stmts) == 1 and stmts[0].startswith("UPDATE") and "RETURNING" in stmts[0]
+        assert updated[key] == body[key]
+
+
+def test_update_missing_row(client):
+    assert client.put("/tasks/999999", json={"status": "x"}).status_code == 404
+    assert client.put("/projects/999999", json={}).status_code == 404
+
+
+def _project_tree(client):
+    p = client.post("/projects/", json={"name": "Tree"}).json()
+    t = client.post("/tasks/", json={"name": "TT", "project_id": p["id"]}).json()
+    c = client.post("/comments/", json={"task_id": t["id"], "message": "m"}).json()
+    a = client.post("/attachments/", json={"comment_id": c["id"], "file_name": "f"}).json()
+    return p, t, c, a
+
+
+def test_passive_delete_single_statement(client, sql_statements, monkeypatch):
+    from app.backend.config import config as cfg
+
+    monkeypatch.setattr(cfg, "PASSIVE_DELETES", True)
+    p, t, c, a = _project_tree(client)
+    sql_statements.clear()
+    assert client.delete(f"/projects/{p['id']}").status_code == 200
+    assert len(sql_statements) == 1 and sql_statements[0].startswith("DELETE FROM projects")
+    assert client.get(f"/tasks/{t['id']}").status_code == 404
+    assert client.get(f"/comments/{c['id']}").status_code == 404
+    assert client.get(f"/attachments/{a['id']}").status_code == 404
+    assert client.delete(f"/projects/{p['id']}").status_code == 404
+
+
+def test_orm_cascade_delete(client, monkeypatch):
+    from app.backend.config import config as cfg
+
+    monkeypatch.setattr(cfg, "PASSIVE_DELETES", False)
+    p, t, c, a = _project_tree(client)
+    assert client.delete(f"/projects/{p['id']}").status_code == 200
+    assert client.get(f"/attachments/{a['id']}").status_code == 404
+
+
+def test_returning_decision_for_triggered_tables():
+    from sqlalchemy.dialects import mssql, sqlite
+
+    from app.backend.crud.crud import _supports_returning
+    from app.backend.models.models import AggregateStat, Attachment, Comment, Project, Task
+
+    for kind in ("insert", "update"):
+        # у всех таблиц сущностей AFTER-триггеры: на MSSQL — путь без OUTPUT
+        for model in (Task, Project, Comment, Attachment):
+            assert not _supports_returning(mssql.pymssql.dialect(), model, kind)
+            assert _supports_returning(sqlite.dialect(), model, kind)
+        assert _supports_returning(mssql.pymssql.dialect(), AggregateStat, kind)
+
+
+def test_create_and_update_without_returning(client, sql_statements, monkeypatch):
+    from app.backend.crud import crud
+
+    p = client.post("/projects/", json={"name": "NR"}).json()
+    monkeypatch.setattr(crud, "_supports_returning", lambda dialect, model, kind: False)
+    sql_statements.clear()
+    task = client.post("/tasks/", json={"name": "NRT", "project_id": p["id"], "status": "open"}).json()
+    assert task["name"] == "NRT" and task["status"] == "open" and task["id"]
+    updated = client.put(f"/tasks/{task['id']}", json={"status": "done"}).json()
+    assert updated == {**task, "status": "done"}
+    assert not any("RETURNING" in s for s in sql_statements)
+    assert client.put("/tasks/999999", json={"status": "x"}).status_code == 404
+
+
+def test_mssql_single_row_writes_one_batch():
+    from types import SimpleNamespace
+
+    from sqlalchemy.dialects import mssql
+
+    from app.backend.crud.crud import _create, _update
+    from app.backend.crud.plans import run
+    from app.backend.models.models import Project
+
+    dialect = mssql.pyodbc.dialect()
+
+    class Session:
+        def __init__(self):
+            self.sql = []
+
+        def get_bind(self):
+            return SimpleNamespace(dialect=dialect)
+
+        def execute(self, stmt, params=None):
+            compiled = stmt.compile(dialect=dialect)
+            self.sql.append((str(compiled), compiled.params))
+            row = SimpleNamespace(_mapping={"id": 7, "name": "M"})
+            return SimpleNamespace(one=lambda: row, first=lambda: row)
+
+        def commit(self):
+            pass
+
+    session = Session()
+    assert run(session, _create(Project, {"name": "M"})) == {"id": 7, "name": "M"}
+    assert run(session, _update(Project, 7, {"budget": 3})) == {"id": 7, "name": "M"}
+    # по одному пакету на запись: OUTPUT ... INTO (таблице с триггерами можно) и SELECT из переменной
+    assert len(session.sql) == 2
+    (insert_sql, insert_params), (update_sql, update_params) = session.sql
+    assert "INSERT INTO projects" in insert_sql and "INTO @rows" in insert_sql and "FROM @rows" in insert_sql
+    assert insert_params == {"v0": "M", "v1": True}  # умолчание is_active, как у insert()
+    assert "UPDATE projects SET budget = :v0 OUTPUT" in update_sql and update_params == {"v0": 3, "pk": 7}